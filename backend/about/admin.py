@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import InformationSection, Event, GalleryItem, Visionary
+from .models import InformationSection, Event, GalleryItem, GalleryUploadJob, Visionary
 
 @admin.register(InformationSection)
 class InformationSectionAdmin(admin.ModelAdmin):
@@ -18,6 +18,12 @@ class GalleryItemAdmin(admin.ModelAdmin):
     list_display = ('title', 'created_at')
     search_fields = ('title', 'caption')
 
+@admin.register(GalleryUploadJob)
+class GalleryUploadJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'processed', 'total', 'imported', 'failed', 'created_at')
+    list_filter = ('status',)
+    readonly_fields = ('files', 'total', 'processed', 'imported', 'failed', 'errors', 'created_by', 'finished_at')
+
 @admin.register(Visionary)
 class VisionaryAdmin(admin.ModelAdmin):
     list_display = ('name', 'title', 'is_active', 'created_at')
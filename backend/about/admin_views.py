@@ -1,9 +1,17 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Event, GalleryItem
-from .serializers import EventSerializer, GalleryItemSerializer
+from .models import Event, GalleryItem, GalleryUploadJob
+from .serializers import EventSerializer, GalleryItemSerializer, GalleryUploadJobSerializer
+from .services import GalleryIngest
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
 from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from search.services import SearchIndex
+from outbox.models import Announcement
+from outbox.serializers import AnnouncementSerializer
+from outbox.services import Announcements
 
 class AdminEventViewSet(viewsets.ModelViewSet):
     """
@@ -19,12 +27,7 @@ class AdminEventViewSet(viewsets.ModelViewSet):
         # Search filter
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(location__icontains=search) |
-                Q(category__icontains=search) |
-                Q(description__icontains=search)
-            )
+            queryset = SearchIndex.filter_queryset(queryset, search)
         
         # Category filter
         category = self.request.query_params.get('category', None)
@@ -33,6 +36,14 @@ class AdminEventViewSet(viewsets.ModelViewSet):
             
         return queryset
 
+    @action(detail=True, methods=['post'])
+    def announce(self, request, pk=None):
+        """Annonce l'événement par email aux membres abonnés (envoi par run_mail_worker)"""
+        announcement = Announcements.create(Announcement.Kind.EVENT, self.get_object(), created_by=request.user)
+        if announcement is None:
+            return Response({'error': "Cet élément a déjà été annoncé"}, status=status.HTTP_409_CONFLICT)
+        return Response(AnnouncementSerializer(announcement).data, status=status.HTTP_202_ACCEPTED)
+
 class AdminGalleryViewSet(viewsets.ModelViewSet):
     """
     ViewSet pour la gestion de la galerie par les administrateurs
@@ -56,20 +67,26 @@ class AdminGalleryViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['POST'])
     def bulk_upload(self, request):
+        """
+        Import groupé : les photos sont traitées en arrière-plan.
+        Retourne 202 et l'import, dont l'avancement se suit via uploads/<id>/.
+        """
+        # Fichiers écrits sur disque au fil de la réception, quelle que soit leur taille
+        request._request.upload_handlers = [TemporaryFileUploadHandler(request._request)]
         images = request.FILES.getlist('images')
         if not images:
             return Response({'error': 'No images provided'}, status=400)
-            
-        if len(images) > 7:
-            return Response({'error': 'Maximum 7 images allowed'}, status=400)
-            
-        created_items = []
-        for img in images:
-            item = GalleryItem.objects.create(
-                image=img,
+
+        with transaction.atomic():
+            job = GalleryIngest.stage(
+                images,
                 title=request.data.get('title', ''),
-                caption=request.data.get('caption', '')
+                caption=request.data.get('caption', ''),
+                user=request.user,
             )
-            created_items.append(GalleryItemSerializer(item).data)
-            
-        return Response(created_items, status=201)
+        return Response(GalleryUploadJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['GET'], url_path=r'uploads/(?P<job_id>[0-9]+)')
+    def upload_job(self, request, job_id=None):
+        job = get_object_or_404(GalleryUploadJob, pk=job_id)
+        return Response(GalleryUploadJobSerializer(job).data)
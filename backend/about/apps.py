@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class AboutConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'about'
+
+    def ready(self):
+        from cyprus_api.cache import invalidate_scope_on
+        from cyprus_api.images import generate_variants_on
+        from .models import InformationSection, Event, GalleryItem, Visionary
+        invalidate_scope_on('sections', InformationSection)
+        invalidate_scope_on('events', Event)
+        invalidate_scope_on('gallery', GalleryItem)
+        invalidate_scope_on('visionaries', Visionary)
+        generate_variants_on(Event, 'image')
+        generate_variants_on(GalleryItem, 'image')
+        generate_variants_on(Visionary, 'photo')
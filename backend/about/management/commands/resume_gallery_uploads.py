@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from about.models import GalleryUploadJob
+from about.services import GalleryIngest
+
+
+class Command(BaseCommand):
+    help = "Reprend les imports de galerie interrompus (redémarrage du serveur pendant le traitement)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--idle-minutes', type=int, default=10,
+                            help="Délai sans progression au-delà duquel un import est considéré interrompu")
+
+    def handle(self, *args, **options):
+        idle_since = timezone.now() - timedelta(minutes=options['idle_minutes'])
+        jobs = GalleryUploadJob.objects.filter(
+            status__in=[GalleryUploadJob.Status.PENDING, GalleryUploadJob.Status.PROCESSING],
+            updated_at__lt=idle_since,
+        ).values_list('pk', flat=True)
+        for job_id in jobs:
+            job = GalleryIngest.process(job_id, stale_before=idle_since)
+            self.stdout.write(f"Import {job.pk} : {job.imported} importée(s), {job.failed} rejetée(s) ({job.status}).")
+        self.stdout.write(self.style.SUCCESS(f"{len(jobs)} import(s) repris."))
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -33,17 +34,22 @@ class Event(models.Model):
     location = models.CharField(_('Lieu'), max_length=255, blank=True, null=True)
     category = models.CharField(_('Catégorie'), max_length=100, blank=True, null=True)
     image = models.ImageField(_('Image/Affiche'), upload_to='events/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)  # voir cyprus_api/images.py
     
     is_annual = models.BooleanField(_('Événement annuel'), default=False)
     is_past = models.BooleanField(_('Événement passé'), default=False)
     is_pinned = models.BooleanField(_('Épinglé en haut'), default=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = _('Événement')
         verbose_name_plural = _('Événements')
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date', 'is_pinned'], name='event_date_pinned_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -51,6 +57,7 @@ class Event(models.Model):
 class GalleryItem(models.Model):
     title = models.CharField(_('Titre de la photo'), max_length=255, blank=True)
     image = models.ImageField(_('Photo'), upload_to='gallery/')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)  # voir cyprus_api/images.py
     caption = models.TextField(_('Légende'), blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -62,12 +69,51 @@ class GalleryItem(models.Model):
     def __str__(self):
         return self.title or f"Photo {self.id}"
 
+class GalleryUploadJob(models.Model):
+    """Import groupé de photos dans la galerie, traité en arrière-plan (voir services.py)"""
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', _('En attente')
+        PROCESSING = 'PROCESSING', _('En cours')
+        DONE = 'DONE', _('Terminé')
+        FAILED = 'FAILED', _('Échec')
+
+    status = models.CharField(_('Statut'), max_length=20, choices=Status.choices, default=Status.PENDING)
+    title = models.CharField(_('Titre des photos'), max_length=255, blank=True)
+    caption = models.TextField(_('Légende'), blank=True)
+    # [{'name': fichier déposé, 'original': nom envoyé, 'error': motif de rejet éventuel}], dans l'ordre
+    files = models.JSONField(default=list, editable=False)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    imported = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        null=True,
+        blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Import de photos')
+        verbose_name_plural = _('Imports de photos')
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Import {self.id} ({self.processed}/{self.total})"
+
 class Visionary(models.Model):
     name = models.CharField(_('Nom complet'), max_length=255)
     title = models.CharField(_('Titre / Fonction'), max_length=255, help_text="Ex: Pasteur Fondateur, Visionnaire")
     biography = models.TextField(_('Biographie'))
     history = models.TextField(_('Historique personnel / Vision'))
     photo = models.ImageField(_('Photo officielle'), upload_to='visionaries/')
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False)  # voir cyprus_api/images.py
     
     # Social Links
     instagram = models.URLField(_('Lien Instagram'), blank=True, null=True)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import InformationSection, Event, GalleryItem, Visionary
+from cyprus_api.images import ImageVariantsField
+from .models import InformationSection, Event, GalleryItem, GalleryUploadJob, Visionary
 
 class InformationSectionSerializer(serializers.ModelSerializer):
     type_display = serializers.CharField(source='get_type_display', read_only=True)
@@ -9,20 +10,33 @@ class InformationSectionSerializer(serializers.ModelSerializer):
         fields = ('id', 'type', 'type_display', 'title', 'content', 'image', 'updated_at')
 
 class EventSerializer(serializers.ModelSerializer):
+    image_srcset = ImageVariantsField('image')
+
     class Meta:
         model = Event
-        fields = ('id', 'title', 'description', 'date', 'time', 'location', 'category', 'image', 'is_annual', 'is_past', 'is_pinned', 'created_at')
+        fields = ('id', 'title', 'description', 'date', 'time', 'location', 'category', 'image', 'image_srcset', 'is_annual', 'is_past', 'is_pinned', 'created_at')
 
 class GalleryItemSerializer(serializers.ModelSerializer):
+    image_srcset = ImageVariantsField('image')
+
     class Meta:
         model = GalleryItem
-        fields = ('id', 'title', 'image', 'caption', 'created_at')
+        fields = ('id', 'title', 'image', 'image_srcset', 'caption', 'created_at')
+
+class GalleryUploadJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = GalleryUploadJob
+        fields = ('id', 'status', 'title', 'caption', 'total', 'processed', 'imported', 'failed', 'errors',
+                  'created_at', 'finished_at')
+        read_only_fields = fields
 
 class VisionarySerializer(serializers.ModelSerializer):
+    photo_srcset = ImageVariantsField('photo')
+
     class Meta:
         model = Visionary
         fields = (
-            'id', 'name', 'title', 'biography', 'history', 'photo',
+            'id', 'name', 'title', 'biography', 'history', 'photo', 'photo_srcset',
             'instagram', 'facebook', 'twitter', 'youtube',
             'is_active', 'created_at', 'updated_at'
         )
@@ -0,0 +1,141 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from cyprus_api.cache import bump_scope_version
+from cyprus_api.images import build_variants, delete_variants
+from dashboard.services import DashboardCounters
+from .models import GalleryItem, GalleryUploadJob
+
+logger = logging.getLogger(__name__)
+
+# Un import à la fois par processus ; chaque import décode ses images en parallèle
+_runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gallery-ingest')
+
+
+class GalleryIngest:
+    """
+    Import groupé de photos dans la galerie.
+
+    La requête ne fait que déposer les fichiers dans le stockage (déplacement
+    du fichier temporaire, sans relecture) et créer un ``GalleryUploadJob``.
+    Le décodage, la validation et les variantes (cyprus_api/images.py) sont
+    faits en arrière-plan par un pool de threads ; les photos valides sont
+    insérées par paquets de GALLERY_INGEST_BATCH_SIZE avec ``bulk_create``.
+    ``manage.py resume_gallery_uploads`` reprend un import interrompu.
+
+    Un import n'est traité que par le processus qui l'a réclamé (UPDATE
+    conditionnel PENDING -> PROCESSING). En cas d'échec, les fichiers déposés
+    et pas encore importés sont supprimés du stockage.
+    """
+
+    @staticmethod
+    def stage(files, title='', caption='', user=None):
+        field = GalleryItem._meta.get_field('image')
+        entries = []
+        for upload in files:
+            extension = os.path.splitext(upload.name)[1].lower().lstrip('.')
+            if extension not in settings.ALLOWED_IMAGE_EXTENSIONS:
+                entries.append({'name': None, 'original': upload.name, 'error': "Extension non autorisée"})
+                continue
+            name = field.storage.save(field.generate_filename(None, upload.name), upload)
+            entries.append({'name': name, 'original': upload.name})
+
+        job = GalleryUploadJob.objects.create(
+            files=entries, total=len(entries), title=title, caption=caption, created_by=user
+        )
+        transaction.on_commit(lambda: GalleryIngest.start(job.pk))
+        return job
+
+    @staticmethod
+    def start(job_id):
+        return _runner.submit(GalleryIngest.run, job_id)
+
+    @staticmethod
+    def run(job_id):
+        """Point d'entrée du thread d'arrière-plan."""
+        close_old_connections()
+        try:
+            GalleryIngest.process(job_id)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def prepare(entry):
+        """Décode une photo et génère ses variantes ; retourne ``(variantes, erreur)``."""
+        if entry.get('error'):
+            return None, entry['error']
+        field_file = GalleryItem(image=entry['name']).image
+        variants = build_variants(field_file)
+        if not variants:
+            field_file.storage.delete(entry['name'])
+            return None, "Image illisible ou corrompue"
+        return variants, None
+
+    @staticmethod
+    def claim(job_id, stale_before=None):
+        """
+        Passe l'import en PROCESSING s'il est en attente (ou, avec ``stale_before``,
+        en cours mais sans progression depuis) ; ``False`` s'il est déjà pris.
+        """
+        claimable = Q(status=GalleryUploadJob.Status.PENDING)
+        if stale_before is not None:
+            claimable |= Q(status=GalleryUploadJob.Status.PROCESSING, updated_at__lt=stale_before)
+        return bool(GalleryUploadJob.objects.filter(claimable, pk=job_id).update(
+            status=GalleryUploadJob.Status.PROCESSING, updated_at=timezone.now()
+        ))
+
+    @staticmethod
+    def discard(job, items):
+        """Supprime les fichiers déposés pas encore importés, et les variantes du paquet en cours."""
+        storage = GalleryItem._meta.get_field('image').storage
+        for item in items:
+            delete_variants(storage, item.image_variants)
+        for entry in job.files[job.processed:]:
+            if entry.get('name'):
+                storage.delete(entry['name'])
+
+    @staticmethod
+    def process(job_id, stale_before=None):
+        if not GalleryIngest.claim(job_id, stale_before):
+            return GalleryUploadJob.objects.get(pk=job_id)
+        job = GalleryUploadJob.objects.get(pk=job_id)
+
+        items = []
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, settings.GALLERY_INGEST_WORKERS)) as pool:
+                while job.processed < job.total:
+                    batch = job.files[job.processed:job.processed + settings.GALLERY_INGEST_BATCH_SIZE]
+                    items = []
+                    for entry, (variants, error) in zip(batch, pool.map(GalleryIngest.prepare, batch)):
+                        if error:
+                            job.failed += 1
+                            job.errors.append({'file': entry['original'], 'error': error})
+                        else:
+                            items.append(GalleryItem(
+                                image=entry['name'], title=job.title, caption=job.caption, image_variants=variants
+                            ))
+                    with transaction.atomic():
+                        GalleryItem.objects.bulk_create(items)
+                        # bulk_create ne déclenche pas post_save : compteur du tableau de bord
+                        # et cache public sont mis à jour ici
+                        DashboardCounters.increment(DashboardCounters.GALLERY_TOTAL, len(items))
+                        job.processed += len(batch)
+                        job.imported += len(items)
+                        job.save(update_fields=['processed', 'imported', 'failed', 'errors', 'updated_at'])
+                    items = []
+                    bump_scope_version('gallery')
+        except Exception:
+            logger.exception("Import de galerie %s interrompu", job.pk)
+            job.status = GalleryUploadJob.Status.FAILED
+            GalleryIngest.discard(job, items)
+        else:
+            job.status = GalleryUploadJob.Status.DONE
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'finished_at', 'updated_at'])
+        return job
@@ -1,3 +1,307 @@
-from django.test import TestCase
+import datetime
+import os
+import shutil
+import tempfile
+import time
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from cyprus_api.cache import bump_scopes_for, get_scope_version
+from dashboard.services import DashboardCounters
+from users.models import User
+from .models import Event, GalleryItem, GalleryUploadJob
+from .services import GalleryIngest
+
+
+class PublicResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = '/api/about/events/'
+        Event.objects.create(
+            title='Culte de Pâques',
+            description='Célébration',
+            date=datetime.date.today() + datetime.timedelta(days=3)
+        )
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.json(), first.json())
+
+    def test_cache_key_includes_query_params_and_language(self):
+        self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url, {'archive': 'true'})['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.url, HTTP_ACCEPT_LANGUAGE='en')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.url, HTTP_ACCEPT_LANGUAGE='en')['X-Cache'], 'HIT')
+
+    def test_saving_a_model_invalidates_its_scope(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.create(
+                title='Conférence',
+                description='Jeunesse',
+                date=datetime.date.today() + datetime.timedelta(days=5)
+            )
+
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['count'], 2)
+
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class ConditionalGetTests(APITestCase):
+    url = '/api/about/events/'
+
+    def setUp(self):
+        future = datetime.date.today() + datetime.timedelta(days=3)
+        self.events = [
+            Event.objects.create(title=f'Veillée {index}', description='Prière', date=future) for index in range(3)
+        ]
+
+    def test_unchanged_list_is_not_modified_without_serialization(self):
+        first = self.client.get(self.url)
+        self.assertTrue(first['ETag'].startswith('W/"'))
+        self.assertIn('Last-Modified', first)
+        self.assertIn('no-cache', first['Cache-Control'])
+
+        with self.assertNumQueries(1):  # COUNT + MAX(updated_at)
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], first['ETag'])
+        self.assertEqual(response.content, b'')
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        # Autre représentation (paramètres), autre ETag
+        response = self.client.get(self.url, {'archive': 'true'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_updates_and_deletions_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.events[0].title = 'Veillée de prière'
+        self.events[0].save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Suppression d'une ligne qui n'est pas la plus récente : MAX(updated_at) inchangé, COUNT non
+        etag = response['ETag']
+        self.events[1].delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['count'], 2)
+
+    def test_detail_and_cached_scope(self):
+        url = f'{self.url}{self.events[0].pk}/'
+        etag = self.client.get(url)['ETag']
+        self.events[1].save()  # autre événement : le détail n'a pas changé
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        # locmem : un autre worker (cache vide, autres versions de scope) calcule le même ETag
+        cache.clear()
+        self.assertEqual(self.client.get(url)['ETag'], etag)
+
+        cache.clear()
+        with override_settings(API_CACHE_TIMEOUT=60):
+            etag = self.client.get(self.url)['ETag']
+            with self.assertNumQueries(0):  # tampon de version en cache avec la réponse
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'cyprus-tests-cache'),
+    }})
+    def test_scope_version_invalidates_etag_with_a_shared_cache(self):
+        cache.clear()
+        url = f'{self.url}{self.events[0].pk}/'
+        etag = self.client.get(url)['ETag']
+
+        # update() ne touche pas updated_at : la version du scope invalide l'ETag
+        Event.objects.filter(pk=self.events[0].pk).update(title='Veillée déplacée')
+        bump_scopes_for(Event)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['title'], 'Veillée déplacée')
+
+
+def photo(name='culte.jpg', size=(2000, 1000), fmt='JPEG', mode='RGB', orientation=None):
+    """Image de test ; ``orientation`` ajoute le tag EXIF correspondant (6 = rotation de 90°)."""
+    exif = Image.Exif()
+    exif[0x010F] = 'Phone'  # Make
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = BytesIO()
+    image = Image.new(mode, size, (200, 100, 50, 128)[:len(mode)])
+    image.save(buffer, fmt, **({'exif': exif} if fmt == 'JPEG' else {}))
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class TemporaryMediaMixin:
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=[320, 640, 1280])
+class ImageVariantTests(TemporaryMediaMixin, APITestCase):
+    def open_variant(self, item, fmt, width):
+        name = dict(item.image_variants[fmt])[width]
+        with default_storage.open(name) as variant:
+            image = Image.open(variant)
+            image.load()
+        return name, image
+
+    def test_upload_generates_upright_variants_without_exif(self):
+        item = GalleryItem.objects.create(image=photo(orientation=6))
+
+        self.assertEqual(item.image_variants['source'], item.image.name)
+        # 2000x1000 pivotée : 1000 px de large, jamais agrandie à 1280
+        self.assertEqual([width for width, _ in item.image_variants['webp']], [320, 640, 1000])
+        name, image = self.open_variant(item, 'jpeg', 640)
+        self.assertEqual(name, item.image.name.replace('.jpg', '_640w.jpg'))
+        self.assertEqual(image.size, (640, 1280))  # portrait après rotation
+        self.assertEqual(dict(image.getexif()), {})
+        _, image = self.open_variant(item, 'webp', 320)
+        self.assertEqual((image.format, image.size), ('WEBP', (320, 640)))
+
+    def test_small_images_are_not_upscaled(self):
+        item = GalleryItem.objects.create(image=photo('logo.png', (500, 300), 'PNG', 'RGBA'))
+        self.assertEqual([width for width, _ in item.image_variants['jpeg']], [320, 500])
+        _, image = self.open_variant(item, 'jpeg', 500)
+        self.assertEqual(image.mode, 'RGB')
+
+    def test_serializer_exposes_srcset(self):
+        item = GalleryItem.objects.create(image=photo())
+        response = self.client.get('/api/about/gallery/')
+        srcset = response.json()['results'][0]['image_srcset']
+        webp = [entry.rsplit(' ', 1) for entry in srcset['webp'].split(', ')]
+        self.assertEqual([descriptor for _, descriptor in webp], ['320w', '640w', '1280w'])
+        self.assertEqual(webp[0][0], 'http://testserver/media/' + dict(item.image_variants['webp'])[320])
+
+    def test_replacing_the_image_removes_old_variants(self):
+        item = GalleryItem.objects.create(image=photo())
+        old = [name for _, name in item.image_variants['webp']]
+        item.image = photo('nouvelle.jpg')
+        item.save()
+        self.assertFalse(any(default_storage.exists(name) for name in old))
+        self.assertIn('nouvelle', item.image_variants['source'])
+
+    def test_backfill_command_processes_stale_images_only(self):
+        item = GalleryItem.objects.create(image=photo())
+        event = Event.objects.create(title='Culte', description='', date=datetime.date.today(), image=photo())
+        GalleryItem.objects.update(image_variants={})
+        Event.objects.update(image_variants={})
+        versions = get_scope_version('gallery'), get_scope_version('events')
+        output = StringIO()
+        call_command('generate_image_variants', stdout=output)
+        self.assertIn('about.GalleryItem.image : 1 image(s)', output.getvalue())
+        item.refresh_from_db()
+        self.assertEqual(len(item.image_variants['jpeg']), 3)
+        # update() sans post_save : scopes du cache et updated_at sont mis à jour par la commande
+        self.assertNotEqual(get_scope_version('gallery'), versions[0])
+        self.assertNotEqual(get_scope_version('events'), versions[1])
+        self.assertGreater(Event.objects.get(pk=event.pk).updated_at, event.updated_at)
+
+        version = get_scope_version('gallery')
+        call_command('generate_image_variants', stdout=output)
+        self.assertIn('about.GalleryItem.image : 0 image(s)', output.getvalue())
+        self.assertEqual(get_scope_version('gallery'), version)
+
+
+def upload_batch(count):
+    files = [photo(f'photo{i}.jpg', (400, 300)) for i in range(count)]
+    return files + [SimpleUploadedFile('broken.jpg', b'pas une image'), SimpleUploadedFile('notes.txt', b'texte')]
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=[320], GALLERY_INGEST_WORKERS=3, GALLERY_INGEST_BATCH_SIZE=4)
+class GalleryIngestTests(TemporaryMediaMixin, TestCase):
+    def test_valid_photos_are_inserted_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            job = GalleryIngest.stage(upload_batch(10), title='Baptêmes')
+        self.assertEqual(len(callbacks), 1)  # traitement lancé après le commit
+
+        with CaptureQueriesContext(connection) as queries:
+            GalleryIngest.process(job.pk)
+        inserts = [q for q in queries if q['sql'].startswith('INSERT INTO "about_galleryitem"')]
+        self.assertEqual(len(inserts), 3)  # 12 fichiers par paquets de 4
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed, job.imported, job.failed), ('DONE', 12, 10, 2))
+        self.assertEqual([error['file'] for error in job.errors], ['broken.jpg', 'notes.txt'])
+        self.assertFalse(default_storage.exists(job.files[10]['name']))
+        self.assertEqual(GalleryItem.objects.filter(title='Baptêmes').exclude(image_variants={}).count(), 10)
+        self.assertEqual(DashboardCounters.read([DashboardCounters.GALLERY_TOTAL])[DashboardCounters.GALLERY_TOTAL], 10)
+
+    def test_job_claimed_elsewhere_is_not_processed(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            job = GalleryIngest.stage(upload_batch(2))
+        GalleryUploadJob.objects.filter(pk=job.pk).update(status=GalleryUploadJob.Status.PROCESSING)
+
+        self.assertEqual(GalleryIngest.process(job.pk).processed, 0)
+        self.assertFalse(GalleryItem.objects.exists())
+
+    def test_failed_job_deletes_its_staged_files(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            job = GalleryIngest.stage(upload_batch(6))
+        original = GalleryItem.objects.bulk_create
+        calls = []
+
+        def bulk_create(items):
+            calls.append(items)
+            if len(calls) > 1:
+                raise DatabaseError('connexion perdue')
+            return original(items)
+
+        with mock.patch.object(GalleryItem.objects, 'bulk_create', side_effect=bulk_create):
+            job = GalleryIngest.process(job.pk)
+        self.assertEqual((job.status, job.processed, job.imported), ('FAILED', 4, 4))
+        # Le premier paquet reste importé ; le reste est retiré du stockage, variantes comprises
+        self.assertTrue(all(default_storage.exists(entry['name']) for entry in job.files[:4]))
+        self.assertFalse(any(default_storage.exists(entry['name']) for entry in job.files[4:] if entry['name']))
+        variants = [name for item in calls[1] for _, name in item.image_variants['webp']]
+        self.assertTrue(variants)
+        self.assertFalse(any(default_storage.exists(name) for name in variants))
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=[320], GALLERY_INGEST_BATCH_SIZE=4)
+class GalleryBulkUploadTests(TemporaryMediaMixin, TransactionTestCase):
+    def test_bulk_upload_returns_a_job_processed_in_background(self):
+        admin = User.objects.create_user(username='admin', role=User.Role.ADMIN, is_staff=True)
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(admin)}'}
+
+        response = self.client.post('/api/admin/gallery/bulk_upload/', {'images': upload_batch(20)}, **headers)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['total'], 22)
+
+        url = f"/api/admin/gallery/uploads/{response.json()['id']}/"
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            job = self.client.get(url, **headers).json()
+            if job['status'] in ('DONE', 'FAILED'):
+                break
+            time.sleep(0.05)
+        self.assertEqual((job['status'], job['imported'], job['failed']), ('DONE', 20, 2))
+        self.assertEqual(GalleryItem.objects.count(), 20)
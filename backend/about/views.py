@@ -1,17 +1,26 @@
 from rest_framework import viewsets, permissions
 from .models import InformationSection, Event, GalleryItem, Visionary
 from .serializers import InformationSectionSerializer, EventSerializer, GalleryItemSerializer, VisionarySerializer
+from cyprus_api.cache import CachedResponseMixin
+from cyprus_api.conditional import ConditionalGetMixin
 
-class InformationSectionViewSet(viewsets.ModelViewSet):
+class InformationSectionViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = InformationSection.objects.all()
     serializer_class = InformationSectionSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_scope = 'sections'
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    
+    cache_scope = 'events'
+
+    def get_conditional_seed(self):
+        # Le filtre archive / à venir dépend de la date du jour
+        import datetime
+        return datetime.date.today().isoformat()
+
     def get_queryset(self):
         queryset = Event.objects.all()
         # Automatic Archive Logic based on Date
@@ -48,12 +57,14 @@ class EventViewSet(viewsets.ModelViewSet):
             
         return queryset.order_by(*ordering)
 
-class GalleryViewSet(viewsets.ModelViewSet):
+class GalleryViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = GalleryItem.objects.all()
     serializer_class = GalleryItemSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_scope = 'gallery'
 
-class VisionaryViewSet(viewsets.ModelViewSet):
+class VisionaryViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Visionary.objects.filter(is_active=True)
     serializer_class = VisionarySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_scope = 'visionaries'
@@ -3,9 +3,9 @@ from .models import AIConsultation
 
 @admin.register(AIConsultation)
 class AIConsultationAdmin(admin.ModelAdmin):
-    list_display = ('question_short', 'user', 'created_at')
-    list_filter = ('created_at', 'user')
-    readonly_fields = ('user', 'question', 'answer', 'created_at')
+    list_display = ('question_short', 'user', 'from_cache', 'created_at')
+    list_filter = ('created_at', 'from_cache', 'user')
+    readonly_fields = ('user', 'question', 'answer', 'from_cache', 'created_at')
     
     def question_short(self, obj):
         return (obj.question[:75] + '..') if len(obj.question) > 75 else obj.question
@@ -0,0 +1,158 @@
+"""
+Cache en mémoire des réponses de l'assistant biblique.
+
+Clé : langue + question normalisée (casse, accents, ponctuation, espaces).
+Les entrées expirent après AI_ANSWER_CACHE_TTL secondes et les moins
+récemment utilisées sont évincées au-delà de AI_ANSWER_CACHE_SIZE entrées.
+Les questions identiques en cours de traitement partagent un seul appel à
+Gemini : par boucle d'événements sous ASGI (``get_or_fetch``), par processus
+entre les threads d'un worker WSGI (``get_or_fetch_sync``).
+
+Le cache est propre à chaque processus (worker) : aucun service externe requis.
+"""
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from cyprus_api.text import normalize
+
+PUNCTUATION = re.compile(r'[^\w\s]|_')
+
+
+def normalize_question(question):
+    """« Que dit la Bible sur le PARDON ?! » → « que dit la bible sur le pardon »"""
+    return ' '.join(PUNCTUATION.sub(' ', normalize(question)).split())
+
+
+class InflightCall:
+    """Appel synchrone en cours : les threads suivants attendent ``done`` puis lisent le résultat."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.answer = None
+        self.error = None
+
+
+class AnswerCache:
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._inflight_calls = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'AI_ANSWER_CACHE_TTL', 86400)
+
+    @property
+    def maxsize(self):
+        return getattr(settings, 'AI_ANSWER_CACHE_SIZE', 1000)
+
+    @staticmethod
+    def make_key(question, language):
+        return f"{'en' if language == 'en' else 'fr'}:{normalize_question(question)}"
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, answer = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return answer
+
+    def set(self, key, answer):
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def get_or_fetch(self, key, fetch):
+        """
+        Retourne (réponse, depuis_le_cache). ``fetch`` est une coroutine appelée
+        au plus une fois par clé et par boucle tant qu'elle est en cours.
+        """
+        answer = self.get(key)
+        if answer is not None:
+            return answer, True
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pending = self._inflight.get(key)
+            if pending is None or pending[0] is not loop:
+                future = loop.create_future()
+                self._inflight[key] = (loop, future)
+                pending = None
+        if pending is not None:
+            return await asyncio.shield(pending[1]), True
+
+        try:
+            answer = await fetch()
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
+                future.exception()  # évite l'avertissement si personne n'attendait
+            raise
+        else:
+            self.set(key, answer)
+            future.set_result(answer)
+            return answer, False
+        finally:
+            with self._lock:
+                if self._inflight.get(key, (None, None))[1] is future:
+                    del self._inflight[key]
+
+    def get_or_fetch_sync(self, key, fetch):
+        """
+        Variante synchrone de ``get_or_fetch`` : ``fetch`` est appelée au plus une
+        fois par clé et par processus tant qu'elle est en cours (threads WSGI).
+        """
+        answer = self.get(key)
+        if answer is not None:
+            return answer, True
+
+        with self._lock:
+            call = self._inflight_calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight_calls[key] = InflightCall()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.answer, True
+
+        try:
+            call.answer = fetch()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        else:
+            self.set(key, call.answer)
+            return call.answer, False
+        finally:
+            with self._lock:
+                del self._inflight_calls[key]
+            call.done.set()
+
+
+answer_cache = AnswerCache()
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_assistant', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiconsultation',
+            name='from_cache',
+            field=models.BooleanField(default=False, verbose_name='Servie depuis le cache'),
+        ),
+    ]
@@ -12,6 +12,7 @@ class AIConsultation(models.Model):
     )
     question = models.TextField(_('Question'))
     answer = models.TextField(_('Réponse de l\'IA'))
+    from_cache = models.BooleanField(_('Servie depuis le cache'), default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -4,5 +4,5 @@ from .models import AIConsultation
 class AIConsultationSerializer(serializers.ModelSerializer):
     class Meta:
         model = AIConsultation
-        fields = ('id', 'user', 'question', 'answer', 'created_at')
-        read_only_fields = ('user', 'answer', 'created_at')
+        fields = ('id', 'user', 'question', 'answer', 'from_cache', 'created_at')
+        read_only_fields = ('user', 'answer', 'from_cache', 'created_at')
@@ -1,99 +1,280 @@
-import requests
+import asyncio
+import json
+import logging
+import threading
+import time
+import weakref
+
+import httpx
 from django.conf import settings
 
+from cyprus_api.exceptions import AIServiceError
+from .cache import answer_cache
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPTS = {
+    'en': (
+        "You are a spiritual and biblical assistant for the 'Cyprus For Christ' platform. "
+        "Your answers must be based on the Bible, with a pastoral, caring, and encouraging tone. "
+        "If a question is not spiritual or biblical, politely try to steer the conversation back to faith. "
+        "Use Bible verses to support your answers. Answer in English (King James Version style if appropriate)."
+    ),
+    'fr': (
+        "Tu es un assistant spirituel et biblique pour la plateforme 'Cyprus For Christ'. "
+        "Tes réponses doivent être basées sur la Bible, avec un ton pastoral, bienveillant, et encourageant. "
+        "Si une question n'est pas spirituelle ou biblique, essaie de ramener poliment la conversation vers la foi. "
+        "Utilise des versets bibliques pour appuyer tes réponses. Réponds en français."
+    ),
+}
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+TRUNCATION_NOTE = "\n\n[Note: La réponse a été interrompue ({reason})]"
+
+# Un client HTTP (pool keep-alive) par boucle d'événements : sous ASGI, une seule
+# boucle par worker, donc un seul pool partagé par toutes les requêtes. Sous WSGI
+# chaque requête aurait sa propre boucle (async_to_sync) : les vues passent alors
+# par le client synchrone partagé (``get_client``), voir views.py.
+_async_clients = weakref.WeakKeyDictionary()
+_client = None
+_client_lock = threading.Lock()
+
+
+def gemini_url(method='generateContent'):
+    model = settings.GEMINI_MODEL.removeprefix('models/')
+    return f"{settings.GEMINI_API_BASE.rstrip('/')}/models/{model}:{method}"
+
+
+def gemini_headers():
+    # Clé dans l'en-tête plutôt que dans l'URL : elle n'apparaît pas dans les logs
+    return {'x-goog-api-key': settings.GEMINI_API_KEY}
+
+
+def client_options():
+    return {
+        'timeout': settings.GEMINI_TIMEOUT,
+        'limits': httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    }
+
+
+def get_async_client():
+    """Client de la boucle courante ; à réserver aux boucles de longue durée (ASGI)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(**client_options())
+        _async_clients[loop] = client
+    return client
+
+
+def get_client():
+    """Client synchrone partagé par tous les threads du processus (WSGI, scripts)."""
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(**client_options())
+        return _client
+
+
 class BiblicalAIService:
     @staticmethod
-    def ask_bible(question, language='fr'):
-        # Configuration of the system prompt based on language
-        if language == 'en':
-            system_prompt = (
-                "You are a spiritual and biblical assistant for the 'Cyprus For Christ' platform. "
-                "Your answers must be based on the Bible, with a pastoral, caring, and encouraging tone. "
-                "If a question is not spiritual or biblical, politely try to steer the conversation back to faith. "
-                "Use Bible verses to support your answers. Answer in English (King James Version style if appropriate)."
-            )
-        else:
-            system_prompt = (
-                "Tu es un assistant spirituel et biblique pour la plateforme 'Cyprus For Christ'. "
-                "Tes réponses doivent être basées sur la Bible, avec un ton pastoral, bienveillant, et encourageant. "
-                "Si une question n'est pas spirituelle ou biblique, essaie de ramener poliment la conversation vers la foi. "
-                "Utilise des versets bibliques pour appuyer tes réponses. Réponds en français."
-            )
+    def build_question_payload(question, language='fr'):
+        system_prompt = SYSTEM_PROMPTS['en' if language == 'en' else 'fr']
+        full_prompt = f"{system_prompt}\n\nQuestion de l'utilisateur: {question}"
+        return {
+            "contents": [{
+                "parts": [{"text": full_prompt}]
+            }],
+            "generationConfig": {
+                "temperature": 0.7,
+                "maxOutputTokens": 2048
+            }
+        }
+
+    @staticmethod
+    def extract_answer(data):
+        """Texte de la réponse Gemini ; lève AIServiceError si elle est inexploitable."""
+        candidates = data.get('candidates') or []
+        if not candidates:
+            raise AIServiceError("Désolé, je n'ai pas pu générer de réponse (Aucun candidat).")
+
+        candidate = candidates[0]
+        parts = candidate.get('content', {}).get('parts') or [{}]
+        answer_text = parts[0].get('text', '')
+        finish_reason = candidate.get('finishReason', 'STOP')
 
+        if finish_reason != 'STOP':
+            if answer_text:
+                return answer_text + TRUNCATION_NOTE.format(reason=finish_reason)
+            raise AIServiceError(f"La réponse a été interrompue. Raison: {finish_reason}")
+        if not answer_text:
+            raise AIServiceError("Désolé, la réponse de l'IA est vide ou illisible.")
+        return answer_text
+
+    @staticmethod
+    def error_for_status(status_code, retry_after=None):
         try:
-            if not settings.GEMINI_API_KEY:
-                 return "Erreur de configuration : La clé API Google Gemini est manquante."
-
-            # Use Gemini REST API directly (v1beta endpoint_
-            # Update to gemini-flash-latest to better handle free tier limits and availability
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-flash-latest:generateContent?key={settings.GEMINI_API_KEY}"
-            
-            # Construct the full prompt with context
-            full_prompt = f"{system_prompt}\n\nQuestion de l'utilisateur: {question}"
-            
-            payload = {
-                "contents": [{
-                    "parts": [{"text": full_prompt}]
-                }],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "maxOutputTokens": 2048
-                }
-            }
-            
-            # Simple retry mechanism for 429 errors
-            import time
-            max_retries = 3
-            for attempt in range(max_retries):
-                response = requests.post(url, json=payload, timeout=30)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    # Debug logging
-                    print(f"Gemini API Response: {data}")
-                    
-                    if 'candidates' in data and len(data['candidates']) > 0:
-                        candidate = data['candidates'][0]
-                        answer_text = ""
-                        
-                        # Try to get text even if interrupted
-                        if 'content' in candidate and 'parts' in candidate['content']:
-                            answer_text = candidate['content']['parts'][0]['text']
-                        
-                        if 'finishReason' in candidate and candidate['finishReason'] != 'STOP':
-                            if answer_text:
-                                return f"{answer_text}\n\n[Note: La réponse a été interrompue ({candidate['finishReason']})]"
-                            else:
-                                return f"La réponse a été interrompue. Raison: {candidate['finishReason']}"
-                        
-                        if answer_text:
-                            return answer_text
-                        else:
-                            return "Désolé, la réponse de l'IA est vide ou illisible."
-                    else:
-                        return "Désolé, je n'ai pas pu générer de réponse (Aucun candidat)."
-                elif response.status_code == 429:
-                    # Rate limit hit
-                    if attempt < max_retries - 1:
-                        time.sleep(2 * (attempt + 1)) # Backoff: 2s, 4s...
-                        continue
-                    else:
-                        return "Le service est actuellement surchargé (limite de quota). Veuillez réessayer dans quelques instants."
-                else:
-                    print(f"Gemini API Error: {response.status_code} - {response.text}")
-                    return f"Erreur API ({response.status_code}): {response.text}"
-            
-        except Exception as e:
-            print(f"Gemini Service Exception: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return f"Désolé, je rencontre une difficulté technique pour répondre : {str(e)}"
+            retry_after = float(retry_after) if retry_after else None
+        except ValueError:
+            retry_after = None  # format date HTTP : ignoré
+        if status_code == 429:
+            return AIServiceError(
+                "Le service est actuellement surchargé (limite de quota). Veuillez réessayer dans quelques instants.",
+                status_code=status_code, retry_after=retry_after,
+            )
+        return AIServiceError(f"Erreur API ({status_code})", status_code=status_code, retry_after=retry_after)
+
+    @staticmethod
+    async def aask_bible(question, language='fr'):
+        """
+        Pose une question à Gemini sans bloquer le worker : l'attente réseau et
+        les pauses entre tentatives (429/5xx) rendent la main à la boucle d'événements.
+        """
+        if not settings.GEMINI_API_KEY:
+            raise AIServiceError("Erreur de configuration : La clé API Google Gemini est manquante.")
+
+        client = get_async_client()
+        payload = BiblicalAIService.build_question_payload(question, language)
+        max_retries = max(settings.GEMINI_MAX_RETRIES, 1)
+
+        for attempt in range(max_retries):
+            try:
+                response = await client.post(gemini_url(), json=payload, headers=gemini_headers())
+            except httpx.HTTPError as exc:
+                logger.warning("Gemini request failed (attempt %s): %s", attempt + 1, exc)
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(settings.GEMINI_RETRY_BACKOFF * (attempt + 1))
+                    continue
+                raise AIServiceError(
+                    f"Désolé, je rencontre une difficulté technique pour répondre : {exc}"
+                ) from exc
+
+            if response.status_code == 200:
+                return BiblicalAIService.extract_answer(response.json())
+
+            logger.warning("Gemini API Error: %s - %s", response.status_code, response.text[:500])
+            if response.status_code in RETRYABLE_STATUSES and attempt < max_retries - 1:
+                await asyncio.sleep(settings.GEMINI_RETRY_BACKOFF * (attempt + 1))
+                continue
+            raise BiblicalAIService.error_for_status(response.status_code, response.headers.get('Retry-After'))
 
     @staticmethod
-    def generate_daily_rhema():
-        """Génère un Rhema du jour complet (Titre, Verset, Contenu, Méditation)"""
+    async def astream_bible(question, language='fr'):
+        """
+        Générateur asynchrone des fragments de réponse (streamGenerateContent en SSE).
+
+        Les erreurs avant le premier fragment (429/5xx, connexion) sont retentées ;
+        fermer le générateur (``aclose``) ferme la connexion à Gemini.
+        """
+        if not settings.GEMINI_API_KEY:
+            raise AIServiceError("Erreur de configuration : La clé API Google Gemini est manquante.")
+
+        client = get_async_client()
+        payload = BiblicalAIService.build_question_payload(question, language)
+        max_retries = max(settings.GEMINI_MAX_RETRIES, 1)
+        received = False
+
+        for attempt in range(max_retries):
+            retry = attempt < max_retries - 1
+            try:
+                async with client.stream(
+                    'POST', gemini_url('streamGenerateContent'), params={'alt': 'sse'},
+                    json=payload, headers=gemini_headers()
+                ) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        logger.warning("Gemini API Error: %s - %s", response.status_code, response.text[:500])
+                        if response.status_code in RETRYABLE_STATUSES and retry:
+                            await asyncio.sleep(settings.GEMINI_RETRY_BACKOFF * (attempt + 1))
+                            continue
+                        raise BiblicalAIService.error_for_status(response.status_code, response.headers.get('Retry-After'))
+
+                    finish_reason = None
+                    async for line in response.aiter_lines():
+                        if not line.startswith('data:'):
+                            continue
+                        candidate = (json.loads(line[5:]).get('candidates') or [{}])[0]
+                        for part in candidate.get('content', {}).get('parts', []):
+                            if part.get('text'):
+                                received = True
+                                yield part['text']
+                        finish_reason = candidate.get('finishReason') or finish_reason
+            except httpx.HTTPError as exc:
+                logger.warning("Gemini stream failed (attempt %s): %s", attempt + 1, exc)
+                if not received and retry:
+                    await asyncio.sleep(settings.GEMINI_RETRY_BACKOFF * (attempt + 1))
+                    continue
+                raise AIServiceError(
+                    f"Désolé, je rencontre une difficulté technique pour répondre : {exc}"
+                ) from exc
+
+            if not received:
+                raise AIServiceError("Désolé, la réponse de l'IA est vide ou illisible.")
+            if finish_reason and finish_reason != 'STOP':
+                yield TRUNCATION_NOTE.format(reason=finish_reason)
+            return
+
+    @staticmethod
+    async def aask_bible_cached(question, language='fr'):
+        """Comme ``aask_bible`` mais via le cache de réponses : retourne (réponse, depuis_le_cache)."""
+        key = answer_cache.make_key(question, language)
+        return await answer_cache.get_or_fetch(key, lambda: BiblicalAIService.aask_bible(question, language))
+
+    @staticmethod
+    def ask_bible(question, language='fr'):
+        """
+        Variante synchrone (WSGI, scripts, shell) de ``aask_bible``, sur le client
+        partagé du processus : les connexions sont réutilisées d'une requête à l'autre.
+        """
+        if not settings.GEMINI_API_KEY:
+            raise AIServiceError("Erreur de configuration : La clé API Google Gemini est manquante.")
+
+        client = get_client()
+        payload = BiblicalAIService.build_question_payload(question, language)
+        max_retries = max(settings.GEMINI_MAX_RETRIES, 1)
+
+        for attempt in range(max_retries):
+            try:
+                response = client.post(gemini_url(), json=payload, headers=gemini_headers())
+            except httpx.HTTPError as exc:
+                logger.warning("Gemini request failed (attempt %s): %s", attempt + 1, exc)
+                if attempt < max_retries - 1:
+                    time.sleep(settings.GEMINI_RETRY_BACKOFF * (attempt + 1))
+                    continue
+                raise AIServiceError(
+                    f"Désolé, je rencontre une difficulté technique pour répondre : {exc}"
+                ) from exc
+
+            if response.status_code == 200:
+                return BiblicalAIService.extract_answer(response.json())
+
+            logger.warning("Gemini API Error: %s - %s", response.status_code, response.text[:500])
+            if response.status_code in RETRYABLE_STATUSES and attempt < max_retries - 1:
+                time.sleep(settings.GEMINI_RETRY_BACKOFF * (attempt + 1))
+                continue
+            raise BiblicalAIService.error_for_status(response.status_code, response.headers.get('Retry-After'))
+
+    @staticmethod
+    def ask_bible_cached(question, language='fr'):
+        """Comme ``ask_bible`` mais via le cache de réponses : retourne (réponse, depuis_le_cache)."""
+        key = answer_cache.make_key(question, language)
+        return answer_cache.get_or_fetch_sync(key, lambda: BiblicalAIService.ask_bible(question, language))
+
+    @staticmethod
+    def request_daily_rhema(date=None):
+        """
+        Demande à Gemini un Rhema du jour complet (Titre, Verset, Contenu, Méditation).
+
+        Retourne le dict décodé ; lève AIServiceError (avec ``status_code`` et
+        ``retry_after`` si Gemini a répondu) pour que l'appelant puisse temporiser.
+        """
+        if not settings.GEMINI_API_KEY:
+            raise AIServiceError("Erreur de configuration : La clé API Google Gemini est manquante.")
+
+        day = f"pour le {date.isoformat()}" if date else "pour aujourd'hui"
         prompt = (
-            "Tu es un pasteur inspiré. Génère le 'Rhema du Jour' pour aujourd'hui. "
+            f"Tu es un pasteur inspiré. Génère le 'Rhema du Jour' {day}. "
             "Réponds UNIQUEMENT avec un objet JSON au format suivant : "
             "{"
             "  \"title\": \"Titre inspirant\", "
@@ -103,30 +284,32 @@ class BiblicalAIService:
             "}"
             "Le contenu doit être profond, encourageant et spirituel."
         )
+        payload = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": {
+                "temperature": 0.8,
+                "maxOutputTokens": 1024,
+                "responseMimeType": "application/json"
+            }
+        }
 
         try:
-            if not settings.GEMINI_API_KEY:
-                return None
-
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-flash-latest:generateContent?key={settings.GEMINI_API_KEY}"
-            
-            payload = {
-                "contents": [{"parts": [{"text": prompt}]}],
-                "generationConfig": {
-                    "temperature": 0.8,
-                    "maxOutputTokens": 1024,
-                    "responseMimeType": "application/json"
-                }
-            }
-            
-            response = requests.post(url, json=payload, timeout=30)
-            if response.status_code == 200:
-                data = response.json()
-                if 'candidates' in data and len(data['candidates']) > 0:
-                    import json
-                    text = data['candidates'][0]['content']['parts'][0]['text']
-                    return json.loads(text)
-            return None
-        except Exception as e:
-            print(f"Error generating AI Rhema: {e}")
+            response = get_client().post(gemini_url(), json=payload, headers=gemini_headers())
+        except httpx.HTTPError as exc:
+            raise AIServiceError(f"Gemini injoignable : {exc}") from exc
+        if response.status_code != 200:
+            raise BiblicalAIService.error_for_status(response.status_code, response.headers.get('Retry-After'))
+
+        try:
+            return json.loads(BiblicalAIService.extract_answer(response.json()))
+        except ValueError as exc:
+            raise AIServiceError(f"Rhema illisible : {exc}") from exc
+
+    @staticmethod
+    def generate_daily_rhema(date=None):
+        """Comme ``request_daily_rhema`` mais retourne None en cas d'échec."""
+        try:
+            return BiblicalAIService.request_daily_rhema(date)
+        except AIServiceError as e:
+            logger.error(f"Error generating AI Rhema: {e}")
             return None
@@ -0,0 +1,367 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import httpx
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from cyprus_api.exceptions import AIServiceError
+from .cache import answer_cache, normalize_question
+from .models import AIConsultation
+from .services import BiblicalAIService, get_client
+
+User = get_user_model()
+
+
+def gemini_answer(text, finish_reason='STOP'):
+    return {'candidates': [{'content': {'parts': [{'text': text}]}, 'finishReason': finish_reason}]}
+
+
+class FakeGeminiServer:
+    """Serveur HTTP local imitant l'API Gemini : réponses scriptées, requêtes enregistrées."""
+
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        self.delay = 0
+        self.chunk_delay = 0
+        self.aborted = threading.Event()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                fake.requests.append({'path': self.path, 'headers': dict(self.headers), 'json': json.loads(body)})
+                if fake.delay:
+                    time.sleep(fake.delay)
+                if 'alt=sse' in self.path:
+                    return self.stream(fake.responses.pop(0) if fake.responses else [gemini_answer('Amen')])
+                status, payload = fake.responses.pop(0) if fake.responses else (200, gemini_answer('Amen'))
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def stream(self, chunks):
+                self.close_connection = True
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.end_headers()
+                try:
+                    for chunk in chunks:
+                        self.wfile.write(f'data: {json.dumps(chunk)}\r\n\r\n'.encode())
+                        self.wfile.flush()
+                        time.sleep(fake.chunk_delay)
+                except (BrokenPipeError, ConnectionResetError):
+                    fake.aborted.set()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server.server_address[1]}/v1beta'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class GeminiTestMixin:
+    def setUp(self):
+        super().setUp()
+        self.gemini = FakeGeminiServer().__enter__()
+        self.addCleanup(self.gemini.__exit__)
+        settings_override = override_settings(
+            GEMINI_API_BASE=self.gemini.base_url, GEMINI_API_KEY='test-key',
+            GEMINI_MODEL='gemini-flash-latest', GEMINI_RETRY_BACKOFF=0, GEMINI_MAX_RETRIES=3,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        answer_cache.clear()
+        self.addCleanup(answer_cache.clear)
+        cache.clear()  # compteurs de limite de débit
+
+
+class AsyncGeminiClientTests(GeminiTestMixin, SimpleTestCase):
+    def test_answer_and_request_shape(self):
+        self.gemini.responses.append((200, gemini_answer('Jean 3:16')))
+        answer = BiblicalAIService.ask_bible('Qui est Jésus ?', 'en')
+        self.assertEqual(answer, 'Jean 3:16')
+
+        sent = self.gemini.requests[0]
+        self.assertEqual(sent['path'], '/v1beta/models/gemini-flash-latest:generateContent')
+        self.assertEqual(sent['headers']['x-goog-api-key'], 'test-key')
+        self.assertIn('Answer in English', sent['json']['contents'][0]['parts'][0]['text'])
+
+    def test_rate_limit_is_retried(self):
+        self.gemini.responses += [(429, {}), (503, {}), (200, gemini_answer('Paix'))]
+        self.assertEqual(BiblicalAIService.ask_bible('Question'), 'Paix')
+        self.assertEqual(len(self.gemini.requests), 3)
+
+    def test_exhausted_retries_raise(self):
+        self.gemini.responses += [(429, {})] * 3
+        with self.assertRaisesMessage(AIServiceError, 'limite de quota'):
+            BiblicalAIService.ask_bible('Question')
+
+    def test_truncated_answer_is_flagged(self):
+        self.gemini.responses.append((200, gemini_answer('Début', finish_reason='MAX_TOKENS')))
+        self.assertIn('interrompue (MAX_TOKENS)', BiblicalAIService.ask_bible('Question'))
+
+    def test_concurrent_questions_do_not_block_each_other(self):
+        self.gemini.delay = 0.3
+
+        async def ask_many():
+            return await asyncio.gather(*(BiblicalAIService.aask_bible(f'Q{i}') for i in range(5)))
+
+        started = time.perf_counter()
+        answers = asyncio.run(ask_many())
+        self.assertEqual(answers, ['Amen'] * 5)
+        self.assertLess(time.perf_counter() - started, 1.2)
+
+
+class DailyRhemaRequestTests(GeminiTestMixin, SimpleTestCase):
+    def test_rhema_requests_use_the_shared_client(self):
+        rhema = {'title': 'Paix', 'verse': 'Jean 14:27', 'content': '...', 'meditation': '...'}
+        self.gemini.responses += [(200, gemini_answer(json.dumps(rhema)))] * 2
+        with mock.patch('ai_assistant.services.get_client', wraps=get_client) as client:
+            for _ in range(2):
+                self.assertEqual(BiblicalAIService.request_daily_rhema(), rhema)
+        self.assertEqual(client.call_count, 2)
+        self.assertEqual(self.gemini.requests[0]['headers']['x-goog-api-key'], 'test-key')
+
+    def test_unreachable_gemini_raises_a_service_error(self):
+        with override_settings(GEMINI_API_BASE='http://127.0.0.1:9/v1beta'):
+            with self.assertRaises(AIServiceError) as raised:
+                BiblicalAIService.request_daily_rhema()
+        self.assertIsInstance(raised.exception.__cause__, httpx.HTTPError)
+
+
+class AnswerCacheTests(GeminiTestMixin, SimpleTestCase):
+    def test_normalization(self):
+        self.assertEqual(
+            normalize_question('  Que dit la BIBLE sur le pardon ?! '),
+            normalize_question('que dit la bible sur le  pardon'),
+        )
+        self.assertEqual(normalize_question("L'Éternel, mon berger..."), 'l eternel mon berger')
+
+    def test_repeat_question_hits_cache_per_language(self):
+        ask = BiblicalAIService.aask_bible_cached
+        self.assertEqual(asyncio.run(ask('Le pardon ?', 'fr')), ('Amen', False))
+        self.assertEqual(asyncio.run(ask('le PARDON', 'fr')), ('Amen', True))
+        self.assertEqual(asyncio.run(ask('le pardon', 'en')), ('Amen', False))
+        self.assertEqual(len(self.gemini.requests), 2)
+
+    def test_errors_are_not_cached(self):
+        self.gemini.responses += [(400, {}), (200, gemini_answer('Grâce'))]
+        with self.assertRaises(AIServiceError):
+            asyncio.run(BiblicalAIService.aask_bible_cached('La grâce'))
+        self.assertEqual(asyncio.run(BiblicalAIService.aask_bible_cached('La grâce')), ('Grâce', False))
+
+    @override_settings(AI_ANSWER_CACHE_TTL=60, AI_ANSWER_CACHE_SIZE=2)
+    def test_lru_eviction(self):
+        answer_cache.set('a', 1)
+        answer_cache.set('b', 2)
+        answer_cache.get('a')
+        answer_cache.set('c', 3)
+        self.assertIsNone(answer_cache.get('b'))
+        self.assertEqual((answer_cache.get('a'), answer_cache.get('c')), (1, 3))
+
+    @override_settings(AI_ANSWER_CACHE_TTL=60)
+    def test_ttl_expiry(self):
+        answer_cache.set('a', 1)
+        with mock.patch('ai_assistant.cache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(answer_cache.get('a'))
+
+    def test_inflight_requests_are_coalesced(self):
+        self.gemini.delay = 0.2
+
+        async def ask_many():
+            return await asyncio.gather(*(
+                BiblicalAIService.aask_bible_cached('Qui est Jésus ?') for _ in range(5)
+            ))
+
+        results = asyncio.run(ask_many())
+        self.assertEqual(len(self.gemini.requests), 1)
+        self.assertEqual(sorted(from_cache for _, from_cache in results), [False, True, True, True, True])
+
+    def test_inflight_requests_are_coalesced_across_threads(self):
+        self.gemini.delay = 0.2
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: BiblicalAIService.ask_bible_cached('Qui est Jésus ?'), range(5)))
+        self.assertEqual(len(self.gemini.requests), 1)
+        self.assertEqual(sorted(from_cache for _, from_cache in results), [False, True, True, True, True])
+
+    def test_inflight_errors_reach_every_thread(self):
+        self.gemini.delay = 0.2
+        self.gemini.responses += [(400, {})]
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(BiblicalAIService.ask_bible_cached, 'Qui est Jésus ?') for _ in range(3)]
+        self.assertTrue(all(isinstance(future.exception(), AIServiceError) for future in futures))
+        self.assertEqual(len(self.gemini.requests), 1)
+
+
+class AskAIViewTests(GeminiTestMixin, APITestCase):
+    def test_anonymous_question_is_saved(self):
+        self.gemini.responses.append((200, gemini_answer('Dieu est amour')))
+        response = self.client.post('/api/ai/ask/', {'question': 'Qui est Dieu ?', 'language': 'fr'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['answer'], 'Dieu est amour')
+        self.assertIsNone(AIConsultation.objects.get().user)
+
+    def test_authenticated_question_is_linked_to_user(self):
+        user = User.objects.create(username='membre')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        response = self.client.post('/api/ai/ask/', {'question': 'Prière ?'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AIConsultation.objects.get().user, user)
+
+    def test_invalid_token_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        response = self.client.post('/api/ai/ask/', {'question': 'Prière ?'}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_service_error_is_not_saved(self):
+        self.gemini.responses += [(500, {})] * 3
+        response = self.client.post('/api/ai/ask/', {'question': 'Prière ?'}, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(AIConsultation.objects.exists())
+
+    def test_repeat_question_is_recorded_as_cache_hit(self):
+        for _ in range(2):
+            response = self.client.post('/api/ai/ask/', {'question': 'Le pardon ?'}, format='json')
+            self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['from_cache'])
+        self.assertEqual(len(self.gemini.requests), 1)
+        self.assertEqual(
+            list(AIConsultation.objects.order_by('id').values_list('from_cache', flat=True)), [False, True]
+        )
+
+    def test_missing_question(self):
+        response = self.client.post('/api/ai/ask/', {}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('question', response.json())
+
+    def test_wsgi_requests_share_the_sync_client(self):
+        with mock.patch('ai_assistant.services.httpx.AsyncClient') as async_client:
+            for question in ('Le pardon ?', 'La grâce ?'):
+                self.assertEqual(self.client.post('/api/ai/ask/', {'question': question}, format='json').status_code, 200)
+        async_client.assert_not_called()
+        self.assertEqual(len(self.gemini.requests), 2)
+
+    @override_settings(AI_ASK_THROTTLE_RATE='2/m')
+    def test_questions_are_throttled(self):
+        for _ in range(2):
+            self.assertEqual(self.client.post('/api/ai/ask/', {'question': 'Paix ?'}, format='json').status_code, 200)
+        response = self.client.post('/api/ai/ask/', {'question': 'Paix ?'}, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(AIConsultation.objects.count(), 2)
+
+
+class AskAIStreamTests(GeminiTestMixin, TestCase):
+    url = '/api/ai/ask/stream/'
+
+    def events(self, body):
+        events = []
+        for block in body.decode().strip().split('\n\n'):
+            name, data = block.split('\n')
+            events.append((name.removeprefix('event: '), json.loads(data.removeprefix('data: '))))
+        return events
+
+    async def post_stream(self, question):
+        response = await self.async_client.post(self.url, {'question': question}, content_type='application/json')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return self.events(b''.join([chunk async for chunk in response.streaming_content]))
+
+    async def test_chunks_then_saved_consultation(self):
+        self.gemini.responses.append([gemini_answer('Dieu '), gemini_answer('est '), gemini_answer('amour')])
+        events = await self.post_stream('Qui est Dieu ?')
+        self.assertEqual([name for name, _ in events], ['chunk', 'chunk', 'chunk', 'done'])
+        self.assertEqual(events[-1][1]['answer'], 'Dieu est amour')
+        self.assertIn('alt=sse', self.gemini.requests[0]['path'])
+        self.assertTrue(await AIConsultation.objects.filter(answer='Dieu est amour', from_cache=False).aexists())
+
+        # Même question : servie depuis le cache en un seul fragment
+        events = await self.post_stream('qui est DIEU')
+        self.assertEqual(events[0], ('chunk', {'text': 'Dieu est amour'}))
+        self.assertTrue(events[-1][1]['from_cache'])
+        self.assertEqual(len(self.gemini.requests), 1)
+
+    async def test_identical_streams_share_one_upstream_call(self):
+        self.gemini.chunk_delay = 0.1
+        self.gemini.responses.append([gemini_answer('Dieu '), gemini_answer('est '), gemini_answer('amour')])
+        results = await asyncio.gather(self.post_stream('Qui est Dieu ?'), self.post_stream('qui est DIEU'))
+        self.assertEqual(len(self.gemini.requests), 1)
+        # L'une relaie le flux, l'autre reçoit la réponse complète en un fragment
+        second, first = sorted(results, key=len)
+        self.assertEqual([name for name, _ in first], ['chunk', 'chunk', 'chunk', 'done'])
+        self.assertEqual(second[0], ('chunk', {'text': 'Dieu est amour'}))
+        self.assertTrue(second[-1][1]['from_cache'])
+
+    async def test_upstream_error_is_reported(self):
+        self.gemini.responses += [[{'candidates': []}]]
+        events = await self.post_stream('Question')
+        self.assertEqual(events[0][0], 'error')
+        self.assertFalse(await AIConsultation.objects.aexists())
+
+
+class DisconnectTests(GeminiTestMixin, SimpleTestCase):
+    url = '/api/ai/ask/stream/'
+
+    def test_client_disconnect_cancels_upstream(self):
+        from cyprus_api.asgi import application
+
+        self.gemini.chunk_delay = 0.2
+        self.gemini.responses.append([gemini_answer(f'mot{i} ') for i in range(50)])
+        body = json.dumps({'question': 'Longue réponse'}).encode()
+        sent = []
+
+        async def run():
+            disconnect = asyncio.Event()
+            messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+                if message['type'] == 'http.response.body' and b'event: chunk' in message.get('body', b''):
+                    disconnect.set()
+
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+                'scheme': 'http', 'path': self.url, 'raw_path': self.url.encode(), 'query_string': b'',
+                'root_path': '', 'headers': [(b'content-type', b'application/json'), (b'host', b'testserver')],
+                'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+            }
+            await asyncio.wait_for(application(scope, receive, send), timeout=5)
+
+        started = time.perf_counter()
+        asyncio.run(run())
+        self.assertLess(time.perf_counter() - started, 3)
+        chunks = [m for m in sent if m['type'] == 'http.response.body' and b'event: chunk' in m.get('body', b'')]
+        self.assertLessEqual(len(chunks), 2)
+        self.assertTrue(self.gemini.aborted.wait(timeout=2))
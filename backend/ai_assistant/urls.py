@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import AskAIView
+from .views import AskAIStreamView, AskAIView
 
 urlpatterns = [
     path('ask/', AskAIView.as_view(), name='ai_ask'),
+    path('ask/stream/', AskAIStreamView.as_view(), name='ai_ask_stream'),
 ]
@@ -1,23 +1,175 @@
-from rest_framework import views, status, permissions
-from rest_framework.response import Response
+import asyncio
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from cyprus_api.exceptions import AIServiceError
+from cyprus_api.streaming import (
+    disconnected_event, is_asgi, queued_until_done, sse_event, until_disconnected,
+)
+from users.authentication import CachedJWTAuthentication
+from .cache import answer_cache
 from .serializers import AIConsultationSerializer
 from .services import BiblicalAIService
 
-class AskAIView(views.APIView):
-    permission_classes = [permissions.AllowAny] # Open for all as requested
-
-    def post(self, request):
-        serializer = AIConsultationSerializer(data=request.data, context={'request': request})
-        if serializer.is_valid():
-            question = serializer.validated_data.get('question')
-            language = request.data.get('language', 'fr') # Default to French
-            
-            # Call the AI service
-            answer = BiblicalAIService.ask_bible(question, language)
-            
-            # Save the consultation to history
-            user = request.user if request.user.is_authenticated else None
-            serializer.save(user=user, answer=answer)
-            
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class AskAIThrottle(SimpleRateThrottle):
+    """Limite AI_ASK_THROTTLE_RATE par utilisateur (ou par adresse IP pour un anonyme)."""
+    scope = 'ai_ask'
+
+    def get_rate(self):
+        return settings.AI_ASK_THROTTLE_RATE
+
+    def get_cache_key(self, request, view):
+        user = request.user
+        ident = user.pk if user.is_authenticated else self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class AskAIView(View):
+    """
+    Vue asynchrone : sous ASGI (SERVER_MODE=asgi), l'attente de Gemini ne
+    bloque aucun worker. Sous WSGI, la question passe par le client HTTP
+    synchrone partagé (services.get_client). Ouverte à tous, avec une limite
+    de débit ; un jeton JWT valide rattache la consultation à l'utilisateur.
+    """
+    http_method_names = ['post', 'options']
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Authentification par JWT (pas de cookie de session) : pas de CSRF, comme les vues DRF
+        view.csrf_exempt = True
+        return view
+
+    def authenticate(self, request):
+        """Utilisateur (ou None) et délai d'attente si la limite de débit est atteinte."""
+        result = CachedJWTAuthentication().authenticate(request)
+        request.user = result[0] if result else AnonymousUser()
+        throttle = AskAIThrottle()
+        wait = None if throttle.allow_request(request, self) else throttle.wait()
+        return result[0] if result else None, wait
+
+    async def parse_question(self, request):
+        """Retourne (utilisateur, serializer validé, langue) ou une réponse d'erreur."""
+        try:
+            user, wait = await sync_to_async(self.authenticate)(request)
+        except (AuthenticationFailed, InvalidToken) as exc:
+            return JsonResponse({'error': str(exc.detail)}, status=401)
+        if wait is not None:
+            response = JsonResponse({'error': "Trop de questions. Veuillez réessayer dans quelques instants."}, status=429)
+            response['Retry-After'] = str(math.ceil(wait))
+            return response
+
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({'error': 'JSON invalide'}, status=400)
+
+        serializer = AIConsultationSerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+
+        return user, serializer, data.get('language', 'fr')  # Default to French
+
+    async def post(self, request):
+        parsed = await self.parse_question(request)
+        if isinstance(parsed, JsonResponse):
+            return parsed
+        user, serializer, language = parsed
+        question = serializer.validated_data.get('question')
+
+        try:
+            if is_asgi(request):
+                answer, from_cache = await BiblicalAIService.aask_bible_cached(question, language)
+            else:
+                answer, from_cache = await sync_to_async(BiblicalAIService.ask_bible_cached)(question, language)
+        except AIServiceError as exc:
+            return JsonResponse({'error': str(exc)}, status=503)
+
+        # Save the consultation to history
+        await sync_to_async(serializer.save)(user=user, answer=answer, from_cache=from_cache)
+        return JsonResponse(serializer.data, status=200)
+
+
+class AskAIStreamView(AskAIView):
+    """
+    Réponse de l'IA en Server-Sent Events, fragment par fragment :
+        event: chunk  data: {"text": "..."}
+        event: done   data: {consultation enregistrée}
+        event: error  data: {"error": "..."}
+    La consultation n'est enregistrée qu'une fois le flux terminé ; si le client
+    se déconnecte, la requête vers Gemini est annulée. Nécessite SERVER_MODE=asgi
+    pour un vrai flux : sous WSGI, la réponse complète est envoyée en un fragment.
+    """
+
+    async def post(self, request):
+        parsed = await self.parse_question(request)
+        if isinstance(parsed, JsonResponse):
+            return parsed
+        user, serializer, language = parsed
+
+        response = StreamingHttpResponse(
+            self.stream(request, user, serializer, language), content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # pas de mise en tampon par nginx
+        return response
+
+    async def stream(self, request, user, serializer, language):
+        question = serializer.validated_data.get('question')
+        disconnected = disconnected_event(request)
+        key = answer_cache.make_key(question, language)
+        answer = answer_cache.get(key)
+        from_cache = answer is not None
+
+        if from_cache:
+            yield sse_event('chunk', {'text': answer})
+        elif not is_asgi(request):
+            # WSGI : réponse mise en tampon de toute façon, client synchrone partagé
+            try:
+                answer, _ = await sync_to_async(BiblicalAIService.ask_bible_cached)(question, language)
+            except AIServiceError as exc:
+                yield sse_event('error', {'error': str(exc)})
+                return
+            yield sse_event('chunk', {'text': answer})
+        else:
+            # Le flux passe par get_or_fetch : une question identique déjà en cours
+            # n'ouvre pas un second appel, elle en reçoit la réponse en un fragment
+            chunks = asyncio.Queue()
+
+            async def fetch():
+                parts = []
+                source = BiblicalAIService.astream_bible(question, language)
+                async for text in until_disconnected(source, disconnected):
+                    parts.append(text)
+                    chunks.put_nowait(text)
+                if disconnected is not None and disconnected.is_set():
+                    # Réponse partielle : ni mise en cache, ni transmise aux autres demandeurs
+                    raise AIServiceError("La réponse a été interrompue. Veuillez réessayer.")
+                return ''.join(parts)
+
+            fetching = asyncio.ensure_future(answer_cache.get_or_fetch(key, fetch))
+            try:
+                async for text in queued_until_done(chunks, fetching):
+                    yield sse_event('chunk', {'text': text})
+                answer, from_cache = fetching.result()
+            except AIServiceError as exc:
+                if disconnected is None or not disconnected.is_set():
+                    yield sse_event('error', {'error': str(exc)})
+                return
+            finally:
+                fetching.cancel()
+            if from_cache:
+                yield sse_event('chunk', {'text': answer})
+
+        await sync_to_async(serializer.save)(user=user, answer=answer, from_cache=from_cache)
+        yield sse_event('done', serializer.data)
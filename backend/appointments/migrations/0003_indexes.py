@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('appointments', '0002_appointment_location_appointment_message_to_member_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='appointment',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Rendez-vous', 'verbose_name_plural': 'Rendez-vous'},
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['pastor', 'requested_date', 'requested_time'], name='appt_pastor_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['member', '-created_at'], name='appt_member_created_idx'),
+        ),
+        # Index composites créés avant de retirer les index simples des FK (exigé par MySQL)
+        migrations.AlterField(
+            model_name='appointment',
+            name='member',
+            field=models.ForeignKey(db_index=False, limit_choices_to={'role': 'MEMBER'}, on_delete=django.db.models.deletion.CASCADE, related_name='appointments_as_member', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='appointment',
+            name='pastor',
+            field=models.ForeignKey(db_index=False, limit_choices_to={'role': 'PASTOR'}, on_delete=django.db.models.deletion.CASCADE, related_name='appointments_as_pastor', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
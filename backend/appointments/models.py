@@ -60,13 +60,15 @@ class Appointment(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name='appointments_as_member',
-        limit_choices_to={'role': 'MEMBER'}
+        limit_choices_to={'role': 'MEMBER'},
+        db_index=False  # couvert par appt_member_created_idx
     )
     pastor = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name='appointments_as_pastor',
-        limit_choices_to={'role': 'PASTOR'}
+        limit_choices_to={'role': 'PASTOR'},
+        db_index=False  # couvert par appt_pastor_slot_idx
     )
     
     requested_date = models.DateField(_('Date souhaitée'))
@@ -94,6 +96,12 @@ class Appointment(models.Model):
         verbose_name = _('Rendez-vous')
         verbose_name_plural = _('Rendez-vous')
         ordering = ['-created_at']
+        indexes = [
+            # Agenda du pasteur (créneaux par date/heure)
+            models.Index(fields=['pastor', 'requested_date', 'requested_time'], name='appt_pastor_slot_idx'),
+            # Liste « mes rendez-vous » du membre
+            models.Index(fields=['member', '-created_at'], name='appt_member_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.member.username} avec {self.pastor.username} - {self.requested_date}"
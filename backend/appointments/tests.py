@@ -1,3 +1,33 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.core import mail
+from rest_framework.test import APITestCase
+
+from outbox.models import OutgoingEmail
+from users.models import User
+from .models import Appointment
+
+
+class AppointmentConfirmationTests(APITestCase):
+    def setUp(self):
+        self.pastor = User.objects.create_user(
+            username='pasteur', email='pasteur@example.com', password='x', role=User.Role.PASTOR
+        )
+        self.member = User.objects.create_user(username='membre', email='membre@example.com', password='x')
+        self.appointment = Appointment.objects.create(
+            member=self.member, pastor=self.pastor, subject='Prière',
+            requested_date=datetime.date.today() + datetime.timedelta(days=3), requested_time=datetime.time(10)
+        )
+
+    def test_confirmation_email_is_queued(self):
+        self.client.force_authenticate(self.pastor)
+        response = self.client.patch(
+            f'/api/appointments/{self.appointment.id}/', {'status': 'CONFIRMED', 'location': 'Église'}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        # Mis en file, pas envoyé pendant la requête
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.to, ['membre@example.com'])
+        self.assertIn('Église', email.body)
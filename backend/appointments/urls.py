@@ -3,7 +3,8 @@ from .views import (
     PastorAvailabilityListView,
     PastorAvailabilityDetailView,
     AppointmentListCreateView,
-    AppointmentDetailView
+    AppointmentDetailView,
+    AppointmentExportView
 )
 
 app_name = 'appointments'
@@ -15,5 +16,6 @@ urlpatterns = [
     
     # Appointments
     path('', AppointmentListCreateView.as_view(), name='appointment-list'),
+    path('export/', AppointmentExportView.as_view(), name='appointment-export'),
     path('<int:pk>/', AppointmentDetailView.as_view(), name='appointment-detail'),
 ]
@@ -1,17 +1,18 @@
-from django.core.mail import send_mail
 from django.conf import settings
 import logging
 
+from outbox.services import Outbox
+
 logger = logging.getLogger(__name__)
 
 def send_appointment_confirmation_email(appointment):
     """
-    Envoie un email de confirmation au membre avec les détails du rendez-vous.
+    Met en file d'envoi l'email de confirmation au membre avec les détails du rendez-vous.
+    À appeler dans la transaction qui confirme le rendez-vous.
     """
-    try:
-        subject = f"Confirmation de votre rendez-vous - {settings.CHURCH_INFO['name']}"
-        
-        message = f"""
+    subject = f"Confirmation de votre rendez-vous - {settings.CHURCH_INFO['name']}"
+    
+    message = f"""
 Bonjour {appointment.member.first_name or appointment.member.username},
 
 Votre demande de rendez-vous avec le Pasteur {appointment.pastor.get_full_name()} a été confirmée.
@@ -34,19 +35,7 @@ Cordialement,
 {settings.CHURCH_INFO['name']}
 {settings.CHURCH_INFO['website']}
 """
-        
-        recipient_list = [appointment.member.email]
-        
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            recipient_list,
-            fail_silently=False,
-        )
-        logger.info(f"Email de confirmation envoyé à {appointment.member.email} pour le RDV {appointment.id}")
-        return True
     
-    except Exception as e:
-        logger.error(f"Erreur lors de l'envoi de l'email de confirmation pour le RDV {appointment.id}: {str(e)}")
-        return False
+    Outbox.enqueue(subject, message, [appointment.member.email])
+    logger.info(f"Email de confirmation mis en file pour {appointment.member.email} (RDV {appointment.id})")
+    return True
@@ -2,10 +2,12 @@ from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Q
 from .models import Appointment, PastorAvailability
 from .serializers import AppointmentSerializer, AppointmentUpdateSerializer, PastorAvailabilitySerializer
 from users.permissions import IsPastorOrAdmin, IsMember, IsOwnerOrAdmin
+from cyprus_api.exports import StreamingExportMixin
 
 User = get_user_model()
 
@@ -75,16 +77,9 @@ class PastorAvailabilityDetailView(generics.RetrieveUpdateDestroyAPIView):
         return super().destroy(request, *args, **kwargs)
 
 
-class AppointmentListCreateView(generics.ListCreateAPIView):
-    """
-    Liste et création de rendez-vous.
-    GET: Membres voient leurs RDV, Pasteurs voient tous les RDV
-    POST: Membres peuvent créer des RDV
-    """
-    serializer_class = AppointmentSerializer
-    permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None
-    
+class AppointmentScopeMixin:
+    """Rendez-vous visibles : membre -> ses RDV, pasteur -> ses RDV, admin -> tout."""
+
     def get_queryset(self):
         user = self.request.user
         
@@ -97,6 +92,17 @@ class AppointmentListCreateView(generics.ListCreateAPIView):
         # Admin voit tout
         else:
             return Appointment.objects.all()
+
+
+class AppointmentListCreateView(AppointmentScopeMixin, generics.ListCreateAPIView):
+    """
+    Liste et création de rendez-vous.
+    GET: Membres voient leurs RDV, Pasteurs voient tous les RDV
+    POST: Membres peuvent créer des RDV
+    """
+    serializer_class = AppointmentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
     
     def perform_create(self, serializer):
         # Le membre est automatiquement l'utilisateur courant
@@ -113,6 +119,31 @@ class AppointmentListCreateView(generics.ListCreateAPIView):
         return super().create(request, *args, **kwargs)
 
 
+class AppointmentExportView(AppointmentScopeMixin, StreamingExportMixin, generics.GenericAPIView):
+    """
+    Export en flux des rendez-vous visibles par l'utilisateur (?output=csv|jsonl).
+    Même périmètre que la liste : membre -> ses RDV, pasteur -> ses RDV, admin -> tout.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    export_filename = 'appointments'
+    export_select_related = ('member', 'pastor')
+    export_fields = (
+        ('date', 'Date', 'requested_date'),
+        ('time', 'Heure', 'requested_time'),
+        ('member', 'Membre', lambda a: a.member.get_full_name() or a.member.username),
+        ('member_email', 'Email du membre', 'member.email'),
+        ('pastor', 'Pasteur', lambda a: a.pastor.get_full_name() or a.pastor.username),
+        ('subject', 'Sujet', 'subject'),
+        ('status', 'Statut', 'status'),
+        ('location', 'Lieu / Lien', 'location'),
+        ('created_at', 'Créé le', 'created_at'),
+    )
+
+    def get(self, request):
+        return self.export_response(request)
+
+
 class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     Détails d'un rendez-vous.
@@ -154,19 +185,18 @@ class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
         
         # Pasteur peut modifier le statut et les notes
         elif user.role == 'PASTOR':
-            response = super().update(request, *args, **kwargs)
-            
-            # Si le statut passe à CONFIRMED, envoyer un email
-            if response.status_code == status.HTTP_200_OK and request.data.get('status') == 'CONFIRMED':
-                try:
+            # L'email est mis en file dans la même transaction que la confirmation
+            with transaction.atomic():
+                response = super().update(request, *args, **kwargs)
+
+                # Si le statut passe à CONFIRMED, envoyer un email
+                if response.status_code == status.HTTP_200_OK and request.data.get('status') == 'CONFIRMED':
                     # Recharger l'objet pour avoir les données à jour (location, message...)
                     appointment.refresh_from_db()
                     # Import ici pour éviter les imports circulaires
                     from .utils import send_appointment_confirmation_email
                     send_appointment_confirmation_email(appointment)
-                except Exception as e:
-                    print(f"Erreur envoi email: {e}")
-            
+
             return response
         
         # Admin peut tout faire
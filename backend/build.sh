@@ -12,6 +12,12 @@ python manage.py collectstatic --no-input
 # Run migrations
 python manage.py migrate
 
+# Initialize dashboard time-series rollups (no-op once populated)
+python manage.py backfill_rollups --if-empty
+
+# Build the search index (no-op once populated)
+python manage.py rebuild_search_index --if-empty
+
 # Create/Update superuser
 echo "Running admin setup..."
 python setup_admin.py
@@ -1,3 +1,16 @@
 from django.contrib import admin
+from .models import Conversation, Message
 
-# Register your models here.
+
+@admin.register(Message)
+class MessageAdmin(admin.ModelAdmin):
+    list_display = ('sender', 'receiver', 'appointment', 'timestamp', 'is_read')
+    list_filter = ('is_read',)
+    raw_id_fields = ('sender', 'receiver', 'appointment')
+
+
+@admin.register(Conversation)
+class ConversationAdmin(admin.ModelAdmin):
+    list_display = ('key', 'first_user', 'second_user', 'last_message_at', 'first_unread', 'second_unread')
+    readonly_fields = ('first_user', 'second_user', 'appointment', 'last_message', 'last_message_at',
+                       'first_unread', 'second_unread')
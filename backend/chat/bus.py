@@ -0,0 +1,116 @@
+"""
+Notification des nouveaux messages, sans broker externe.
+
+Chaque abonné (WebSocket ou requête long-poll) attend un ``asyncio.Event``
+associé à la clé de sa conversation. ``publish`` le lève immédiatement pour les
+abonnés du même processus. Pour les autres processus (plusieurs workers
+uvicorn), un seul poller par boucle d'événements relit la table des messages
+toutes les CHAT_POLL_INTERVAL secondes : une requête pour toutes les
+conversations suivies, chacune à partir du plus petit ``after_id`` de ses
+abonnés. Le poller ne tient pas son propre curseur : un message dont
+l'identifiant est inférieur à un autre déjà lu mais validé après lui n'est pas
+perdu. Les abonnés relisent ensuite eux-mêmes les messages ``id > after_id``.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def conversation_key(user_id, other_id, appointment_id=None):
+    if appointment_id:
+        return f'appointment:{appointment_id}'
+    low, high = sorted((user_id, other_id))
+    return f'direct:{low}:{high}'
+
+
+class MessageBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(dict)  # clé -> {(boucle, event): after_id}
+        self._pollers = {}  # boucle -> tâche
+
+    def subscribe(self, key, after_id=0):
+        """Retourne l'Event levé à chaque nouveau message de la conversation ``key`` après ``after_id``."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        with self._lock:
+            self._subscribers[key][(loop, event)] = after_id or 0
+            if loop not in self._pollers:
+                self._pollers[loop] = loop.create_task(self._poll(loop))
+        return event
+
+    def advance(self, key, event, after_id):
+        """Dernier message reçu par un abonné durable (WebSocket) : le poller repart de là."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            subscribers = self._subscribers.get(key)
+            if subscribers is not None and (loop, event) in subscribers:
+                subscribers[(loop, event)] = after_id or 0
+
+    def unsubscribe(self, key, event):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            subscribers = self._subscribers.get(key)
+            if subscribers is not None:
+                subscribers.pop((loop, event), None)
+                if not subscribers:
+                    del self._subscribers[key]
+
+    def publish(self, *keys):
+        """Réveille les abonnés des conversations ``keys`` (appelable depuis n'importe quel thread)."""
+        with self._lock:
+            targets = [target for key in keys for target in self._subscribers.get(key, ())]
+        for loop, event in targets:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # boucle fermée
+
+    def _floors(self, loop):
+        """{clé: plus petit after_id des abonnés de ``loop``} ; sans abonné, le poller s'arrête."""
+        with self._lock:
+            floors = {}
+            for key, targets in self._subscribers.items():
+                for (target_loop, _event), after_id in targets.items():
+                    if target_loop is loop:
+                        floors[key] = min(after_id, floors.get(key, after_id))
+            if not floors:
+                # Retiré sous le verrou : un nouvel abonné relancera un poller
+                self._pollers.pop(loop, None)
+            return floors
+
+    async def _poll(self, loop):
+        from django.db.models import Q
+
+        from .models import Message
+
+        def pending_keys(floors):
+            condition = Q()
+            for key, after_id in floors.items():
+                condition |= Q(conversation__key=key, id__gt=after_id)
+            return set(Message.objects.filter(condition).values_list('conversation__key', flat=True).distinct())
+
+        try:
+            while True:
+                await asyncio.sleep(settings.CHAT_POLL_INTERVAL)
+                floors = self._floors(loop)
+                if not floors:
+                    return
+                keys = await sync_to_async(pending_keys)(floors)
+                if keys:
+                    self.publish(*keys)
+        except Exception:
+            logger.exception("Chat poller stopped")
+        finally:
+            with self._lock:
+                if self._pollers.get(loop) is asyncio.current_task():
+                    del self._pollers[loop]
+
+
+bus = MessageBus()
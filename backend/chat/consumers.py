@@ -0,0 +1,117 @@
+"""
+WebSocket de messagerie (application ASGI brute, routée par cyprus_api/asgi.py).
+
+    ws(s)://<hôte>/ws/chat/?token=<jwt d'accès>&with=<user_id>|appointment=<id>[&after_id=<id>]
+
+Client → serveur : {"content": "..."}
+Serveur → client : {"type": "message", "message": {...}} pour chaque message de
+la conversation (les siens compris), {"type": "error", "error": ...} sinon.
+Les navigateurs ne pouvant pas envoyer d'en-tête Authorization sur un
+WebSocket, le jeton passe dans l'URL.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, PermissionDenied
+
+from users.authentication import CachedJWTAuthentication
+from .bus import bus
+from .serializers import MessageSerializer
+from .services import ChatService
+from .views import conversation_messages, parse_after_id
+
+# Codes de fermeture applicatifs (plage 4000-4999)
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_FORBIDDEN = 4403
+CLOSE_INVALID = 4400
+
+
+def open_channel(params):
+    token = params.get('token')
+    if not token:
+        raise NotAuthenticated()
+    auth = CachedJWTAuthentication()
+    user = auth.get_user(auth.get_validated_token(token))
+    channel = ChatService.resolve(user, params.get('with'), params.get('appointment'))
+    return channel, parse_after_id(params.get('after_id'))
+
+
+def latest_id(channel):
+    return ChatService.messages(channel).order_by('-id').values_list('id', flat=True).first() or 0
+
+
+class ChatConsumer:
+    async def __call__(self, scope, receive, send):
+        message = await receive()
+        if message['type'] != 'websocket.connect':
+            return
+
+        params = {key: values[-1] for key, values in parse_qs(scope['query_string'].decode()).items()}
+        try:
+            channel, after_id = await sync_to_async(open_channel)(params)
+        except APIException as exc:
+            if isinstance(exc, (AuthenticationFailed, NotAuthenticated)):
+                code = CLOSE_UNAUTHORIZED
+            elif isinstance(exc, PermissionDenied):
+                code = CLOSE_FORBIDDEN
+            else:
+                code = CLOSE_INVALID
+            await send({'type': 'websocket.close', 'code': code})
+            return
+
+        await send({'type': 'websocket.accept'})
+        last_id = after_id if after_id is not None else await sync_to_async(latest_id)(channel)
+
+        event = bus.subscribe(channel.key, last_id)
+        incoming = asyncio.ensure_future(receive())
+        wake = asyncio.ensure_future(event.wait())
+        try:
+            last_id = await self.push(send, channel, last_id)
+            bus.advance(channel.key, event, last_id)
+            while True:
+                done, _ = await asyncio.wait({incoming, wake}, return_when=asyncio.FIRST_COMPLETED)
+                if wake in done:
+                    event.clear()
+                    last_id = await self.push(send, channel, last_id)
+                    bus.advance(channel.key, event, last_id)
+                    wake = asyncio.ensure_future(event.wait())
+                if incoming in done:
+                    message = incoming.result()
+                    if message['type'] == 'websocket.disconnect':
+                        return
+                    if message['type'] == 'websocket.receive':
+                        await self.handle(send, channel, message)
+                    incoming = asyncio.ensure_future(receive())
+        finally:
+            incoming.cancel()
+            wake.cancel()
+            bus.unsubscribe(channel.key, event)
+
+    @staticmethod
+    async def push(send, channel, last_id):
+        """Envoie les messages postérieurs à ``last_id`` ; retourne le nouvel identifiant."""
+        def load():
+            messages = conversation_messages(channel, last_id)
+            return messages, MessageSerializer(messages, many=True).data
+
+        messages, data = await sync_to_async(load)()
+        for item in data:
+            await send({'type': 'websocket.send', 'text': json.dumps({'type': 'message', 'message': item})})
+        return messages[-1].id if messages else last_id
+
+    @staticmethod
+    async def handle(send, channel, message):
+        try:
+            payload = json.loads(message.get('text') or message.get('bytes') or b'')
+            content = payload.get('content') if isinstance(payload, dict) else None
+            # Diffusé à tous les abonnés (dont cette connexion) via le bus
+            await sync_to_async(ChatService.send)(channel, content)
+        except ValueError:
+            error = 'JSON invalide'
+        except APIException as exc:
+            error = exc.detail
+        else:
+            return
+        await send({'type': 'websocket.send', 'text': json.dumps({'type': 'error', 'error': error})})
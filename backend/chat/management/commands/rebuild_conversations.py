@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from chat.services import ChatService
+
+
+class Command(BaseCommand):
+    help = "Recalcule les résumés de conversation (dernier message, non lus) depuis les messages"
+
+    def handle(self, *args, **options):
+        count = ChatService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{count} conversations reconstruites."))
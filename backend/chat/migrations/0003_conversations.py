@@ -0,0 +1,98 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_conversations(apps, schema_editor):
+    """Regroupe les messages existants en conversations et calcule les résumés."""
+    Conversation = apps.get_model('chat', 'Conversation')
+    Message = apps.get_model('chat', 'Message')
+    conversations = {}
+    for message in Message.objects.order_by('id').iterator():
+        first, second = sorted((message.sender_id, message.receiver_id))
+        if message.appointment_id:
+            key = f'appointment:{message.appointment_id}'
+        else:
+            key = f'direct:{first}:{second}'
+        conversation = conversations.get(key)
+        if conversation is None:
+            conversation = conversations[key] = Conversation.objects.create(
+                key=key, first_user_id=first, second_user_id=second, appointment_id=message.appointment_id
+            )
+        conversation.last_message_id = message.id
+        conversation.last_message_at = message.timestamp
+        if not message.is_read:
+            if message.receiver_id == conversation.first_user_id:
+                conversation.first_unread += 1
+            else:
+                conversation.second_unread += 1
+        Message.objects.filter(pk=message.pk).update(conversation=conversation)
+    Conversation.objects.bulk_update(
+        conversations.values(), ['last_message', 'last_message_at', 'first_unread', 'second_unread']
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0003_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('chat', '0002_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(editable=False, max_length=64, unique=True)),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('first_unread', models.PositiveIntegerField(default=0)),
+                ('second_unread', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Conversation',
+                'verbose_name_plural': 'Conversations',
+            },
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='appointment',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='conversations', to='appointments.appointment'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='first_user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.message'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='second_user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='conversation',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='chat.conversation'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'id'], name='message_conversation_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['first_user', '-last_message_at', '-id'], name='conversation_first_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['second_user', '-last_message_at', '-id'], name='conversation_second_user_idx'),
+        ),
+        migrations.RunPython(build_conversations, migrations.RunPython.noop),
+    ]
@@ -3,6 +3,67 @@ from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from appointments.models import Appointment
 
+
+class Conversation(models.Model):
+    """
+    Résumé d'une conversation pour la boîte de réception : dernier message et
+    messages non lus de chaque participant, tenus à jour à l'insertion
+    (voir signals.py). ``first_user`` est le participant d'identifiant le plus petit.
+    """
+
+    key = models.CharField(max_length=64, unique=True, editable=False)
+    first_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False  # couvert par conversation_first_user_idx
+    )
+    second_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False  # couvert par conversation_second_user_idx
+    )
+    appointment = models.ForeignKey(
+        Appointment,
+        on_delete=models.CASCADE,
+        related_name='conversations',
+        null=True,
+        blank=True
+    )
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        related_name='+',
+        null=True,
+        blank=True
+    )
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    first_unread = models.PositiveIntegerField(default=0)
+    second_unread = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = _('Conversation')
+        verbose_name_plural = _('Conversations')
+        indexes = [
+            # Boîte de réception d'un participant, conversations les plus récentes d'abord
+            models.Index(fields=['first_user', '-last_message_at', '-id'], name='conversation_first_user_idx'),
+            models.Index(fields=['second_user', '-last_message_at', '-id'], name='conversation_second_user_idx'),
+        ]
+
+    def __str__(self):
+        return self.key
+
+    def unread_field(self, user):
+        return 'first_unread' if user.pk == self.first_user_id else 'second_unread'
+
+    def unread_for(self, user):
+        return getattr(self, self.unread_field(user))
+
+    def other(self, user):
+        return self.second_user if user.pk == self.first_user_id else self.first_user
+
+
 class Message(models.Model):
     """Message entre un pasteur et un membre, potentiellement lié à un rendez-vous"""
     
@@ -14,7 +75,8 @@ class Message(models.Model):
     receiver = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='received_messages'
+        related_name='received_messages',
+        db_index=False  # couvert par message_inbox_idx
     )
     appointment = models.ForeignKey(
         Appointment,
@@ -23,6 +85,15 @@ class Message(models.Model):
         null=True,
         blank=True
     )
+    conversation = models.ForeignKey(
+        Conversation,
+        on_delete=models.CASCADE,
+        related_name='messages',
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=False  # couvert par message_conversation_idx
+    )
     content = models.TextField(_('Contenu'))
     timestamp = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
@@ -31,6 +102,12 @@ class Message(models.Model):
         verbose_name = _('Message')
         verbose_name_plural = _('Messages')
         ordering = ['timestamp']
+        indexes = [
+            # Messages non lus d'un destinataire, par ordre chronologique
+            models.Index(fields=['receiver', 'is_read', 'timestamp'], name='message_inbox_idx'),
+            # Historique d'une conversation paginé par identifiant (keyset)
+            models.Index(fields=['conversation', 'id'], name='message_conversation_idx'),
+        ]
 
     def __str__(self):
         return f"De {self.sender.username} à {self.receiver.username} ({self.timestamp})"
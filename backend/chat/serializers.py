@@ -1,7 +1,12 @@
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from .models import Message
+from .models import Conversation, Message
+from cyprus_api.images import ImageVariantsField
 from users.serializers import UserSerializer
 
+User = get_user_model()
+
+
 class MessageSerializer(serializers.ModelSerializer):
     sender_details = UserSerializer(source='sender', read_only=True)
     receiver_details = UserSerializer(source='receiver', read_only=True)
@@ -19,3 +24,34 @@ class MessageSerializer(serializers.ModelSerializer):
         # The sender is automatically the current user
         validated_data['sender'] = self.context['request'].user
         return super().create(validated_data)
+
+
+class ParticipantSerializer(serializers.ModelSerializer):
+    profile_picture_srcset = ImageVariantsField('profile_picture')
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name', 'role', 'profile_picture', 'profile_picture_srcset']
+
+
+class LastMessageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Message
+        fields = ['id', 'sender', 'content', 'timestamp']
+
+
+class ConversationSerializer(serializers.ModelSerializer):
+    """Entrée de la boîte de réception, vue par l'utilisateur de la requête."""
+    other = serializers.SerializerMethodField()
+    unread = serializers.SerializerMethodField()
+    last_message = LastMessageSerializer(read_only=True)
+
+    class Meta:
+        model = Conversation
+        fields = ['id', 'appointment', 'other', 'last_message', 'last_message_at', 'unread']
+
+    def get_other(self, obj):
+        return ParticipantSerializer(obj.other(self.context['request'].user), context=self.context).data
+
+    def get_unread(self, obj):
+        return obj.unread_for(self.context['request'].user)
@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+
+from appointments.models import Appointment
+from .bus import bus, conversation_key
+from .models import Conversation, Message
+
+User = get_user_model()
+
+STAFF_ROLES = ('PASTOR', 'ADMIN')
+
+
+@dataclass
+class Channel:
+    """Échange entre deux utilisateurs vu par ``user``, éventuellement rattaché à un rendez-vous."""
+    user: object
+    other: object
+    appointment: object = None
+
+    @property
+    def key(self):
+        return conversation_key(self.user.id, self.other.id, self.appointment.id if self.appointment else None)
+
+
+class ChatService:
+    """
+    Couche de service de la messagerie pasteur–membre.
+
+    Une conversation directe doit impliquer un pasteur ou un administrateur ;
+    une conversation de rendez-vous est réservée au membre et au pasteur du RDV.
+    """
+
+    @staticmethod
+    def is_staff(user):
+        return user.role in STAFF_ROLES or user.is_superuser
+
+    @staticmethod
+    def resolve(user, other_id=None, appointment_id=None):
+        """Retourne le ``Channel`` demandé ou lève une erreur DRF (400/403/404)."""
+        def as_id(value, name):
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                raise ValidationError({name: "Identifiant invalide."})
+
+        if appointment_id:
+            appointment = Appointment.objects.filter(pk=as_id(appointment_id, 'appointment')).first()
+            if appointment is None:
+                raise NotFound("Rendez-vous introuvable.")
+            if user.id == appointment.member_id:
+                other_id = appointment.pastor_id
+            elif user.id == appointment.pastor_id:
+                other_id = appointment.member_id
+            else:
+                raise PermissionDenied("Vous ne participez pas à ce rendez-vous.")
+            return Channel(user, User.objects.get(pk=other_id), appointment)
+
+        if not other_id:
+            raise ValidationError({'with': "Précisez l'interlocuteur (with) ou le rendez-vous (appointment)."})
+        other = User.objects.filter(pk=as_id(other_id, 'with'), is_active=True).first()
+        if other is None or other.pk == user.pk:
+            raise NotFound("Interlocuteur introuvable.")
+        if not (ChatService.is_staff(user) or ChatService.is_staff(other)):
+            raise PermissionDenied("La messagerie relie les membres à un pasteur.")
+        return Channel(user, other)
+
+    @staticmethod
+    def messages(channel, after_id=None):
+        queryset = (
+            Message.objects.filter(conversation__key=channel.key)
+            .select_related('sender', 'receiver').order_by('id')
+        )
+        if after_id:
+            queryset = queryset.filter(id__gt=after_id)
+        return queryset
+
+    @staticmethod
+    def send(channel, content):
+        content = (content or '').strip()
+        if not content:
+            raise ValidationError({'content': "Le message est vide."})
+        message = Message.objects.create(
+            sender=channel.user,
+            receiver=channel.other,
+            appointment=channel.appointment,
+            content=content,
+        )
+        # Réveille les abonnés une fois le message visible en base
+        key = channel.key
+        transaction.on_commit(lambda: bus.publish(key))
+        return message
+
+    # --- Boîte de réception -------------------------------------------------
+
+    @staticmethod
+    def inbox(user):
+        return Conversation.objects.filter(
+            Q(first_user=user) | Q(second_user=user)
+        ).select_related('first_user', 'second_user', 'last_message')
+
+    @staticmethod
+    def conversation_for(message):
+        """Conversation du message, créée au premier échange."""
+        first, second = sorted((message.sender_id, message.receiver_id))
+        conversation, _ = Conversation.objects.get_or_create(
+            key=conversation_key(first, second, message.appointment_id),
+            defaults={'first_user_id': first, 'second_user_id': second, 'appointment_id': message.appointment_id},
+        )
+        return conversation
+
+    @staticmethod
+    def unread_field(message):
+        first = min(message.sender_id, message.receiver_id)
+        return 'first_unread' if message.receiver_id == first else 'second_unread'
+
+    @staticmethod
+    def record_message(message):
+        """Met à jour le résumé en un seul UPDATE (sans écraser un message plus récent)."""
+        newer = Q(last_message_id__gt=message.id)
+        changes = {}
+        if not message.is_read:
+            field = ChatService.unread_field(message)
+            changes[field] = F(field) + 1
+        Conversation.objects.filter(pk=message.conversation_id).update(
+            last_message_id=Case(When(newer, then=F('last_message_id')), default=Value(message.id)),
+            last_message_at=Case(When(newer, then=F('last_message_at')), default=Value(message.timestamp)),
+            **changes
+        )
+
+    @staticmethod
+    def forget_message(message):
+        if not message.is_read:
+            field = ChatService.unread_field(message)
+            Conversation.objects.filter(pk=message.conversation_id, **{f'{field}__gt': 0}).update(
+                **{field: F(field) - 1}
+            )
+        # last_message a été remis à NULL par la suppression : on reprend le précédent
+        latest = Message.objects.filter(conversation=OuterRef('pk')).order_by('-id')
+        Conversation.objects.filter(pk=message.conversation_id, last_message__isnull=True).update(
+            last_message=Subquery(latest.values('id')[:1]),
+            last_message_at=Subquery(latest.values('timestamp')[:1]),
+        )
+
+    @staticmethod
+    def mark_read(conversation, user, up_to=None):
+        """
+        Marque comme lus les messages reçus par ``user`` (jusqu'à ``up_to`` inclus)
+        en un seul UPDATE, puis décrémente son compteur d'autant.
+        """
+        messages = Message.objects.filter(conversation=conversation, receiver=user, is_read=False)
+        if up_to:
+            messages = messages.filter(id__lte=up_to)
+        marked = messages.update(is_read=True)
+        if marked:
+            field = conversation.unread_field(user)
+            # Case plutôt que Greatest : F(field) - marked serait évalué (et déborderait)
+            # sur une colonne non signée MySQL avant d'être borné
+            Conversation.objects.filter(pk=conversation.pk).update(
+                **{field: Case(When(**{f'{field}__gte': marked}, then=F(field) - marked), default=Value(0))}
+            )
+        return marked
+
+    @staticmethod
+    def rebuild():
+        """Recalcule tous les résumés depuis les messages (après un bulk_create ou un update())."""
+        for message in Message.objects.filter(conversation__isnull=True).order_by('id').iterator():
+            Message.objects.filter(pk=message.pk).update(conversation=ChatService.conversation_for(message))
+
+        messages = Message.objects.filter(conversation=OuterRef('pk'))
+
+        def unread(user_field):
+            count = (
+                messages.filter(receiver=OuterRef(user_field), is_read=False)
+                .order_by().values('conversation').annotate(total=Count('id')).values('total')
+            )
+            return Coalesce(Subquery(count), 0)
+
+        latest = messages.order_by('-id')
+        return Conversation.objects.update(
+            last_message=Subquery(latest.values('id')[:1]),
+            last_message_at=Subquery(latest.values('timestamp')[:1]),
+            first_unread=unread('first_user'),
+            second_unread=unread('second_user'),
+        )
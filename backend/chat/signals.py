@@ -0,0 +1,30 @@
+"""
+Maintenance du résumé ``Conversation`` à chaque message.
+
+Les handlers s'exécutent dans la transaction de la sauvegarde. Les
+``bulk_create()`` et ``QuerySet.update()`` ne déclenchent pas de signaux ;
+``manage.py rebuild_conversations`` corrige toute dérive.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Message
+from .services import ChatService
+
+
+@receiver(pre_save, sender=Message, dispatch_uid='chat_message_conversation')
+def attach_conversation(sender, instance, **kwargs):
+    if instance._state.adding and instance.conversation_id is None:
+        instance.conversation = ChatService.conversation_for(instance)
+
+
+@receiver(post_save, sender=Message, dispatch_uid='chat_message_saved')
+def message_saved(sender, instance, created, **kwargs):
+    if created:
+        ChatService.record_message(instance)
+
+
+@receiver(post_delete, sender=Message, dispatch_uid='chat_message_deleted')
+def message_deleted(sender, instance, **kwargs):
+    if instance.conversation_id:
+        ChatService.forget_message(instance)
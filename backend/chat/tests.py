@@ -1,3 +1,269 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import json
+import time
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from appointments.models import Appointment
+from users.models import User
+from .models import Conversation, Message
+from .services import Channel, ChatService
+
+
+class ChatUsersMixin:
+    def setUp(self):
+        self.pastor = User.objects.create_user(username='pasteur', password='x', role=User.Role.PASTOR)
+        self.member = User.objects.create_user(username='membre', password='x')
+        self.outsider = User.objects.create_user(username='autre', password='x')
+        self.appointment = Appointment.objects.create(
+            member=self.member, pastor=self.pastor, subject='Prière',
+            requested_date=datetime.date.today() + datetime.timedelta(days=3), requested_time=datetime.time(10)
+        )
+
+
+class ChatAPITests(ChatUsersMixin, APITestCase):
+    url = '/api/chat/messages/'
+
+    def test_direct_conversation_history_and_after_id(self):
+        self.client.force_authenticate(self.member)
+        first = self.client.post(self.url, {'receiver': self.pastor.id, 'content': 'Bonjour pasteur'})
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(first.data['sender'], self.member.id)
+
+        self.client.force_authenticate(self.pastor)
+        self.client.post(self.url, {'receiver': self.member.id, 'content': 'Bonjour'})
+        response = self.client.get(self.url, {'with': self.member.id})
+        self.assertEqual([m['content'] for m in response.data['results']], ['Bonjour', 'Bonjour pasteur'])
+
+        response = self.client.get(self.url, {'with': self.member.id, 'after_id': first.data['id']})
+        self.assertEqual([m['content'] for m in response.data['results']], ['Bonjour'])
+
+    def test_history_is_keyset_paginated(self):
+        channel = Channel(self.member, self.pastor)
+        for i in range(60):
+            ChatService.send(channel, f'Message {i}')
+        self.client.force_authenticate(self.pastor)
+
+        with self.assertNumQueries(2):  # interlocuteur, page
+            first = self.client.get(self.url, {'with': self.member.id})
+        self.assertEqual(first.data['results'][0]['content'], 'Message 59')
+        second = self.client.get(first.data['next'])
+        self.assertEqual([m['content'] for m in second.data['results']], [f'Message {i}' for i in range(9, -1, -1)])
+        self.assertIsNone(second.data['next'])
+
+    def test_members_cannot_message_each_other(self):
+        self.client.force_authenticate(self.member)
+        response = self.client.post(self.url, {'receiver': self.outsider.id, 'content': 'Salut'})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Message.objects.exists())
+
+    def test_appointment_conversation_is_scoped(self):
+        self.client.force_authenticate(self.member)
+        self.client.post(self.url, {'appointment': self.appointment.id, 'content': 'À propos du RDV'})
+        self.client.post(self.url, {'receiver': self.pastor.id, 'content': 'Autre sujet'})
+
+        self.client.force_authenticate(self.pastor)
+        response = self.client.get(self.url, {'appointment': self.appointment.id})
+        self.assertEqual([m['content'] for m in response.data['results']], ['À propos du RDV'])
+        self.assertEqual(response.data['results'][0]['receiver'], self.pastor.id)
+
+        self.client.force_authenticate(self.outsider)
+        response = self.client.get(self.url, {'appointment': self.appointment.id})
+        self.assertEqual(response.status_code, 403)
+
+    def test_inbox_lists_last_message_and_unread_counts(self):
+        ChatService.send(Channel(self.member, self.pastor), 'Premier')
+        ChatService.send(Channel(self.member, self.pastor), 'Second')
+        ChatService.send(Channel(self.member, self.pastor, self.appointment), 'Pour le RDV')
+        ChatService.send(Channel(self.pastor, self.member), 'Réponse')
+
+        self.client.force_authenticate(self.pastor)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/chat/conversations/')
+        inbox = [(c['appointment'], c['last_message']['content'], c['unread']) for c in response.data['results']]
+        self.assertEqual(inbox, [(None, 'Réponse', 2), (self.appointment.id, 'Pour le RDV', 1)])
+        self.assertEqual(response.data['results'][0]['other']['id'], self.member.id)
+
+        self.client.force_authenticate(self.member)
+        response = self.client.get('/api/chat/conversations/')
+        self.assertEqual([c['unread'] for c in response.data['results']], [1, 0])
+
+    def test_mark_read_uses_a_single_update_per_table(self):
+        channel = Channel(self.member, self.pastor)
+        messages = [ChatService.send(channel, f'Message {i}') for i in range(5)]
+        conversation = Conversation.objects.get()
+        url = f'/api/chat/conversations/{conversation.id}/read/'
+
+        self.client.force_authenticate(self.pastor)
+        response = self.client.post(url, {'up_to': messages[2].id})
+        self.assertEqual(response.data, {'marked': 3, 'unread': 2})
+        self.assertEqual(Message.objects.filter(is_read=False).count(), 2)
+
+        with self.assertNumQueries(4):  # conversation, UPDATE messages, UPDATE compteur, relecture
+            response = self.client.post(url)
+        self.assertEqual(response.data, {'marked': 2, 'unread': 0})
+
+        self.client.force_authenticate(self.outsider)
+        self.assertEqual(self.client.post(url).status_code, 404)
+
+    def test_mark_read_does_not_take_the_counter_below_zero(self):
+        channel = Channel(self.member, self.pastor)
+        for i in range(3):
+            ChatService.send(channel, f'Message {i}')
+        conversation = Conversation.objects.get()
+        field = conversation.unread_field(self.pastor)
+        Conversation.objects.filter(pk=conversation.pk).update(**{field: 1})  # compteur désynchronisé
+
+        self.assertEqual(ChatService.mark_read(conversation, self.pastor), 3)
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.unread_for(self.pastor), 0)
+
+    def test_rebuild_recomputes_summaries(self):
+        Message.objects.bulk_create([
+            Message(sender=self.member, receiver=self.pastor, content=f'Importé {i}') for i in range(3)
+        ])
+        ChatService.rebuild()
+        conversation = Conversation.objects.get()
+        # Le pasteur, créé en premier, est ``first_user``
+        self.assertEqual((conversation.first_unread, conversation.second_unread), (3, 0))
+        self.assertEqual(conversation.last_message.content, 'Importé 2')
+
+        conversation.last_message.delete()
+        conversation.refresh_from_db()
+        self.assertEqual((conversation.first_unread, conversation.last_message.content), (2, 'Importé 1'))
+
+    def test_poll_requires_authentication(self):
+        response = self.client.get(self.url + 'poll/', {'with': self.pastor.id, 'after_id': 0})
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('error', response.json())
+
+    def test_poll_answers_immediately_under_wsgi(self):
+        token = str(AccessToken.for_user(self.member))
+        started = time.monotonic()
+        response = self.client.get(
+            self.url + 'poll/', {'with': self.pastor.id, 'after_id': 0, 'timeout': 10},
+            HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+        self.assertLess(time.monotonic() - started, 2)
+
+
+class WebSocketClient:
+    """Pilote l'application ASGI comme le ferait uvicorn pour un WebSocket."""
+
+    def __init__(self, application, query):
+        self.inbox = asyncio.Queue()
+        self.outbox = asyncio.Queue()
+        scope = {'type': 'websocket', 'path': '/ws/chat/', 'query_string': query.encode(), 'headers': []}
+        self.inbox.put_nowait({'type': 'websocket.connect'})
+        self.task = asyncio.ensure_future(application(scope, self.inbox.get, self.outbox.put))
+
+    async def receive(self):
+        return await asyncio.wait_for(self.outbox.get(), timeout=5)
+
+    async def receive_json(self):
+        return json.loads((await self.receive())['text'])
+
+    async def send_json(self, data):
+        await self.inbox.put({'type': 'websocket.receive', 'text': json.dumps(data)})
+
+    async def close(self):
+        await self.inbox.put({'type': 'websocket.disconnect', 'code': 1000})
+        await asyncio.wait_for(self.task, timeout=5)
+
+
+class RealtimeChatTests(ChatUsersMixin, TransactionTestCase):
+    """Transactions réelles : les abonnés sont réveillés après le commit."""
+    poll_url = '/api/chat/messages/poll/'
+
+    def setUp(self):
+        super().setUp()
+        self.first = Message.objects.create(sender=self.member, receiver=self.pastor, content='Bonjour')
+        self.member_token = str(AccessToken.for_user(self.member))
+        self.pastor_token = str(AccessToken.for_user(self.pastor))
+
+    async def poll(self, timeout):
+        return await self.async_client.get(
+            self.poll_url, {'with': self.member.id, 'after_id': self.first.id, 'timeout': timeout},
+            headers={'Authorization': f'Bearer {self.pastor_token}'},
+        )
+
+    async def test_long_poll_wakes_on_new_message(self):
+        started = time.monotonic()
+        poll = asyncio.ensure_future(self.poll(10))
+        await asyncio.sleep(0.2)
+        await sync_to_async(ChatService.send)(Channel(self.member, self.pastor), 'Êtes-vous là ?')
+
+        response = await poll
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual([m['content'] for m in response.json()], ['Êtes-vous là ?'])
+
+    async def test_long_poll_times_out_with_empty_list(self):
+        response = await self.poll(0.2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    @override_settings(CHAT_POLL_INTERVAL=0.05)
+    async def test_message_written_by_another_process_is_picked_up(self):
+        poll = asyncio.ensure_future(self.poll(5))
+        await asyncio.sleep(0.2)
+        # Écriture directe, sans passer par le bus de ce processus
+        await sync_to_async(Message.objects.create)(sender=self.member, receiver=self.pastor, content='Ailleurs')
+
+        response = await poll
+        self.assertEqual([m['content'] for m in response.json()], ['Ailleurs'])
+
+    @override_settings(CHAT_POLL_INTERVAL=0.05)
+    async def test_message_committed_out_of_order_is_picked_up(self):
+        poll = asyncio.ensure_future(self.poll(5))
+        await asyncio.sleep(0.2)
+        # Un message d'une autre conversation, d'identifiant plus élevé, est lu en premier...
+        await sync_to_async(Message.objects.create)(
+            id=self.first.id + 50, sender=self.outsider, receiver=self.pastor, content='Autre'
+        )
+        await asyncio.sleep(0.2)
+        # ... puis celui de la conversation suivie, d'identifiant inférieur, est validé
+        await sync_to_async(Message.objects.create)(
+            id=self.first.id + 10, sender=self.member, receiver=self.pastor, content='En retard'
+        )
+
+        response = await poll
+        self.assertEqual([m['content'] for m in response.json()], ['En retard'])
+
+    async def test_websocket_round_trip(self):
+        from cyprus_api.asgi import application
+
+        member = WebSocketClient(application, f'token={self.member_token}&with={self.pastor.id}&after_id=0')
+        self.assertEqual((await member.receive())['type'], 'websocket.accept')
+        history = await member.receive_json()
+        self.assertEqual(history['message']['content'], 'Bonjour')
+
+        pastor = WebSocketClient(application, f'token={self.pastor_token}&with={self.member.id}')
+        self.assertEqual((await pastor.receive())['type'], 'websocket.accept')
+
+        await member.send_json({'content': 'Merci pour hier'})
+        for client in (member, pastor):
+            event = await client.receive_json()
+            self.assertEqual(event['type'], 'message')
+            self.assertEqual(event['message']['content'], 'Merci pour hier')
+
+        await member.send_json({'content': '  '})
+        self.assertEqual((await member.receive_json())['type'], 'error')
+
+        await member.close()
+        await pastor.close()
+
+    async def test_websocket_rejects_invalid_token_and_outsiders(self):
+        from cyprus_api.asgi import application
+
+        client = WebSocketClient(application, f'token=invalide&with={self.pastor.id}')
+        self.assertEqual(await client.receive(), {'type': 'websocket.close', 'code': 4401})
+
+        token = await sync_to_async(lambda: str(AccessToken.for_user(self.outsider)))()
+        client = WebSocketClient(application, f'token={token}&appointment={self.appointment.id}')
+        self.assertEqual(await client.receive(), {'type': 'websocket.close', 'code': 4403})
@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import ConversationListView, ConversationReadView, MessageListCreateView, MessagePollView
+
+urlpatterns = [
+    path('conversations/', ConversationListView.as_view(), name='chat-conversations'),
+    path('conversations/<int:pk>/read/', ConversationReadView.as_view(), name='chat-conversation-read'),
+    path('messages/', MessageListCreateView.as_view(), name='chat-messages'),
+    path('messages/poll/', MessagePollView.as_view(), name='chat-messages-poll'),
+]
@@ -1,3 +1,157 @@
-from django.shortcuts import render
+import asyncio
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views import View
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import APIException, AuthenticationFailed, ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from cyprus_api.streaming import is_asgi
+from users.authentication import CachedJWTAuthentication
+from .bus import bus
+from .serializers import ConversationSerializer, MessageSerializer
+from .services import ChatService
+
+HISTORY_SIZE = 50
+BATCH_SIZE = 200
+
+
+class MessagePagination(CursorPagination):
+    page_size = HISTORY_SIZE
+    ordering = '-id'
+
+
+class ConversationPagination(CursorPagination):
+    page_size = 20
+    ordering = ('-last_message_at', '-id')
+
+
+def parse_after_id(value, name='after_id'):
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        raise ValidationError({name: "Identifiant invalide."})
+
+
+def conversation_messages(channel, after_id=None):
+    """Messages après ``after_id``, ou les HISTORY_SIZE derniers (ordre chronologique)."""
+    queryset = ChatService.messages(channel, after_id)
+    if after_id:
+        return list(queryset[:BATCH_SIZE])
+    return list(reversed(queryset.order_by('-id')[:HISTORY_SIZE]))
+
+
+class MessageListCreateView(generics.ListCreateAPIView):
+    """
+    GET  /api/chat/messages/?with=<user_id>|appointment=<id>[&after_id=<id>]
+         plus récents d'abord, paginés par curseur (``next`` = messages plus anciens)
+    POST /api/chat/messages/ {"receiver": <user_id> | "appointment": <id>, "content": "..."}
+    """
+    serializer_class = MessageSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MessagePagination
+
+    def get_queryset(self):
+        params = self.request.query_params
+        channel = ChatService.resolve(self.request.user, params.get('with'), params.get('appointment'))
+        return ChatService.messages(channel, parse_after_id(params.get('after_id')))
+
+    def create(self, request, *args, **kwargs):
+        channel = ChatService.resolve(
+            request.user, request.data.get('receiver'), request.data.get('appointment')
+        )
+        message = ChatService.send(channel, request.data.get('content'))
+        return Response(self.get_serializer(message).data, status=status.HTTP_201_CREATED)
+
+
+class MessagePollView(View):
+    """
+    Long-poll : GET /api/chat/messages/poll/?with=<id>|appointment=<id>&after_id=<id>[&timeout=<s>]
+
+    Répond dès qu'un message plus récent que ``after_id`` existe, sinon au bout
+    de ``timeout`` secondes (liste vide). L'attente ne consomme ni requête SQL ni
+    CPU : la vue est réveillée par le bus de messages (voir bus.py).
+
+    L'attente nécessite ASGI (SERVER_MODE=asgi), où aucun worker n'est bloqué.
+    Sous WSGI, un worker synchrone serait immobilisé pendant toute l'attente :
+    la vue répond alors immédiatement (``timeout`` ramené à 0), comme une
+    simple lecture des messages après ``after_id``.
+    """
+    http_method_names = ['get', 'options']
+
+    @staticmethod
+    def authenticate(request):
+        result = CachedJWTAuthentication().authenticate(request)
+        if result is None:
+            raise AuthenticationFailed("Informations d'authentification non fournies.")
+        return result[0]
+
+    @staticmethod
+    def load(request):
+        user = MessagePollView.authenticate(request)
+        return ChatService.resolve(user, request.GET.get('with'), request.GET.get('appointment'))
+
+    @staticmethod
+    def serialize(messages):
+        return MessageSerializer(messages, many=True).data
+
+    async def get(self, request):
+        try:
+            channel = await sync_to_async(self.load)(request)
+            after_id = parse_after_id(request.GET.get('after_id'))
+        except APIException as exc:
+            return JsonResponse({'error': exc.detail}, status=exc.status_code)
+        try:
+            timeout = min(float(request.GET.get('timeout', settings.CHAT_LONG_POLL_TIMEOUT)),
+                          settings.CHAT_LONG_POLL_TIMEOUT)
+        except ValueError:
+            return JsonResponse({'error': 'Paramètre timeout invalide'}, status=400)
+        if not is_asgi(request):
+            timeout = 0
+
+        fetch = sync_to_async(conversation_messages)
+        messages = await fetch(channel, after_id)
+        if not messages and after_id is not None and timeout > 0:
+            event = bus.subscribe(channel.key, after_id)
+            try:
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + timeout
+                # Relecture après l'abonnement : un message arrivé entre-temps n'est pas manqué
+                messages = await fetch(channel, after_id)
+                while not messages and loop.time() < deadline:
+                    try:
+                        await asyncio.wait_for(event.wait(), deadline - loop.time())
+                    except asyncio.TimeoutError:
+                        break
+                    event.clear()
+                    messages = await fetch(channel, after_id)
+            finally:
+                bus.unsubscribe(channel.key, event)
+
+        return JsonResponse(await sync_to_async(self.serialize)(messages), safe=False)
+
+
+class ConversationListView(generics.ListAPIView):
+    """GET /api/chat/conversations/ : boîte de réception, conversations les plus récentes d'abord."""
+    serializer_class = ConversationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ConversationPagination
+
+    def get_queryset(self):
+        return ChatService.inbox(self.request.user)
+
+
+class ConversationReadView(APIView):
+    """POST /api/chat/conversations/<id>/read/ {"up_to": <message_id>} (facultatif)"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        conversation = get_object_or_404(ChatService.inbox(request.user), pk=pk)
+        marked = ChatService.mark_read(conversation, request.user, parse_after_id(request.data.get('up_to'), 'up_to'))
+        conversation.refresh_from_db()
+        return Response({'marked': marked, 'unread': conversation.unread_for(request.user)})
@@ -5,3 +5,8 @@ class ContactConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'contact'
     verbose_name = 'Contact'
+
+    def ready(self):
+        from cyprus_api.cache import invalidate_scope_on
+        from .models import ContactInfo
+        invalidate_scope_on('contact_info', ContactInfo)
@@ -3,6 +3,8 @@ from rest_framework.response import Response
 from .models import ContactRequest, ContactInfo
 from .serializers import ContactRequestSerializer, ContactInfoSerializer
 from .services import ContactService
+from cyprus_api.cache import CachedResponseMixin
+from cyprus_api.conditional import ConditionalGetMixin
 
 class ContactRequestViewSet(viewsets.ModelViewSet):
     queryset = ContactRequest.objects.all()
@@ -13,13 +15,21 @@ class ContactRequestViewSet(viewsets.ModelViewSet):
             return [permissions.AllowAny()]
         return [permissions.IsAdminUser()]
 
-class ContactInfoView(views.APIView):
+class ContactInfoView(ConditionalGetMixin, CachedResponseMixin, views.APIView):
+    cache_scope = 'contact_info'
+
     def get_permissions(self):
         if self.request.method == 'GET':
             return [permissions.AllowAny()]
         return [permissions.IsAdminUser()]
 
+    def get_conditional_queryset(self):
+        return ContactInfo.objects.all()
+
     def get(self, request):
+        return self.conditional_response(request, self.cached_response, self.get_contact_info)
+
+    def get_contact_info(self, request):
         instance = ContactService.get_or_create_contact_info()
         serializer = ContactInfoSerializer(instance)
         return Response(serializer.data)
@@ -13,4 +13,25 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cyprus_api.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from chat.consumers import ChatConsumer  # noqa: E402  (après le chargement de Django)
+from cyprus_api.streaming import DisconnectWatcher  # noqa: E402
+
+# Signale aux vues en flux (SSE) la déconnexion du client
+http_application = DisconnectWatcher(django_application)
+
+websocket_routes = {
+    '/ws/chat/': ChatConsumer(),
+}
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        consumer = websocket_routes.get(scope['path'])
+        if consumer is None:
+            await receive()  # websocket.connect
+            await send({'type': 'websocket.close', 'code': 4404})
+            return
+        return await consumer(scope, receive, send)
+    return await http_application(scope, receive, send)
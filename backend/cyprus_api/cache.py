@@ -0,0 +1,131 @@
+"""
+Cache des réponses publiques (GET) de l'API.
+
+Chaque vue déclare un ``cache_scope``. Les modèles qui alimentent ce scope sont
+enregistrés avec ``invalidate_scope_on`` dans l'``AppConfig.ready`` de leur app :
+toute sauvegarde ou suppression remplace le jeton de version du scope, ce qui
+rend obsolètes en une seule écriture toutes les entrées mises en cache pour lui.
+
+Fonctionne avec n'importe quel backend Django (locmem, filebased, redis...).
+"""
+import hashlib
+import secrets
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import translation
+from django.utils.http import urlencode
+from rest_framework.response import Response
+
+VERSION_KEY = 'api-cache:version:{scope}'
+ENTRY_KEY = 'api-cache:{scope}:{version}:{digest}'
+
+# modèle -> scopes qu'il alimente (pour les écritures qui ne passent pas par save())
+MODEL_SCOPES = defaultdict(set)
+
+
+def is_shared_cache():
+    """Faux pour locmem : chaque processus (worker) a son propre cache, donc ses propres versions."""
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache)
+
+
+def get_scope_version(scope):
+    """Retourne le jeton de version courant d'un scope (créé au besoin)."""
+    key = VERSION_KEY.format(scope=scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, secrets.token_hex(8), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_scope_version(scope):
+    """Invalide toutes les réponses en cache d'un scope."""
+    cache.set(VERSION_KEY.format(scope=scope), secrets.token_hex(8), timeout=None)
+
+
+def invalidate_scope_on(scope, *models):
+    """
+    Connecte post_save/post_delete des modèles donnés à l'invalidation du scope.
+
+    L'invalidation est différée au commit : une lecture concurrente qui remettrait
+    en cache l'ancien contenu avant le commit est ainsi écartée.
+    """
+    def handler(sender, **kwargs):
+        transaction.on_commit(lambda: bump_scope_version(scope))
+
+    for model in models:
+        MODEL_SCOPES[model].add(scope)
+        for signal in (post_save, post_delete):
+            signal.connect(
+                handler, sender=model, weak=False,
+                dispatch_uid=f'api-cache:{scope}'
+            )
+
+
+def bump_scopes_for(model):
+    """Invalide les scopes alimentés par ``model`` (après un ``update()`` ou un ``bulk_create``)."""
+    for scope in MODEL_SCOPES.get(model, ()):
+        bump_scope_version(scope)
+
+
+def request_signature(request):
+    """URL absolue, paramètres triés et langue active : ce qui distingue deux représentations."""
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    language = translation.get_language() or settings.LANGUAGE_CODE
+    return '|'.join([request.build_absolute_uri(request.path), params, language])
+
+
+def build_cache_key(scope, request):
+    """Clé basée sur l'URL absolue, les paramètres triés et la langue active."""
+    digest = hashlib.md5(request_signature(request).encode('utf-8')).hexdigest()
+    return ENTRY_KEY.format(scope=scope, version=get_scope_version(scope), digest=digest)
+
+
+class CachedResponseMixin:
+    """
+    Met en cache les réponses des actions de lecture publiques d'une vue.
+
+    Exemple :
+        class SermonViewSet(CachedResponseMixin, viewsets.ModelViewSet):
+            cache_scope = 'sermons'
+    """
+    cache_scope = None
+    cache_timeout = None
+    cached_actions = ('list', 'retrieve')
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return settings.API_CACHE_TIMEOUT
+
+    def cached_response(self, request, view_func, *args, **kwargs):
+        if request.method != 'GET' or not self.cache_scope or not self.get_cache_timeout():
+            return view_func(request, *args, **kwargs)
+
+        key = build_cache_key(self.cache_scope, request)
+        data = cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.get_cache_timeout())
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        if 'list' not in self.cached_actions:
+            return super().list(request, *args, **kwargs)
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if 'retrieve' not in self.cached_actions:
+            return super().retrieve(request, *args, **kwargs)
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
@@ -0,0 +1,119 @@
+"""
+Requêtes conditionnelles (``If-None-Match`` / ``If-Modified-Since``) sur les
+lectures publiques de l'API.
+
+L'``ETag`` et le ``Last-Modified`` ne sont pas calculés à partir du corps de la
+réponse : une seule requête d'agrégat (``COUNT`` + ``MAX(updated_at)``) sur les
+lignes dont dépend la représentation donne un tampon de version. Si le client
+possède déjà cette version, la vue répond 304 sans charger ni sérialiser les
+objets (et avant même le cache de cache.py).
+
+Le nombre de lignes détecte les suppressions, que ``MAX(updated_at)`` ne voit
+pas : l'``ETag`` fait foi, ``Last-Modified`` n'est qu'une indication pour les
+clients qui n'envoient pas ``If-None-Match``.
+
+Pour une vue avec ``cache_scope``, le tampon est mis en cache sous la même
+version de scope que la réponse : un succès de cache reste sans requête SQL et
+l'``ETag`` correspond toujours au corps servi. Avec un cache partagé entre
+processus, la version du scope entre aussi dans l'``ETag`` : une écriture par
+``update()`` qui invalide le scope (``bump_scopes_for``) ne laisse pas répondre
+304. Avec locmem, chaque worker a ses propres versions : l'``ETag`` reste
+déterministe (même valeur d'un worker à l'autre) et les ``update()`` doivent
+avancer ``updated_at`` eux-mêmes.
+
+Exemple :
+    class SermonViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+        ...
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .cache import build_cache_key, get_scope_version, is_shared_cache, request_signature
+
+
+def version_stamp(queryset, field='updated_at'):
+    """``(nombre de lignes, date de dernière modification ou None)`` en une requête."""
+    stamp = queryset.order_by().aggregate(count=Count('pk'), last=Max(field))
+    return stamp['count'], stamp['last']
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified des actions de lecture d'une vue, d'après ``updated_at``.
+
+    ``get_conditional_queryset`` renvoie les lignes dont dépend la réponse (par
+    défaut le queryset filtré de la vue, réduit à l'objet demandé pour
+    ``retrieve``) ; ``get_conditional_seed`` y ajoute ce qui change la réponse
+    sans modifier ces lignes (la date du jour pour un filtre « à venir »...).
+    """
+    conditional_actions = ('list', 'retrieve')
+    conditional_field = 'updated_at'
+
+    def get_conditional_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_conditional_seed(self):
+        return ''
+
+    def get_version_stamp(self, request):
+        scope = getattr(self, 'cache_scope', None)
+        if not scope or not self.get_cache_timeout():
+            return version_stamp(self.get_conditional_queryset(), self.conditional_field)
+        key = f'{build_cache_key(scope, request)}:stamp'
+        stamp = cache.get(key)
+        if stamp is None:
+            stamp = version_stamp(self.get_conditional_queryset(), self.conditional_field)
+            cache.set(key, stamp, self.get_cache_timeout())
+        return stamp
+
+    def conditional_response(self, request, view_func, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+
+        count, last = self.get_version_stamp(request)
+        user = request.user.pk if request.user.is_authenticated else ''
+        scope = getattr(self, 'cache_scope', None)
+        scope_version = get_scope_version(scope) if scope and is_shared_cache() else ''
+        raw = '|'.join(map(str, [
+            request_signature(request), user, self.get_conditional_seed(),
+            scope_version, count, last.timestamp() if last else '',
+        ]))
+        # Faible : la représentation JSON peut être recompressée (GZip) sans changer de sens
+        etag = f'W/"{hashlib.md5(raw.encode("utf-8")).hexdigest()}"'
+        last_modified = int(last.timestamp()) if last else None
+
+        def finalize(response):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # Revalidation à chaque fois : la réponse reste fraîche et un 304 ne coûte qu'un agrégat
+            patch_cache_control(response, no_cache=True)
+            patch_vary_headers(response, ['Authorization'])
+            return response
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return finalize(not_modified)
+
+        response = view_func(request, *args, **kwargs)
+        if response.status_code == 200:
+            finalize(response)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        if 'list' not in self.conditional_actions:
+            return super().list(request, *args, **kwargs)
+        return self.conditional_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if 'retrieve' not in self.conditional_actions:
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
@@ -0,0 +1,163 @@
+"""
+Diffusion de fichiers du stockage (PDF des sermons...) par une vue Django.
+
+``file_response`` gère les requêtes conditionnelles (``If-None-Match``,
+``If-Modified-Since``), les plages d'octets (``Range`` / ``If-Range``, une seule
+plage : reprise d'un téléchargement, lecture d'une page au milieu du fichier)
+et diffuse le contenu par blocs avec ``FileResponse`` (``wsgi.file_wrapper`` /
+sendfile côté serveur quand c'est possible).
+
+Avec MEDIA_SENDFILE, Django ne fait que contrôler l'accès et délègue le
+transfert au proxy frontal :
+
+- ``x-accel-redirect`` (nginx) : ``X-Accel-Redirect: MEDIA_SENDFILE_PREFIX + nom``,
+  le préfixe étant une ``location`` ``internal`` pointant sur MEDIA_ROOT ;
+- ``x-sendfile`` (Apache mod_xsendfile, lighttpd) : chemin absolu du fichier.
+
+Le proxy gère alors lui-même les plages et les en-têtes conditionnels.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """Pseudo-fichier limité à ``length`` octets à partir de ``start``."""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Retourne ``(début, fin)`` inclus, ``None`` pour servir le fichier entier
+    (en-tête absent ou non géré, plages multiples comprises), ou lève
+    ``ValueError`` si la plage n'est pas satisfaisable.
+    """
+    match = RANGE_RE.match(header.replace(' ', '')) if header else None
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffixe : les N derniers octets
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def range_applies(request, etag, last_modified):
+    """``If-Range`` : la plage n'est servie que si le fichier n'a pas changé."""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(last_modified)
+
+
+def sendfile_response(field_file, mode, content_type):
+    """Réponse vide : le proxy frontal envoie le fichier (lève NotImplementedError sans chemin local)."""
+    response = HttpResponse(content_type=content_type)
+    if mode == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = quote(settings.MEDIA_SENDFILE_PREFIX.rstrip('/') + '/' + field_file.name)
+    else:
+        response['X-Sendfile'] = field_file.path
+    return response
+
+
+def file_response(request, field_file, filename=None, content_type=None, as_attachment=False, max_age=None,
+                  private=False):
+    """
+    Réponse HTTP pour ``field_file`` (FieldFile), en respectant Range et les requêtes conditionnelles.
+
+    ``private`` : document personnel (reçu...), jamais conservé par un cache partagé.
+    """
+    if not field_file:
+        raise Http404("Fichier introuvable.")
+    storage, name = field_file.storage, field_file.name
+    try:
+        size = storage.size(name)
+        last_modified = storage.get_modified_time(name).timestamp()
+    except (FileNotFoundError, OSError):
+        raise Http404("Fichier introuvable.")
+
+    etag = f'"{int(last_modified * 1_000_000):x}-{size:x}"'
+    filename = filename or os.path.basename(name)
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    if max_age is None:
+        max_age = settings.MEDIA_CACHE_MAX_AGE
+
+    def finalize(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Accept-Ranges'] = 'bytes'
+        patch_cache_control(response, **{'private' if private else 'public': True}, max_age=max_age)
+        return response
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+    if conditional is not None:
+        return finalize(conditional)
+
+    mode = settings.MEDIA_SENDFILE
+    if mode:
+        try:
+            response = sendfile_response(field_file, mode, content_type)
+        except NotImplementedError:
+            pass  # stockage distant sans chemin local : diffusion par Django
+        else:
+            response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+            return finalize(response)
+
+    try:
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return finalize(response)
+    if byte_range and not range_applies(request, etag, last_modified):
+        byte_range = None
+
+    file = storage.open(name, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type, as_attachment=as_attachment, filename=filename)
+        response['Content-Length'] = size
+        return finalize(response)
+
+    start, end = byte_range
+    response = FileResponse(
+        RangeFile(file, start, end - start + 1),
+        status=206, content_type=content_type, as_attachment=as_attachment, filename=filename
+    )
+    response['Content-Length'] = end - start + 1
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return finalize(response)
+
@@ -51,6 +51,15 @@ class OpenAIServiceError(Exception):
     pass
 
 
+class AIServiceError(Exception):
+    """Exception levée lors d'erreurs avec le service d'IA (Gemini)"""
+
+    def __init__(self, message='', status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code  # statut HTTP de Gemini, si la réponse en avait un
+        self.retry_after = retry_after  # secondes (en-tête Retry-After)
+
+
 class PayPalServiceError(Exception):
     """Exception levée lors d'erreurs avec l'API PayPal"""
     pass
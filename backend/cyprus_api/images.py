@@ -0,0 +1,165 @@
+"""
+Variantes redimensionnées des images téléversées (WebP + JPEG).
+
+À chaque enregistrement d'un modèle déclaré avec ``generate_variants_on`` (dans
+l'``AppConfig.ready`` de son app), l'image source est décodée une seule fois,
+redressée selon son orientation EXIF puis réduite aux largeurs
+IMAGE_VARIANT_WIDTHS (jamais agrandie). Les variantes sont ré-encodées sans
+métadonnées et rangées à côté de l'original :
+
+    gallery/culte.jpg -> gallery/culte_640w.webp, gallery/culte_640w.jpg
+
+Leur liste est mémorisée dans le JSONField ``<champ>_variants`` du modèle ;
+``ImageVariantsField`` en tire un ``srcset`` par format sans accéder au stockage.
+``manage.py generate_image_variants`` traite les images existantes.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+# format -> (format Pillow, extension)
+FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+# (modèle, champ image, champ des variantes) déclarés par les apps
+REGISTRY = []
+
+
+def variant_name(name, width, fmt):
+    root, _ = os.path.splitext(name)
+    return f'{root}_{width}w.{FORMATS[fmt][1]}'
+
+
+def target_widths(width):
+    """Largeurs configurées inférieures à l'original, plus l'original s'il est plus petit que la plus grande."""
+    widths = sorted(w for w in settings.IMAGE_VARIANT_WIDTHS if w < width)
+    if len(widths) < len(settings.IMAGE_VARIANT_WIDTHS):
+        widths.append(width)
+    return widths
+
+
+def load_image(field_file):
+    largest = max(settings.IMAGE_VARIANT_WIDTHS)
+    with field_file.open('rb') as source:
+        image = Image.open(source)
+        # JPEG : décodage directement à l'échelle 1/2, 1/4 ou 1/8 utile (photos de téléphone)
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    return image
+
+
+def encode(image, fmt):
+    if fmt == 'jpeg' and image.mode == 'RGBA':
+        flat = Image.new('RGB', image.size, (255, 255, 255))
+        flat.paste(image, mask=image.getchannel('A'))
+        image = flat
+    buffer = BytesIO()
+    # Aucune métadonnée n'est recopiée (EXIF, GPS...) : seules les données d'image sont écrites
+    image.save(buffer, FORMATS[fmt][0], quality=settings.IMAGE_VARIANT_QUALITY, optimize=fmt == 'jpeg')
+    return buffer.getvalue()
+
+
+def build_variants(field_file):
+    """
+    Génère et enregistre les variantes de ``field_file``.
+
+    Retourne ``{'source': nom, 'webp': [[largeur, nom], ...], 'jpeg': [...]}``,
+    ou ``{}`` si le fichier n'est pas une image lisible.
+    """
+    try:
+        image = load_image(field_file)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning("Variantes non générées pour %s : %s", field_file.name, exc)
+        return {}
+
+    storage = field_file.storage
+    variants = {'source': field_file.name, **{fmt: [] for fmt in FORMATS}}
+    # Du plus large au plus étroit : chaque réduction part de la précédente
+    for width in reversed(target_widths(image.width)):
+        if width < image.width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        for fmt in FORMATS:
+            name = variant_name(field_file.name, width, fmt)
+            storage.delete(name)
+            variants[fmt].insert(0, [width, storage.save(name, ContentFile(encode(image, fmt)))])
+    return variants
+
+
+def delete_variants(storage, variants, keep=None):
+    kept = {name for fmt in FORMATS for _, name in (keep or {}).get(fmt, [])}
+    for fmt in FORMATS:
+        for _, name in (variants or {}).get(fmt, []):
+            if name not in kept:
+                storage.delete(name)
+
+
+def refresh_variants(instance, field, variants_field):
+    """(Re)génère les variantes si l'image a changé ; retourne True si elles ont été mises à jour."""
+    field_file = getattr(instance, field)
+    current = getattr(instance, variants_field) or {}
+    if current.get('source', '') == (field_file.name or ''):
+        return False
+    variants = build_variants(field_file) if field_file else {}
+    delete_variants(field_file.storage, current, keep=variants)
+    setattr(instance, variants_field, variants)
+    # update() : pas de nouveau post_save, pas de réécriture des autres champs
+    type(instance)._default_manager.filter(pk=instance.pk).update(**{variants_field: variants})
+    return True
+
+
+def generate_variants_on(model, field, variants_field=None):
+    """Connecte post_save de ``model`` à la génération des variantes de ``field``."""
+    variants_field = variants_field or f'{field}_variants'
+    REGISTRY.append((model, field, variants_field))
+
+    def handler(sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw or (update_fields is not None and field not in update_fields):
+            return
+        refresh_variants(instance, field, variants_field)
+
+    post_save.connect(
+        handler, sender=model, weak=False,
+        dispatch_uid=f'image-variants:{model._meta.label}.{field}'
+    )
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    ``srcset`` par format d'une image : ``{'webp': 'url 320w, url 640w', 'jpeg': '...'}``.
+
+    ``None`` tant que les variantes de l'image actuelle n'existent pas.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        field_file = getattr(instance, self.image_field)
+        variants = getattr(instance, f'{self.image_field}_variants') or {}
+        if not field_file or variants.get('source') != field_file.name:
+            return None
+        request = self.context.get('request')
+
+        def url(name):
+            location = field_file.storage.url(name)
+            return request.build_absolute_uri(location) if request else location
+
+        return {
+            fmt: ', '.join(f'{url(name)} {width}w' for width, name in variants[fmt])
+            for fmt in FORMATS if variants.get(fmt)
+        }
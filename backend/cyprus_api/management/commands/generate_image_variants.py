@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from cyprus_api.cache import bump_scopes_for
+from cyprus_api.images import REGISTRY, build_variants, delete_variants
+
+
+class Command(BaseCommand):
+    help = "Génère les variantes WebP/JPEG des images existantes (galerie, affiches, couvertures, photos)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Régénère aussi les variantes à jour")
+        parser.add_argument('--workers', type=int, default=4, help="Images traitées simultanément")
+
+    @staticmethod
+    def is_stale(instance, field, variants_field):
+        return (getattr(instance, variants_field) or {}).get('source') != getattr(instance, field).name
+
+    @staticmethod
+    def changes(model, variants_field, variants):
+        """``update()`` ne touche pas ``auto_now`` : ``updated_at`` est avancé ici (ETag, Last-Modified)."""
+        changes = {variants_field: variants}
+        try:
+            model._meta.get_field('updated_at')
+        except FieldDoesNotExist:
+            return changes
+        changes['updated_at'] = timezone.now()
+        return changes
+
+    def handle(self, *args, **options):
+        total = 0
+        # Pillow libère le GIL pendant le décodage et l'encodage : les threads
+        # travaillent en parallèle ; les écritures en base restent dans ce thread.
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            for model, field, variants_field in REGISTRY:
+                queryset = (
+                    model._default_manager.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                    .only('pk', field, variants_field)
+                )
+                instances = [
+                    instance for instance in queryset.iterator()
+                    if options['force'] or self.is_stale(instance, field, variants_field)
+                ]
+                results = executor.map(lambda instance: build_variants(getattr(instance, field)), instances)
+                for instance, variants in zip(instances, results):
+                    delete_variants(getattr(instance, field).storage, getattr(instance, variants_field), keep=variants)
+                    model._default_manager.filter(pk=instance.pk).update(**self.changes(model, variants_field, variants))
+                    if not variants:
+                        self.stdout.write(self.style.WARNING(f"{model._meta.label} #{instance.pk} : image illisible"))
+                if instances:
+                    # Pas de post_save : les réponses publiques en cache sont invalidées ici
+                    bump_scopes_for(model)
+                total += len(instances)
+                self.stdout.write(f"{model._meta.label}.{field} : {len(instances)} image(s) traitée(s).")
+        self.stdout.write(self.style.SUCCESS(f"{total} image(s) traitée(s)."))
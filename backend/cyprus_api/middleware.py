@@ -0,0 +1,118 @@
+"""
+Instrumentation des requêtes SQL par requête HTTP (opt-in).
+
+Activée avec QUERY_INSTRUMENTATION=True. Pour chaque requête HTTP, le
+middleware mesure le nombre de requêtes SQL, leur durée cumulée et repère les
+requêtes répétées (même SQL aux littéraux près), signe typique d'un N+1.
+Les mesures sont exposées dans l'en-tête ``Server-Timing`` et dans une ligne
+de log JSON ; un avertissement est émis quand le budget est dépassé.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('cyprus_api.queries')
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+
+
+def fingerprint(sql):
+    """Normalise une requête SQL : littéraux et listes IN remplacés par '?'."""
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = IN_LIST.sub('(?)', sql)
+    return ' '.join(sql.split())
+
+
+class QueryRecorder:
+    """execute_wrapper qui enregistre durée et empreinte de chaque requête."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def repeated(self, threshold):
+        return [
+            {'sql': sql[:300], 'count': count}
+            for sql, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Mesure les requêtes SQL de chaque vue et signale les dépassements de budget.
+
+    Réglages :
+        QUERY_BUDGET            nombre maximal de requêtes attendu par vue
+        QUERY_REPEAT_THRESHOLD  nombre d'exécutions identiques signalées comme N+1
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION', False):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        wrappers = [connections[alias].execute_wrapper(recorder) for alias in connections]
+        started = time.perf_counter()
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        try:
+            response = self.get_response(request)
+        finally:
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+        total = time.perf_counter() - started
+
+        self.report(request, response, recorder, total)
+        return response
+
+    def report(self, request, response, recorder, total):
+        budget = getattr(settings, 'QUERY_BUDGET', 30)
+        threshold = getattr(settings, 'QUERY_REPEAT_THRESHOLD', 5)
+        repeated = recorder.repeated(threshold)
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name or match._func_path if match else None
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"',
+            f'app;dur={total * 1000:.1f}',
+        ])
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(recorder.duration * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+            'budget': budget,
+            'repeated': repeated,
+        }
+        over_budget = recorder.count > budget
+        if over_budget or repeated:
+            response['X-Query-Budget'] = 'exceeded' if over_budget else 'repeated-queries'
+            logger.warning(json.dumps(record, default=str))
+        else:
+            logger.info(json.dumps(record, default=str))
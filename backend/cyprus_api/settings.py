@@ -39,6 +39,9 @@ INSTALLED_APPS = [
     'django_otp.plugins.otp_totp',
     'drf_yasg',
     
+    # Commandes transverses (cyprus_api/management)
+    'cyprus_api',
+    
     # Cyprus For Christ apps
     'users.apps.UsersConfig',
     'sermons.apps.SermonsConfig',
@@ -51,6 +54,8 @@ INSTALLED_APPS = [
     'dashboard.apps.DashboardConfig',
     'appointments.apps.AppointmentsConfig',
     'chat',
+    'search.apps.SearchConfig',
+    'outbox.apps.OutboxConfig',
 ]
 
 MIDDLEWARE = [
@@ -66,6 +71,14 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Query instrumentation (opt-in, recommandé en staging) : Server-Timing + logs JSON
+# et avertissement quand une vue dépasse QUERY_BUDGET requêtes SQL
+QUERY_INSTRUMENTATION = config('QUERY_INSTRUMENTATION', default=False, cast=bool)
+QUERY_BUDGET = config('QUERY_BUDGET', default=30, cast=int)
+QUERY_REPEAT_THRESHOLD = config('QUERY_REPEAT_THRESHOLD', default=5, cast=int)
+if QUERY_INSTRUMENTATION:
+    MIDDLEWARE.insert(0, 'cyprus_api.middleware.QueryInstrumentationMiddleware')
+
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:5173,http://127.0.0.1:5173').split(',')
@@ -204,10 +217,31 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache Configuration
+# LocMem par défaut (aucun serveur requis). Pour partager le cache entre workers
+# gunicorn : CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# et CACHE_LOCATION=/chemin/vers/un/dossier
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='cyprus-for-christ'),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=5000, cast=int),
+        },
+    }
+}
+
+# Durée de vie (secondes) des réponses publiques mises en cache (0 = désactivé)
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=300, cast=int)
+
+# Recherche : plein texte natif PostgreSQL si disponible, sinon table de jetons
+SEARCH_NATIVE_FULLTEXT = config('SEARCH_NATIVE_FULLTEXT', default=True, cast=bool)
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -242,6 +276,15 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
+# Durée (secondes) de l'utilisateur authentifié en cache (users/authentication.py) ; 0 = lecture à chaque requête.
+# Ignorée avec le cache locmem (non partagé entre workers : une désactivation n'y serait pas propagée)
+JWT_USER_CACHE_TIMEOUT = config('JWT_USER_CACHE_TIMEOUT', default=300, cast=int)
+# Jetons révoqués (users/revocation.py) : filtre de Bloom par processus, resynchronisé au plus tard toutes les N secondes
+TOKEN_REVOCATION_FILTER_CAPACITY = config('TOKEN_REVOCATION_FILTER_CAPACITY', default=100000, cast=int)
+TOKEN_REVOCATION_FILTER_ERROR = config('TOKEN_REVOCATION_FILTER_ERROR', default=0.01, cast=float)
+TOKEN_REVOCATION_SYNC_INTERVAL = config('TOKEN_REVOCATION_SYNC_INTERVAL', default=30, cast=int)
+# Relecture des révocations créées jusqu'à N secondes avant la synchronisation précédente (commits tardifs)
+TOKEN_REVOCATION_SYNC_MARGIN = config('TOKEN_REVOCATION_SYNC_MARGIN', default=60, cast=int)
 
 CORS_ALLOW_CREDENTIALS = True
 
@@ -252,7 +295,24 @@ OPENAI_MODEL = config('OPENAI_MODEL', default='gpt-3.5-turbo')
 
 # Google Gemini (Active) - Using REST API
 GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
-GEMINI_MODEL = config('GEMINI_MODEL', default='models/text-bison-001')
+GEMINI_MODEL = config('GEMINI_MODEL', default='gemini-flash-latest')
+GEMINI_API_BASE = config('GEMINI_API_BASE', default='https://generativelanguage.googleapis.com/v1beta')
+GEMINI_TIMEOUT = config('GEMINI_TIMEOUT', default=30, cast=float)
+GEMINI_MAX_RETRIES = config('GEMINI_MAX_RETRIES', default=3, cast=int)
+GEMINI_RETRY_BACKOFF = config('GEMINI_RETRY_BACKOFF', default=2.0, cast=float)  # secondes : 2s, 4s...
+# Cache en mémoire des réponses de l'assistant (par worker ; TTL 0 = désactivé)
+AI_ANSWER_CACHE_TTL = config('AI_ANSWER_CACHE_TTL', default=86400, cast=int)
+AI_ANSWER_CACHE_SIZE = config('AI_ANSWER_CACHE_SIZE', default=1000, cast=int)
+# Questions à l'assistant par utilisateur (ou IP) : nombre/période (s, m, h, d)
+AI_ASK_THROTTLE_RATE = config('AI_ASK_THROTTLE_RATE', default='10/m')
+# Rhema du jour : pré-généré par `manage.py generate_rhemas` (tâche planifiée).
+# RHEMA_GENERATE_ON_REQUEST : génère aussi à la volée si le jour manque (un seul appel IA par jour)
+# RHEMA_AI_DRAFTS : les Rhemas générés sont des brouillons à publier par un pasteur
+RHEMA_GENERATE_ON_REQUEST = config('RHEMA_GENERATE_ON_REQUEST', default=False, cast=bool)
+RHEMA_AI_DRAFTS = config('RHEMA_AI_DRAFTS', default=False, cast=bool)
+RHEMA_GENERATION_WAIT = config('RHEMA_GENERATION_WAIT', default=5, cast=float)
+RHEMA_GENERATION_POLL_INTERVAL = config('RHEMA_GENERATION_POLL_INTERVAL', default=0.5, cast=float)
+RHEMA_GENERATION_LOCK_TIMEOUT = config('RHEMA_GENERATION_LOCK_TIMEOUT', default=300, cast=int)
 
 # PayPal Configuration
 PAYPAL_MODE = config('PAYPAL_MODE', default='sandbox')
@@ -285,6 +345,21 @@ DEFAULT_FROM_EMAIL = config(
     'DEFAULT_FROM_EMAIL',
     default='Cyprus For Christ <noreply@cyprusforchrist.org>'
 )
+# File d'envoi (app outbox) : emails envoyés par `manage.py run_mail_worker`
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=50, cast=int)
+OUTBOX_POLL_INTERVAL = config('OUTBOX_POLL_INTERVAL', default=5, cast=float)  # secondes
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+OUTBOX_RETRY_BACKOFF = config('OUTBOX_RETRY_BACKOFF', default=30, cast=int)  # 30s, 60s, 120s...
+OUTBOX_RETRY_BACKOFF_MAX = config('OUTBOX_RETRY_BACKOFF_MAX', default=3600, cast=int)
+OUTBOX_LEASE_SECONDS = config('OUTBOX_LEASE_SECONDS', default=300, cast=int)
+# Annonces à l'assemblée : paquets par connexion SMTP et débit max (emails/seconde, 0 = illimité)
+ANNOUNCEMENT_CHUNK_SIZE = config('ANNOUNCEMENT_CHUNK_SIZE', default=50, cast=int)
+ANNOUNCEMENT_RATE_LIMIT = config('ANNOUNCEMENT_RATE_LIMIT', default=5, cast=float)
+
+# Messagerie : attente max d'un long-poll (secondes) et relecture de la table
+# des messages pour les abonnés servis par un autre worker
+CHAT_LONG_POLL_TIMEOUT = config('CHAT_LONG_POLL_TIMEOUT', default=25, cast=float)
+CHAT_POLL_INTERVAL = config('CHAT_POLL_INTERVAL', default=2, cast=float)
 
 # File Upload Configuration
 MAX_PDF_SIZE_MB = config('MAX_PDF_SIZE_MB', default=50, cast=int)
@@ -294,6 +369,21 @@ ALLOWED_IMAGE_EXTENSIONS = config(
     'ALLOWED_IMAGE_EXTENSIONS',
     default='jpg,jpeg,png,webp'
 ).split(',')
+# Diffusion des fichiers (PDF des sermons) : '' = par Django (Range, ETag),
+# 'x-accel-redirect' (nginx, location internal MEDIA_SENDFILE_PREFIX -> MEDIA_ROOT) ou 'x-sendfile' (Apache)
+MEDIA_SENDFILE = config('MEDIA_SENDFILE', default='')
+MEDIA_SENDFILE_PREFIX = config('MEDIA_SENDFILE_PREFIX', default='/protected-media/')
+MEDIA_CACHE_MAX_AGE = config('MEDIA_CACHE_MAX_AGE', default=86400, cast=int)
+# Variantes redimensionnées des images (WebP + JPEG, EXIF retiré) : largeurs en pixels et qualité
+IMAGE_VARIANT_WIDTHS = [int(width) for width in config('IMAGE_VARIANT_WIDTHS', default='320,640,1280').split(',')]
+IMAGE_VARIANT_QUALITY = config('IMAGE_VARIANT_QUALITY', default=80, cast=int)
+# Import groupé de la galerie : fichiers par requête, images décodées en parallèle, lignes par INSERT
+DATA_UPLOAD_MAX_NUMBER_FILES = config('DATA_UPLOAD_MAX_NUMBER_FILES', default=1000, cast=int)
+GALLERY_INGEST_WORKERS = config('GALLERY_INGEST_WORKERS', default=4, cast=int)
+GALLERY_INGEST_BATCH_SIZE = config('GALLERY_INGEST_BATCH_SIZE', default=50, cast=int)
+# Texte des PDF de sermons : processus d'extraction et caractères indexés pour la recherche
+SERMON_PDF_TEXT_WORKERS = config('SERMON_PDF_TEXT_WORKERS', default=2, cast=int)
+SERMON_PDF_SEARCH_CHARS = config('SERMON_PDF_SEARCH_CHARS', default=200000, cast=int)
 
 # Church Information (for receipts and emails)
 CHURCH_INFO = {
@@ -303,6 +393,8 @@ CHURCH_INFO = {
     'phone': config('CHURCH_PHONE', default=''),
     'website': config('CHURCH_WEBSITE', default='https://www.cyprusforchrist.org'),
 }
+# Reçus de dons et relevés annuels : processus de rendu PDF d'un lot (manage.py generate_receipts)
+RECEIPT_WORKERS = config('RECEIPT_WORKERS', default=4, cast=int)
 
 # Frontend URL for emails
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:5173')
@@ -354,6 +446,16 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': False,
         },
+        'httpx': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'cyprus_api.queries': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
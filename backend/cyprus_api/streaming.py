@@ -0,0 +1,112 @@
+"""
+Réponses en flux (Server-Sent Events) sous ASGI.
+
+Django 4.2 ne signale pas la déconnexion du client pendant une réponse en
+flux : le générateur continuerait jusqu'au bout. ``DisconnectWatcher``
+(installé dans asgi.py) surveille le canal ASGI une fois le corps de la
+requête lu et expose un ``asyncio.Event`` dans ``request.scope`` ;
+``until_disconnected`` interrompt le générateur source dès qu'il est levé.
+"""
+import asyncio
+import json
+
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+
+DISCONNECTED_SCOPE_KEY = 'cyprus.disconnected'
+
+
+def sse_event(event, data):
+    """Formate un évènement SSE (données JSON sur une ligne)."""
+    payload = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def is_asgi(request):
+    """Vrai si la requête est servie par le serveur ASGI (SERVER_MODE=asgi), pas par un worker WSGI."""
+    return isinstance(request, ASGIRequest)
+
+
+def disconnected_event(request):
+    """Event de déconnexion du client (None hors ASGI)."""
+    scope = getattr(request, 'scope', None) or {}
+    return scope.get(DISCONNECTED_SCOPE_KEY)
+
+
+async def until_disconnected(source, disconnected):
+    """
+    Relaie les éléments du générateur asynchrone ``source`` jusqu'à la
+    déconnexion du client ; ``source`` est alors annulé puis fermé.
+    """
+    if disconnected is None:
+        async for item in source:
+            yield item
+        return
+
+    waiter = asyncio.ensure_future(disconnected.wait())
+    try:
+        while True:
+            step = asyncio.ensure_future(source.__anext__())
+            done, _ = await asyncio.wait({step, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if step not in done:
+                step.cancel()
+                await asyncio.gather(step, return_exceptions=True)
+                return
+            try:
+                item = step.result()
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        waiter.cancel()
+        await source.aclose()
+
+
+async def queued_until_done(queue, task):
+    """Relaie les éléments déposés dans ``queue`` par ``task`` jusqu'à la fin de celle-ci."""
+    while not task.done():
+        getter = asyncio.ensure_future(queue.get())
+        done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+        if getter in done:
+            yield getter.result()
+        else:
+            getter.cancel()
+    while not queue.empty():
+        yield queue.get_nowait()
+
+
+class DisconnectWatcher:
+    """Application ASGI enveloppante : signale la déconnexion des clients HTTP."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        disconnected = asyncio.Event()
+        watcher = None
+
+        async def watch():
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    disconnected.set()
+                    return
+
+        async def receive_body():
+            nonlocal watcher
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                disconnected.set()
+            elif not message.get('more_body') and watcher is None:
+                # Corps complet : la suite du canal ne peut plus être qu'une déconnexion
+                watcher = asyncio.ensure_future(watch())
+            return message
+
+        try:
+            await self.app({**scope, DISCONNECTED_SCOPE_KEY: disconnected}, receive_body, send)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
@@ -0,0 +1,190 @@
+import datetime
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from about.models import Event
+from appointments.models import Appointment
+from chat.models import Message
+from donations.models import Donation
+from prayers.models import PrayerRequest
+from rhema.models import Rhema
+from sermons.models import Sermon, SermonComment
+from users.models import User
+
+from .middleware import QueryInstrumentationMiddleware, fingerprint
+
+
+class IndexUsageTests(TestCase):
+    """Vérifie que le planificateur sert les chemins chauds avec les index déclarés"""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = User.objects.bulk_create([
+            User(
+                username=f'user{i}', email=f'User{i}@Example.com',
+                role=User.Role.PASTOR if i % 20 == 0 else User.Role.MEMBER
+            )
+            for i in range(400)
+        ])
+        cls.pastor, cls.member = users[0], users[1]
+        today = timezone.localdate()
+
+        Donation.objects.bulk_create([
+            Donation(
+                user=users[i % 400], amount=10, paypal_payment_id=f'PAY-{i}',
+                status=Donation.Status.COMPLETED if i % 10 else Donation.Status.PENDING
+            )
+            for i in range(400)
+        ])
+        PrayerRequest.objects.bulk_create([
+            PrayerRequest(
+                title=f'p{i}', content='...',
+                status=PrayerRequest.Status.PENDING if i % 10 == 0 else PrayerRequest.Status.PRAYED
+            )
+            for i in range(400)
+        ])
+        Appointment.objects.bulk_create([
+            Appointment(
+                member=users[i % 400], pastor=users[(i % 20) * 20], subject='...',
+                requested_date=today + datetime.timedelta(days=i % 60),
+                requested_time=datetime.time(9 + i % 8)
+            )
+            for i in range(400)
+        ])
+        Event.objects.bulk_create([
+            Event(title=f'e{i}', description='...', date=today + datetime.timedelta(days=i - 350))
+            for i in range(400)
+        ])
+        Sermon.objects.bulk_create([
+            Sermon(
+                title=f's{i}', slug=f's{i}', pastor=cls.pastor,
+                category=Sermon.Category.values[i % len(Sermon.Category.values)]
+            )
+            for i in range(400)
+        ])
+        Rhema.objects.bulk_create([
+            Rhema(
+                title=f'r{i}', verse='Jn 3:16', content='...',
+                published_at=today - datetime.timedelta(days=i)
+            )
+            for i in range(400)
+        ])
+        Message.objects.bulk_create([
+            Message(sender=users[(i + 1) % 400], receiver=users[i % 40], content='...', is_read=i % 5 != 0)
+            for i in range(400)
+        ])
+
+    def setUp(self):
+        # Sur de petites tables PostgreSQL préfère un parcours séquentiel :
+        # on vérifie que l'index est utilisable, pas qu'il est rentable à 400 lignes.
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+                cursor.execute('SET enable_seqscan TO off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_donations_by_status(self):
+        self.assertUsesIndex(
+            Donation.objects.filter(status=Donation.Status.PENDING).order_by('-created_at'),
+            'donation_status_created_idx'
+        )
+
+    def test_prayers_by_status(self):
+        self.assertUsesIndex(
+            PrayerRequest.objects.filter(status=PrayerRequest.Status.PENDING).order_by('-created_at'),
+            'prayer_status_created_idx'
+        )
+
+    def test_pastor_agenda(self):
+        self.assertUsesIndex(
+            Appointment.objects.filter(pastor=self.pastor, requested_date=timezone.localdate()),
+            'appt_pastor_slot_idx'
+        )
+
+    def test_member_appointments(self):
+        self.assertUsesIndex(
+            Appointment.objects.filter(member=self.member).order_by('-created_at'),
+            'appt_member_created_idx'
+        )
+
+    def test_upcoming_events(self):
+        self.assertUsesIndex(
+            Event.objects.filter(date__gte=timezone.localdate()),
+            'event_date_pinned_idx'
+        )
+
+    def test_sermons_by_category(self):
+        self.assertUsesIndex(
+            Sermon.objects.filter(category=Sermon.Category.PREACHING).order_by('-created_at'),
+            'sermon_category_created_idx'
+        )
+
+    def test_rhema_of_the_day(self):
+        self.assertUsesIndex(
+            Rhema.objects.filter(status=Rhema.Status.PUBLISHED, published_at=timezone.localdate()),
+            'rhema_status_published_idx'
+        )
+
+    def test_unread_inbox(self):
+        self.assertUsesIndex(
+            Message.objects.filter(receiver=self.member, is_read=False),
+            'message_inbox_idx'
+        )
+
+    def test_conversation_history(self):
+        self.assertUsesIndex(
+            Message.objects.filter(conversation_id=1, id__lt=1000).order_by('-id'),
+            'message_conversation_idx'
+        )
+
+    def test_case_insensitive_email(self):
+        self.assertUsesIndex(User.objects.by_email('User7@Example.com'), 'user_email_lower_idx')
+        self.assertEqual(User.objects.by_email('User7@Example.com').get().username, 'user7')
+
+    def test_pastor_list(self):
+        self.assertUsesIndex(User.objects.filter(role__in=['PASTOR', 'Pastor', 'pastor']), 'user_role_idx')
+
+
+INSTRUMENTED_MIDDLEWARE = ['cyprus_api.middleware.QueryInstrumentationMiddleware', *settings.MIDDLEWARE]
+
+
+@override_settings(QUERY_INSTRUMENTATION=True, MIDDLEWARE=INSTRUMENTED_MIDDLEWARE, API_CACHE_TIMEOUT=0)
+class QueryInstrumentationTests(APITestCase):
+    def setUp(self):
+        self.pastor = User.objects.create(username='pasteur', role=User.Role.PASTOR)
+        for index in range(6):
+            sermon = Sermon.objects.create(title=f'Sermon {index}', slug=f'sermon-{index}', pastor=self.pastor)
+            SermonComment.objects.create(sermon=sermon, user=self.pastor, content='Amen')
+
+    def test_server_timing_header_is_emitted(self):
+        with self.assertLogs('cyprus_api.queries', level='INFO'):
+            response = self.client.get('/api/sermons/')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('queries"', response['Server-Timing'])
+
+    @override_settings(QUERY_BUDGET=3, QUERY_REPEAT_THRESHOLD=5)
+    def test_repeated_queries_are_flagged(self):
+        def n_plus_one_view(request):
+            for sermon in Sermon.objects.all():
+                SermonComment.objects.filter(sermon=sermon).count()
+            return HttpResponse()
+
+        middleware = QueryInstrumentationMiddleware(n_plus_one_view)
+        with self.assertLogs('cyprus_api.queries', level='WARNING') as logs:
+            response = middleware(RequestFactory().get('/api/sermons/'))
+        self.assertEqual(response['X-Query-Budget'], 'exceeded')
+        self.assertIn('"repeated": [{', logs.output[0])
+
+    def test_fingerprint_normalizes_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 21"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s) LIMIT 5"),
+        )
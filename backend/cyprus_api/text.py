@@ -0,0 +1,13 @@
+"""
+Normalisation de texte partagée par les apps (index de recherche, cache de
+l'assistant biblique) : minuscules, accents et ligatures retirés.
+"""
+import unicodedata
+
+LIGATURES = str.maketrans({'œ': 'oe', 'æ': 'ae'})
+
+
+def normalize(text):
+    """Minuscules sans accents ni ligatures (« Prière » → « priere »)."""
+    text = unicodedata.normalize('NFKD', str(text or '').casefold().translate(LIGATURES))
+    return ''.join(char for char in text if not unicodedata.combining(char))
@@ -66,6 +66,8 @@ urlpatterns = [
             'about': '/api/about/',
             'dashboard': '/api/dashboard/',
             'appointments': '/api/appointments/',
+            'search': '/api/search/',
+            'chat': '/api/chat/',
             'admin': '/api/admin/',
         },
         'documentation': '/swagger/',
@@ -82,11 +84,14 @@ urlpatterns = [
     path('api/about/', include('about.urls')),
     path('api/dashboard/', include('dashboard.urls')),
     path('api/appointments/', include('appointments.urls')),
+    path('api/search/', include('search.urls')),
+    path('api/chat/', include('chat.urls')),
     path('api/admin/', include('users.admin_urls')),
     path('api/admin/', include('sermons.admin_urls')),
     path('api/admin/', include('prayers.admin_urls')),
     path('api/admin/', include('donations.admin_urls')),
     path('api/admin/', include('about.admin_urls')),
+    path('api/admin/', include('outbox.admin_urls')),
 ]
 
 # Serve media files in development
@@ -1 +1,8 @@
-# Admin configuration will be added here
+from django.contrib import admin
+from .models import DashboardCounter
+
+@admin.register(DashboardCounter)
+class DashboardCounterAdmin(admin.ModelAdmin):
+    list_display = ('key', 'value', 'updated_at')
+    search_fields = ('key',)
+    readonly_fields = ('key', 'value', 'updated_at')
@@ -5,3 +5,6 @@ class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard'
     verbose_name = 'Tableau de Bord'
+
+    def ready(self):
+        from . import signals  # noqa: F401
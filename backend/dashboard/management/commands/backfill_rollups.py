@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.models import MetricRollup
+from dashboard.services import MetricRollups
+
+
+class Command(BaseCommand):
+    help = "Recalcule les agrégats temporels (jour/mois) depuis les tables sources"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--metric', action='append', dest='metrics',
+            help=f"Métrique à reconstruire (répétable). Choix : {', '.join(MetricRollups.METRICS)}"
+        )
+        parser.add_argument(
+            '--if-empty', action='store_true',
+            help="Ne reconstruit que les métriques sans aucun agrégat (utile au déploiement)"
+        )
+
+    def handle(self, *args, **options):
+        metrics = options['metrics'] or list(MetricRollups.METRICS)
+        unknown = set(metrics) - set(MetricRollups.METRICS)
+        if unknown:
+            raise CommandError(f"Métrique(s) inconnue(s) : {', '.join(sorted(unknown))}")
+
+        for metric in metrics:
+            if options['if_empty'] and MetricRollup.objects.filter(metric=metric).exists():
+                self.stdout.write(f"{metric} : déjà initialisée, ignorée.")
+                continue
+            count = MetricRollups.rebuild(metric)
+            self.stdout.write(self.style.SUCCESS(f"{metric} : {count} agrégats reconstruits."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.services import DashboardCounters
+
+
+class Command(BaseCommand):
+    help = "Recalcule depuis zéro les compteurs du tableau de bord"
+
+    def handle(self, *args, **options):
+        values = DashboardCounters.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{len(values)} compteurs reconstruits."))
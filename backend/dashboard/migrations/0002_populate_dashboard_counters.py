@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from dashboard.services import DashboardCounters
+
+
+def populate_counters(apps, schema_editor):
+    # Même calcul que ``manage.py rebuild_dashboard_counters``, sur les modèles historiques
+    DashboardCounters.rebuild(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+        ('users', '0005_passwordresetcode'),
+        ('donations', '0002_donation_project'),
+        ('sermons', '0004_alter_sermon_category'),
+        ('prayers', '0001_initial'),
+        ('about', '0004_event_is_pinned'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
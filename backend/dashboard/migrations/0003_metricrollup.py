@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_populate_dashboard_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=50, verbose_name='Métrique')),
+                ('granularity', models.CharField(choices=[('day', 'Jour'), ('month', 'Mois')], max_length=10, verbose_name='Granularité')),
+                ('period', models.DateField(verbose_name='Début de période')),
+                ('dimension', models.CharField(blank=True, default='', help_text="Vide pour le total, sinon 'currency:EUR', 'project:...'", max_length=255, verbose_name='Dimension')),
+                ('count', models.IntegerField(default=0, verbose_name='Nombre')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Agrégat temporel',
+                'verbose_name_plural': 'Agrégats temporels',
+                'ordering': ['metric', 'granularity', 'period'],
+                'unique_together': {('metric', 'granularity', 'dimension', 'period')},
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+class DashboardCounter(models.Model):
+    """Compteur pré-calculé du tableau de bord, maintenu par signaux"""
+
+    key = models.CharField(_('Clé'), max_length=100, unique=True)
+    value = models.DecimalField(_('Valeur'), max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Compteur du tableau de bord')
+        verbose_name_plural = _('Compteurs du tableau de bord')
+        ordering = ['key']
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+
+class MetricRollup(models.Model):
+    """Agrégat journalier ou mensuel d'une métrique, maintenu incrémentalement"""
+
+    class Granularity(models.TextChoices):
+        DAY = 'day', _('Jour')
+        MONTH = 'month', _('Mois')
+
+    metric = models.CharField(_('Métrique'), max_length=50)
+    granularity = models.CharField(_('Granularité'), max_length=10, choices=Granularity.choices)
+    period = models.DateField(_('Début de période'))
+    dimension = models.CharField(
+        _('Dimension'), max_length=255, blank=True, default='',
+        help_text=_("Vide pour le total, sinon 'currency:EUR', 'project:...'")
+    )
+    count = models.IntegerField(_('Nombre'), default=0)
+    total = models.DecimalField(_('Total'), max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Agrégat temporel')
+        verbose_name_plural = _('Agrégats temporels')
+        ordering = ['metric', 'granularity', 'period']
+        unique_together = ['metric', 'granularity', 'dimension', 'period']
+
+    def __str__(self):
+        return f"{self.metric} {self.granularity} {self.period} {self.dimension}: {self.count} / {self.total}"
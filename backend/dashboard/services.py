@@ -0,0 +1,295 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Sum, Value
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import DashboardCounter, MetricRollup
+
+
+class DashboardCounters:
+    """
+    Couche de service pour les compteurs du tableau de bord.
+
+    Les compteurs sont incrémentés dans la transaction de la modification
+    (voir signals.py) ; la lecture des statistiques ne touche donc jamais les
+    tables métier. ``rebuild`` recalcule tout depuis zéro en cas de dérive.
+    """
+
+    USERS_TOTAL = 'users.total'
+    USERS_JOINED = 'users.joined:{date}'
+    DONATIONS_COMPLETED_TOTAL = 'donations.completed_total'
+    SERMONS_TOTAL = 'sermons.total'
+    PRAYERS_PENDING = 'prayers.pending'
+    EVENTS_TOTAL = 'events.total'
+    GALLERY_TOTAL = 'gallery.total'
+
+    @staticmethod
+    def joined_key(moment):
+        """Clé du compteur journalier d'inscriptions (date locale)."""
+        return DashboardCounters.USERS_JOINED.format(date=timezone.localdate(moment).isoformat())
+
+    @staticmethod
+    def increment(key, delta=1):
+        """Ajoute ``delta`` au compteur via un UPDATE atomique (créé au besoin)."""
+        if not delta:
+            return
+        if DashboardCounter.objects.filter(key=key).update(value=F('value') + delta):
+            return
+        try:
+            with transaction.atomic():
+                DashboardCounter.objects.create(key=key, value=delta)
+        except IntegrityError:
+            # Créé en parallèle par une autre transaction
+            DashboardCounter.objects.filter(key=key).update(value=F('value') + delta)
+
+    @staticmethod
+    def read(keys):
+        """Retourne {clé: valeur} pour les clés demandées, en une requête."""
+        values = dict(DashboardCounter.objects.filter(key__in=keys).values_list('key', 'value'))
+        return {key: values.get(key, Decimal('0')) for key in keys}
+
+    @staticmethod
+    def new_users_keys(days=30):
+        today = timezone.localdate()
+        return [
+            DashboardCounters.USERS_JOINED.format(date=(today - timedelta(days=offset)).isoformat())
+            for offset in range(days)
+        ]
+
+    @staticmethod
+    def compute(registry=apps):
+        """
+        Calcule toutes les valeurs depuis les tables métier (requêtes complètes).
+
+        ``registry`` est le registre d'applications : celui d'une migration
+        (modèles historiques) ou, par défaut, celui du projet.
+        """
+        User = registry.get_model('users', 'User')
+        Donation = registry.get_model('donations', 'Donation')
+        Sermon = registry.get_model('sermons', 'Sermon')
+        PrayerRequest = registry.get_model('prayers', 'PrayerRequest')
+        Event = registry.get_model('about', 'Event')
+        GalleryItem = registry.get_model('about', 'GalleryItem')
+
+        values = {
+            DashboardCounters.USERS_TOTAL: User.objects.count(),
+            DashboardCounters.DONATIONS_COMPLETED_TOTAL: Donation.objects.filter(
+                status='COMPLETED'
+            ).aggregate(total=Sum('amount'))['total'] or 0,
+            DashboardCounters.SERMONS_TOTAL: Sermon.objects.count(),
+            DashboardCounters.PRAYERS_PENDING: PrayerRequest.objects.filter(status='PENDING').count(),
+            DashboardCounters.EVENTS_TOTAL: Event.objects.count(),
+            DashboardCounters.GALLERY_TOTAL: GalleryItem.objects.count(),
+        }
+
+        joined = User.objects.annotate(
+            day=TruncDate('created_at', tzinfo=timezone.get_current_timezone())
+        ).values('day').annotate(count=Count('id'))
+        for entry in joined:
+            values[DashboardCounters.USERS_JOINED.format(date=entry['day'].isoformat())] = entry['count']
+        return values
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(registry=apps):
+        """
+        Remplace tous les compteurs par des valeurs recalculées.
+
+        Les compteurs existants sont verrouillés avant le calcul puis mis à jour
+        sur place : un incrément concurrent attend la fin de la reconstruction et
+        s'applique par-dessus au lieu d'être perdu.
+        """
+        Counter = registry.get_model('dashboard', 'DashboardCounter')
+        locked = list(Counter.objects.select_for_update().values_list('pk', 'key'))
+        values = DashboardCounters.compute(registry)
+        Counter.objects.bulk_create(
+            [Counter(key=key, value=value) for key, value in values.items()],
+            update_conflicts=True, unique_fields=['key'], update_fields=['value', 'updated_at'],
+        )
+        Counter.objects.filter(pk__in=[pk for pk, key in locked if key not in values]).delete()
+        return values
+
+
+class MetricRollups:
+    """
+    Moteur d'agrégats temporels (jour/mois) pour les graphiques du tableau de bord.
+
+    Chaque métrique décrit le modèle source, le champ date de rattachement, un
+    éventuel filtre, le champ montant et les dimensions ventilées. Les signaux
+    appliquent la différence entre l'état avant et après sauvegarde ; le
+    endpoint timeseries ne lit que ces lignes agrégées.
+    """
+
+    METRICS = {
+        'donations': {
+            'model': 'donations.Donation',
+            'date_field': 'created_at',
+            'filter': {'status': 'COMPLETED'},
+            'amount_field': 'amount',
+            'dimensions': ('currency', 'project'),
+        },
+        'users': {'model': 'users.User', 'date_field': 'created_at'},
+        'prayers': {'model': 'prayers.PrayerRequest', 'date_field': 'created_at'},
+        'appointments': {'model': 'appointments.Appointment', 'date_field': 'created_at'},
+    }
+
+    @staticmethod
+    def tracked_fields(metric):
+        """Champs nécessaires pour calculer la contribution d'une ligne."""
+        spec = MetricRollups.METRICS[metric]
+        fields = [spec['date_field'], *spec.get('filter', {}), *spec.get('dimensions', ())]
+        if spec.get('amount_field'):
+            fields.append(spec['amount_field'])
+        return list(dict.fromkeys(fields))
+
+    @staticmethod
+    def period_start(moment, granularity):
+        day = timezone.localdate(moment)
+        if granularity == MetricRollup.Granularity.MONTH:
+            return day.replace(day=1)
+        return day
+
+    @staticmethod
+    def contributions(metric, values):
+        """
+        Contribution d'une ligne (dict de valeurs) : {(granularité, période, dimension): (nombre, total)}.
+        """
+        spec = MetricRollups.METRICS[metric]
+        if values is None or values.get(spec['date_field']) is None:
+            return {}
+        for field, expected in spec.get('filter', {}).items():
+            if values.get(field) != expected:
+                return {}
+
+        amount = Decimal('0')
+        if spec.get('amount_field') and values.get(spec['amount_field']) is not None:
+            amount = Decimal(str(values[spec['amount_field']]))
+
+        dimensions = [''] + [
+            f"{field}:{values.get(field) or ''}" for field in spec.get('dimensions', ())
+        ]
+        result = {}
+        for granularity in MetricRollup.Granularity.values:
+            period = MetricRollups.period_start(values[spec['date_field']], granularity)
+            for dimension in dimensions:
+                result[(granularity, period, dimension)] = (1, amount)
+        return result
+
+    @staticmethod
+    def apply_change(metric, before, after):
+        """Applique la différence entre deux états (dicts, ou None pour absent)."""
+        deltas = {}
+        for sign, values in ((-1, before), (1, after)):
+            for key, (count, total) in MetricRollups.contributions(metric, values).items():
+                current_count, current_total = deltas.get(key, (0, Decimal('0')))
+                deltas[key] = (current_count + sign * count, current_total + sign * total)
+
+        for (granularity, period, dimension), (count, total) in deltas.items():
+            if count or total:
+                MetricRollups.increment(metric, granularity, period, dimension, count, total)
+
+    @staticmethod
+    def increment(metric, granularity, period, dimension, count, total):
+        lookup = dict(metric=metric, granularity=granularity, period=period, dimension=dimension)
+        changes = dict(count=F('count') + count, total=F('total') + total)
+        if MetricRollup.objects.filter(**lookup).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                MetricRollup.objects.create(count=count, total=total, **lookup)
+        except IntegrityError:
+            MetricRollup.objects.filter(**lookup).update(**changes)
+
+    @staticmethod
+    def series(metric, granularity, start, end, dimension=''):
+        """Points [{period, count, total}] entre deux dates, périodes vides incluses."""
+        start = MetricRollups.period_start_of_date(start, granularity)
+        rows = {
+            row['period']: row for row in MetricRollup.objects.filter(
+                metric=metric, granularity=granularity, dimension=dimension,
+                period__gte=start, period__lte=end
+            ).values('period', 'count', 'total')
+        }
+        points = []
+        period = start
+        while period <= end:
+            row = rows.get(period)
+            points.append({
+                'period': period,
+                'count': row['count'] if row else 0,
+                'total': row['total'] if row else Decimal('0'),
+            })
+            period = MetricRollups.next_period(period, granularity)
+        return points
+
+    @staticmethod
+    def period_start_of_date(day, granularity):
+        return day.replace(day=1) if granularity == MetricRollup.Granularity.MONTH else day
+
+    @staticmethod
+    def period_count(start, end, granularity):
+        """Nombre de points de ``series`` entre deux dates."""
+        if granularity == MetricRollup.Granularity.MONTH:
+            return (end.year - start.year) * 12 + end.month - start.month + 1
+        return (end - start).days + 1
+
+    @staticmethod
+    def next_period(period, granularity):
+        if granularity == MetricRollup.Granularity.MONTH:
+            return (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return period + timedelta(days=1)
+
+    @staticmethod
+    def compute(metric):
+        """Recalcule les agrégats d'une métrique par agrégation SQL sur la table source."""
+        spec = MetricRollups.METRICS[metric]
+        model = apps.get_model(spec['model'])
+        queryset = model.objects.filter(**spec.get('filter', {}))
+        amount = Sum(spec['amount_field']) if spec.get('amount_field') else Value(0)
+        tz = timezone.get_current_timezone()
+
+        rollups = []
+        for granularity, trunc in ((MetricRollup.Granularity.DAY, TruncDate),
+                                   (MetricRollup.Granularity.MONTH, TruncMonth)):
+            if trunc is TruncDate:
+                period = trunc(spec['date_field'], tzinfo=tz)
+            else:
+                period = trunc(spec['date_field'], output_field=DateField(), tzinfo=tz)
+            annotated = queryset.annotate(period_start=period)
+
+            groupings = [(None, '')] + [(field, field) for field in spec.get('dimensions', ())]
+            for field, prefix in groupings:
+                group_by = ['period_start'] + ([field] if field else [])
+                for row in annotated.values(*group_by).annotate(row_count=Count('pk'), row_total=amount).order_by():
+                    dimension = f"{prefix}:{row[field] or ''}" if field else ''
+                    rollups.append(MetricRollup(
+                        metric=metric, granularity=granularity, period=row['period_start'],
+                        dimension=dimension, count=row['row_count'], total=row['row_total'] or 0
+                    ))
+        return rollups
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(metric):
+        """
+        Remplace tous les agrégats d'une métrique. Retourne le nombre de lignes.
+
+        Comme ``DashboardCounters.rebuild`` : lignes verrouillées avant le calcul,
+        mises à jour sur place, puis suppression des seules périodes disparues.
+        """
+        locked = list(MetricRollup.objects.select_for_update().filter(metric=metric).values_list(
+            'pk', 'granularity', 'period', 'dimension'
+        ))
+        rollups = MetricRollups.compute(metric)
+        MetricRollup.objects.bulk_create(
+            rollups, batch_size=1000, update_conflicts=True,
+            unique_fields=['metric', 'granularity', 'dimension', 'period'],
+            update_fields=['count', 'total', 'updated_at'],
+        )
+        current = {(rollup.granularity, rollup.period, rollup.dimension) for rollup in rollups}
+        MetricRollup.objects.filter(pk__in=[pk for pk, *key in locked if tuple(key) not in current]).delete()
+        return len(rollups)
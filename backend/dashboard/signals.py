@@ -0,0 +1,145 @@
+"""
+Maintenance incrémentale des compteurs et agrégats du tableau de bord.
+
+Les handlers s'exécutent dans la transaction de la sauvegarde : si celle-ci est
+annulée, l'incrément l'est aussi. Les ``QuerySet.update()`` ne déclenchent pas
+de signaux ; ``manage.py rebuild_dashboard_counters`` et ``manage.py backfill_rollups``
+corrigent toute dérive.
+"""
+from decimal import Decimal
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from about.models import Event, GalleryItem
+from appointments.models import Appointment
+from donations.models import Donation
+from prayers.models import PrayerRequest
+from sermons.models import Sermon
+from users.models import User
+
+from .services import DashboardCounters, MetricRollups
+
+
+def remember_previous(instance, *fields):
+    """Mémorise sur l'instance les valeurs en base avant sauvegarde."""
+    previous = None
+    if instance.pk and not instance._state.adding:
+        previous = type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+    instance._dashboard_previous = previous
+
+
+def current_values(instance, fields):
+    return {field: getattr(instance, field) for field in fields}
+
+
+def donation_contribution(status, amount):
+    if status != Donation.Status.COMPLETED or amount is None:
+        return Decimal('0')
+    return Decimal(str(amount))
+
+
+def prayer_contribution(status):
+    return 1 if status == PrayerRequest.Status.PENDING else 0
+
+
+@receiver(post_save, sender=User, dispatch_uid='dashboard_user_saved')
+def user_saved(sender, instance, created, **kwargs):
+    if created:
+        DashboardCounters.increment(DashboardCounters.USERS_TOTAL)
+        DashboardCounters.increment(DashboardCounters.joined_key(instance.created_at))
+
+
+@receiver(post_delete, sender=User, dispatch_uid='dashboard_user_deleted')
+def user_deleted(sender, instance, **kwargs):
+    DashboardCounters.increment(DashboardCounters.USERS_TOTAL, -1)
+    if instance.created_at:
+        DashboardCounters.increment(DashboardCounters.joined_key(instance.created_at), -1)
+
+
+DONATION_FIELDS = list(dict.fromkeys(['status', 'amount', *MetricRollups.tracked_fields('donations')]))
+
+
+@receiver(pre_save, sender=Donation, dispatch_uid='dashboard_donation_pre_save')
+def donation_pre_save(sender, instance, **kwargs):
+    remember_previous(instance, *DONATION_FIELDS)
+
+
+@receiver(post_save, sender=Donation, dispatch_uid='dashboard_donation_saved')
+def donation_saved(sender, instance, **kwargs):
+    previous = getattr(instance, '_dashboard_previous', None)
+    before = donation_contribution(previous['status'], previous['amount']) if previous else Decimal('0')
+    after = donation_contribution(instance.status, instance.amount)
+    DashboardCounters.increment(DashboardCounters.DONATIONS_COMPLETED_TOTAL, after - before)
+    MetricRollups.apply_change('donations', previous, current_values(instance, DONATION_FIELDS))
+
+
+@receiver(post_delete, sender=Donation, dispatch_uid='dashboard_donation_deleted')
+def donation_deleted(sender, instance, **kwargs):
+    DashboardCounters.increment(
+        DashboardCounters.DONATIONS_COMPLETED_TOTAL,
+        -donation_contribution(instance.status, instance.amount)
+    )
+    MetricRollups.apply_change('donations', current_values(instance, DONATION_FIELDS), None)
+
+
+@receiver(pre_save, sender=PrayerRequest, dispatch_uid='dashboard_prayer_pre_save')
+def prayer_pre_save(sender, instance, **kwargs):
+    remember_previous(instance, 'status')
+
+
+@receiver(post_save, sender=PrayerRequest, dispatch_uid='dashboard_prayer_saved')
+def prayer_saved(sender, instance, **kwargs):
+    previous = getattr(instance, '_dashboard_previous', None)
+    before = prayer_contribution(previous['status']) if previous else 0
+    DashboardCounters.increment(DashboardCounters.PRAYERS_PENDING, prayer_contribution(instance.status) - before)
+
+
+@receiver(post_delete, sender=PrayerRequest, dispatch_uid='dashboard_prayer_deleted')
+def prayer_deleted(sender, instance, **kwargs):
+    DashboardCounters.increment(DashboardCounters.PRAYERS_PENDING, -prayer_contribution(instance.status))
+
+
+SIMPLE_COUNTERS = {
+    Sermon: DashboardCounters.SERMONS_TOTAL,
+    Event: DashboardCounters.EVENTS_TOTAL,
+    GalleryItem: DashboardCounters.GALLERY_TOTAL,
+}
+
+
+def simple_created(sender, instance, created, **kwargs):
+    if created:
+        DashboardCounters.increment(SIMPLE_COUNTERS[sender])
+
+
+def simple_deleted(sender, instance, **kwargs):
+    DashboardCounters.increment(SIMPLE_COUNTERS[sender], -1)
+
+
+for model in SIMPLE_COUNTERS:
+    post_save.connect(simple_created, sender=model, dispatch_uid=f'dashboard_{model._meta.model_name}_saved')
+    post_delete.connect(simple_deleted, sender=model, dispatch_uid=f'dashboard_{model._meta.model_name}_deleted')
+
+
+# Agrégats temporels des modèles dont seule la création/suppression compte
+ROLLUP_METRICS = {
+    User: 'users',
+    PrayerRequest: 'prayers',
+    Appointment: 'appointments',
+}
+
+
+def rollup_created(sender, instance, created, **kwargs):
+    if created:
+        metric = ROLLUP_METRICS[sender]
+        MetricRollups.apply_change(metric, None, current_values(instance, MetricRollups.tracked_fields(metric)))
+
+
+def rollup_deleted(sender, instance, **kwargs):
+    metric = ROLLUP_METRICS[sender]
+    MetricRollups.apply_change(metric, current_values(instance, MetricRollups.tracked_fields(metric)), None)
+
+
+for model in ROLLUP_METRICS:
+    post_save.connect(rollup_created, sender=model, dispatch_uid=f'rollup_{model._meta.model_name}_saved')
+    post_delete.connect(rollup_deleted, sender=model, dispatch_uid=f'rollup_{model._meta.model_name}_deleted')
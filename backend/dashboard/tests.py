@@ -0,0 +1,118 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from donations.models import Donation
+from prayers.models import PrayerRequest
+from .models import DashboardCounter, MetricRollup
+from .services import DashboardCounters
+
+User = get_user_model()
+
+
+class DashboardCountersTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'adminpass123')
+
+    def counter(self, key):
+        return DashboardCounters.read([key])[key]
+
+    def test_donation_total_follows_status_changes(self):
+        donation = Donation.objects.create(amount='25.50', paypal_payment_id='PAY-1')
+        self.assertEqual(self.counter(DashboardCounters.DONATIONS_COMPLETED_TOTAL), Decimal('0'))
+
+        donation.status = Donation.Status.COMPLETED
+        donation.save()
+        self.assertEqual(self.counter(DashboardCounters.DONATIONS_COMPLETED_TOTAL), Decimal('25.50'))
+
+        donation.delete()
+        self.assertEqual(self.counter(DashboardCounters.DONATIONS_COMPLETED_TOTAL), Decimal('0'))
+
+    def test_pending_prayers_counter(self):
+        prayer = PrayerRequest.objects.create(title='Santé', content='Priez pour moi')
+        self.assertEqual(self.counter(DashboardCounters.PRAYERS_PENDING), 1)
+        prayer.status = PrayerRequest.Status.PRAYED
+        prayer.save()
+        self.assertEqual(self.counter(DashboardCounters.PRAYERS_PENDING), 0)
+
+    def test_stats_endpoint_reads_counters_only(self):
+        User.objects.create_user('member', 'member@example.com', 'memberpass123')
+        self.client.force_authenticate(user=self.admin)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/dashboard/stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['value'], 2)
+        self.assertEqual(response.data[0]['change'], '+2 ce mois')
+
+    def test_rebuild_command_fixes_drift(self):
+        DashboardCounter.objects.filter(key=DashboardCounters.USERS_TOTAL).update(value=42)
+        DashboardCounter.objects.create(key='users.joined:2000-01-01', value=3)
+        total = DashboardCounter.objects.get(key=DashboardCounters.USERS_TOTAL)
+
+        call_command('rebuild_dashboard_counters', stdout=StringIO())
+        self.assertEqual(self.counter(DashboardCounters.USERS_TOTAL), 1)
+        # Mise à jour sur place (pas de suppression/recréation) et compteurs obsolètes retirés
+        self.assertTrue(DashboardCounter.objects.filter(pk=total.pk, value=1).exists())
+        self.assertFalse(DashboardCounter.objects.filter(key='users.joined:2000-01-01').exists())
+
+
+class MetricRollupTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'adminpass123')
+        self.client.force_authenticate(user=self.admin)
+
+    def complete(self, donation):
+        donation.status = Donation.Status.COMPLETED
+        donation.save()
+
+    def test_timeseries_reads_incremental_rollups(self):
+        self.complete(Donation.objects.create(amount='10.00', currency='EUR', project='Mission', paypal_payment_id='PAY-1'))
+        self.complete(Donation.objects.create(amount='5.00', currency='USD', paypal_payment_id='PAY-2'))
+        Donation.objects.create(amount='99.00', paypal_payment_id='PAY-3')  # reste en attente
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/dashboard/timeseries/', {'metric': 'donations', 'granularity': 'day'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        today = response.data['points'][-1]
+        self.assertEqual(today['count'], 2)
+        self.assertEqual(today['total'], Decimal('15.00'))
+
+        response = self.client.get('/api/dashboard/timeseries/', {
+            'metric': 'donations', 'granularity': 'month', 'dimension': 'currency:EUR'
+        })
+        self.assertEqual(response.data['points'][-1]['total'], Decimal('10.00'))
+
+    def test_backfill_matches_incremental_state(self):
+        User.objects.create_user('member', 'member@example.com', 'memberpass123')
+        self.complete(Donation.objects.create(amount='12.00', project='Mission', paypal_payment_id='PAY-1'))
+        incremental = set(MetricRollup.objects.values_list('metric', 'granularity', 'period', 'dimension', 'count', 'total'))
+        MetricRollup.objects.filter(metric='users', dimension='').update(count=42)
+        MetricRollup.objects.create(metric='users', granularity='day', period=date(2000, 1, 1), count=3)
+
+        call_command('backfill_rollups', stdout=StringIO())
+        rebuilt = set(MetricRollup.objects.values_list('metric', 'granularity', 'period', 'dimension', 'count', 'total'))
+        self.assertEqual(incremental, rebuilt)
+
+    def test_invalid_metric_is_rejected(self):
+        response = self.client.get('/api/dashboard/timeseries/', {'metric': 'visits'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_or_unbounded_dates_are_rejected(self):
+        for params in (
+            {'to': 'abc'},
+            {'from': 'abc'},
+            {'from': '2025-02-30'},
+            {'to': '0001-01-05'},
+            {'granularity': 'month', 'to': '9999-12-31'},
+            {'granularity': 'month', 'from': '1900-01-01', 'to': '2026-01-01'},
+            {'granularity': 'day', 'from': '2020-01-01', 'to': '2026-01-01'},
+        ):
+            response = self.client.get('/api/dashboard/timeseries/', {'metric': 'donations', **params})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+            self.assertIn('error', response.data)
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import DashboardStatsView, DashboardChartsView, RecentActivityView
+from .views import DashboardStatsView, DashboardChartsView, RecentActivityView, TimeSeriesView
 
 urlpatterns = [
     path('stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
     path('charts/', DashboardChartsView.as_view(), name='dashboard-charts'),
     path('activity/', RecentActivityView.as_view(), name='dashboard-activity'),
+    path('timeseries/', TimeSeriesView.as_view(), name='dashboard-timeseries'),
 ]
@@ -1,42 +1,49 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import permissions
-from django.db.models import Sum, Count
-from django.db.models.functions import TruncMonth
+from rest_framework import permissions, status
+from django.db.models import Count
+from django.utils.dateparse import parse_date
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, timedelta
 from users.models import User
 from donations.models import Donation
-from sermons.models import Sermon
-from prayers.models import PrayerRequest
-from about.models import Event, GalleryItem
+from .models import MetricRollup
+from .services import DashboardCounters, MetricRollups
 
 class DashboardStatsView(APIView):
     permission_classes = [permissions.IsAdminUser]
 
     def get(self, request):
+        # Lecture des compteurs pré-calculés (une seule requête, quelle que soit la taille des tables)
+        joined_keys = DashboardCounters.new_users_keys(days=30)
+        counters = DashboardCounters.read([
+            DashboardCounters.USERS_TOTAL,
+            DashboardCounters.DONATIONS_COMPLETED_TOTAL,
+            DashboardCounters.SERMONS_TOTAL,
+            DashboardCounters.PRAYERS_PENDING,
+            DashboardCounters.EVENTS_TOTAL,
+            DashboardCounters.GALLERY_TOTAL,
+            *joined_keys,
+        ])
+
         # Users
-        total_users = User.objects.count()
-        new_users_month = User.objects.filter(
-            created_at__gte=timezone.now() - timedelta(days=30)
-        ).count()
-
-        # Donations (Aggregate Sum)
-        total_donations = Donation.objects.filter(status='COMPLETED').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        total_users = int(counters[DashboardCounters.USERS_TOTAL])
+        new_users_month = int(sum(counters[key] for key in joined_keys))
+
+        # Donations
+        total_donations = counters[DashboardCounters.DONATIONS_COMPLETED_TOTAL]
         
         # Sermons
-        total_sermons = Sermon.objects.count()
+        total_sermons = int(counters[DashboardCounters.SERMONS_TOTAL])
         
         # Prayer Requests
-        active_requests = PrayerRequest.objects.filter(status='PENDING').count()
+        active_requests = int(counters[DashboardCounters.PRAYERS_PENDING])
 
         # Events
-        total_events = Event.objects.count()
+        total_events = int(counters[DashboardCounters.EVENTS_TOTAL])
         
         # Gallery
-        total_photos = GalleryItem.objects.count()
+        total_photos = int(counters[DashboardCounters.GALLERY_TOTAL])
 
         stats = [
             {
@@ -90,22 +97,20 @@ class DashboardChartsView(APIView):
     def get(self, request):
         # 1. Donations by Month (Line Chart) -> "Visites du site web" placeholder replacement
         # Since we don't track visits, we'll show Donations over time
-        six_months_ago = timezone.now() - timedelta(days=180)
-        
-        donations_by_month = Donation.objects.filter(
-            status='COMPLETED', 
-            created_at__gte=six_months_ago
-        ).annotate(
-            month=TruncMonth('created_at')
-        ).values('month').annotate(
-            total=Sum('amount')
-        ).order_by('month')
+        # Lecture des agrégats mensuels pré-calculés (6 lignes au plus)
+        today = timezone.localdate()
+        donations_by_month = MetricRollups.series(
+            'donations', MetricRollup.Granularity.MONTH,
+            today - timedelta(days=180), today
+        )
 
         visits_data = [] # Reusing the variable name expected by frontend for now or adapting frontend
         # Let's adapt data to generic "name" and "visites" (or value) structure
         for entry in donations_by_month:
+            if not entry['count']:
+                continue
             visits_data.append({
-                'name': entry['month'].strftime('%b'),
+                'name': entry['period'].strftime('%b'),
                 'value': entry['total']
             })
 
@@ -125,6 +130,63 @@ class DashboardChartsView(APIView):
             'pieChart': pie_data      # Users by Role
         })
 
+class TimeSeriesView(APIView):
+    """
+    Séries temporelles lues uniquement depuis les agrégats.
+    GET ?metric=donations&granularity=month&from=2024-01-01&to=2026-12-31&dimension=currency:EUR
+    """
+    permission_classes = [permissions.IsAdminUser]
+    MAX_POINTS = 1000
+
+    def get(self, request):
+        metric = request.query_params.get('metric', 'donations')
+        granularity = request.query_params.get('granularity', MetricRollup.Granularity.MONTH)
+        dimension = request.query_params.get('dimension', '')
+
+        if metric not in MetricRollups.METRICS:
+            return Response(
+                {'error': f"Métrique inconnue. Choix : {', '.join(MetricRollups.METRICS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if granularity not in MetricRollup.Granularity.values:
+            return Response(
+                {'error': "Granularité invalide (day ou month)"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        today = timezone.localdate()
+        default_span = timedelta(days=365 if granularity == MetricRollup.Granularity.MONTH else 30)
+        # parse_date renvoie None pour une valeur mal formée, lève ValueError pour une date impossible
+        try:
+            end = parse_date(request.query_params['to']) if request.query_params.get('to') else today
+            start = None
+            if end is not None:
+                start = parse_date(request.query_params['from']) if request.query_params.get('from') else end - default_span
+        except (ValueError, OverflowError):
+            start = end = None
+        # La dernière année est exclue : la période suivant ``to`` doit rester une date valide
+        if not start or not end or start > end or end.year >= date.max.year:
+            return Response(
+                {'error': "Dates invalides (format AAAA-MM-JJ, from <= to)"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if MetricRollups.period_count(start, end, granularity) > self.MAX_POINTS:
+            return Response(
+                {'error': f"Période trop longue (max {self.MAX_POINTS} points)"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        points = MetricRollups.series(metric, granularity, start, end, dimension)
+        return Response({
+            'metric': metric,
+            'granularity': granularity,
+            'dimension': dimension,
+            'from': start,
+            'to': end,
+            'points': points,
+        })
+
 class RecentActivityView(APIView):
     permission_classes = [permissions.IsAdminUser]
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Donation
+from .models import Donation, Receipt
 
 @admin.register(Donation)
 class DonationAdmin(admin.ModelAdmin):
@@ -13,3 +13,11 @@ class DonationAdmin(admin.ModelAdmin):
             return "Anonyme"
         return obj.user.username if obj.user else "Visiteur"
     get_payer.short_description = "Donateur"
+
+
+@admin.register(Receipt)
+class ReceiptAdmin(admin.ModelAdmin):
+    list_display = ('number', 'kind', 'donor', 'year', 'updated_at')
+    list_filter = ('kind', 'year')
+    search_fields = ('number', 'donor__username', 'donor__email')
+    readonly_fields = ('kind', 'number', 'donor', 'donation', 'year', 'fingerprint', 'file', 'created_at', 'updated_at')
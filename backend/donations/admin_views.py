@@ -1,18 +1,49 @@
-from rest_framework import viewsets
+from rest_framework import status, viewsets
 from rest_framework.permissions import IsAdminUser
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from donations.models import Donation
 from donations.serializers import DonationSerializer
+from donations.services import ReceiptService
+from donations.views import receipt_response
 from django.db.models import Q
-import csv
-from django.http import HttpResponse
+from cyprus_api.exports import StreamingExportMixin
+from users.models import User
 
-class AdminDonationViewSet(viewsets.ReadOnlyModelViewSet):
+
+def donor_name(donation):
+    if not donation.user:
+        return 'Anonyme'
+    return f"{donation.user.first_name} {donation.user.last_name}"
+
+
+class AdminDonationViewSet(StreamingExportMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for admin donation management (read-only)"""
     queryset = Donation.objects.all().order_by('-created_at')
     serializer_class = DonationSerializer
     permission_classes = [IsAdminUser]
+
+    export_filename = 'donations'
+    export_select_related = ('user',)
+    export_fields = (
+        ('date', 'Date', lambda d: d.created_at.date()),
+        ('donor', 'Donateur', donor_name),
+        ('email', 'Email', 'user.email'),
+        ('amount', 'Montant', 'amount'),
+        ('currency', 'Devise', 'currency'),
+        ('project', 'Projet', lambda d: d.project or 'Général'),
+        ('status', 'Statut', 'status'),
+        ('paypal_payment_id', 'ID PayPal', 'paypal_payment_id'),
+    )
+    # Colonnes historiques de export_csv, attendues par les exports existants
+    legacy_csv_fields = (
+        ('date', 'Date', lambda d: d.created_at.date()),
+        ('donor', 'Donateur', donor_name),
+        ('email', 'Email', 'user.email'),
+        ('amount', 'Montant', 'amount'),
+        ('project', 'Projet', lambda d: d.project or 'Général'),
+        ('status', 'Statut', 'status'),
+    )
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -36,22 +67,28 @@ class AdminDonationViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def export_csv(self, request):
         """Export donations to CSV"""
-        donations = self.get_queryset()
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="donations.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Date', 'Donateur', 'Email', 'Montant', 'Projet', 'Statut'])
-        
-        for donation in donations:
-            writer.writerow([
-                donation.created_at.strftime('%Y-%m-%d'),
-                f"{donation.user.first_name} {donation.user.last_name}" if donation.user else 'Anonyme',
-                donation.user.email if donation.user else '',
-                donation.amount,
-                donation.project or 'Général',
-                donation.status
-            ])
-        
-        return response
+        return self.export_response(request, output='csv', fields=self.legacy_csv_fields)
+
+    @action(detail=True, methods=['get'])
+    def receipt(self, request, pk=None):
+        """Reçu PDF d'un don complété"""
+        donation = self.get_object()
+        if donation.status != Donation.Status.COMPLETED or not donation.user_id:
+            return Response(
+                {'error': "Reçu disponible uniquement pour un don complété rattaché à un compte"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return receipt_response(request, ReceiptService.receipt_for(donation))
+
+    @action(detail=False, methods=['get'])
+    def statement(self, request):
+        """Relevé annuel PDF d'un donateur : ?user=<id>&year=<année>"""
+        try:
+            user = User.objects.get(pk=int(request.query_params.get('user')))
+            year = int(request.query_params.get('year'))
+        except (TypeError, ValueError, User.DoesNotExist):
+            return Response({'error': 'Paramètres user et year requis'}, status=status.HTTP_400_BAD_REQUEST)
+        receipt = ReceiptService.statement_for(user, year)
+        if receipt is None:
+            return Response({'error': 'Aucun don complété pour cette année'}, status=status.HTTP_404_NOT_FOUND)
+        return receipt_response(request, receipt)
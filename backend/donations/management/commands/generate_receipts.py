@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from donations.models import Receipt
+from donations.services import ReceiptService
+
+
+class Command(BaseCommand):
+    help = "Génère les reçus de dons et relevés annuels PDF d'une année (seuls les documents modifiés sont rendus)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help="Année civile (par défaut : l'année précédente)")
+        parser.add_argument(
+            '--kind', action='append', dest='kinds', choices=Receipt.Kind.values,
+            help="Type de document (répétable, par défaut : tous)"
+        )
+        parser.add_argument('--workers', type=int, help="Processus de rendu (par défaut : RECEIPT_WORKERS)")
+        parser.add_argument('--force', action='store_true', help="Régénère aussi les documents à jour")
+
+    def handle(self, *args, **options):
+        year = options['year'] or timezone.localdate().year - 1
+        stats = ReceiptService.generate(
+            year, kinds=options['kinds'], force=options['force'], workers=options['workers']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{year} : {stats['rendered']} document(s) générés, {stats['unchanged']} inchangé(s), "
+            f"{stats['deleted']} supprimé(s)."
+        ))
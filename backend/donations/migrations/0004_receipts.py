@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('donations', '0003_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Receipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('DONATION', 'Reçu de don'), ('ANNUAL', 'Relevé annuel')], max_length=10, verbose_name='Type')),
+                ('number', models.CharField(max_length=30, unique=True, verbose_name='Numéro')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Année')),
+                ('fingerprint', models.CharField(max_length=64, verbose_name='Empreinte')),
+                ('file', models.FileField(upload_to='receipts/', verbose_name='Fichier PDF')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('donation', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='receipt', to='donations.donation')),
+                ('donor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Reçu',
+                'verbose_name_plural': 'Reçus',
+                'ordering': ['-year', 'number'],
+                'indexes': [models.Index(fields=['donor', 'kind', 'year'], name='receipt_donor_kind_year_idx')],
+            },
+        ),
+    ]
@@ -39,7 +39,43 @@ class Donation(models.Model):
         verbose_name = _('Don')
         verbose_name_plural = _('Dons')
         ordering = ['-created_at']
+        indexes = [
+            # Dashboard / exports : filtre par statut, tri par date
+            models.Index(fields=['status', '-created_at'], name='donation_status_created_idx'),
+        ]
 
     def __str__(self):
         name = self.user.username if self.user and not self.is_anonymous else "Anonyme"
         return f"Don de {self.amount} {self.currency} par {name}"
+
+
+class Receipt(models.Model):
+    """Reçu d'un don ou relevé annuel d'un donateur (PDF généré, voir services.py)"""
+
+    class Kind(models.TextChoices):
+        DONATION = 'DONATION', _('Reçu de don')
+        ANNUAL = 'ANNUAL', _('Relevé annuel')
+
+    kind = models.CharField(_('Type'), max_length=10, choices=Kind.choices)
+    number = models.CharField(_('Numéro'), max_length=30, unique=True)
+    donor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='receipts')
+    donation = models.OneToOneField(
+        Donation, on_delete=models.CASCADE, null=True, blank=True, related_name='receipt'
+    )
+    year = models.PositiveSmallIntegerField(_('Année'))
+    # Empreinte des données rendues : le fichier n'est régénéré que si elle change
+    fingerprint = models.CharField(_('Empreinte'), max_length=64)
+    file = models.FileField(_('Fichier PDF'), upload_to='receipts/')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Reçu')
+        verbose_name_plural = _('Reçus')
+        ordering = ['-year', 'number']
+        indexes = [
+            models.Index(fields=['donor', 'kind', 'year'], name='receipt_donor_kind_year_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.number}"
@@ -0,0 +1,106 @@
+"""
+Rendu PDF (reportlab) des reçus de dons et des relevés annuels.
+
+Ce module n'importe pas Django : ``render`` est exécutée dans les processus du
+pool de génération (voir services.py) et ne reçoit que des données simples
+(``payload``), préparées dans le processus principal. Les PDF sont produits en
+mode ``invariant`` (ni date de création ni identifiant aléatoire) : les mêmes
+données donnent toujours les mêmes octets.
+"""
+from io import BytesIO
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+
+# À incrémenter quand la mise en page change : tous les documents sont régénérés
+LAYOUT_VERSION = 1
+
+MARGIN = 20 * mm
+LINE = 6 * mm
+
+
+def money(amount, currency):
+    return f"{amount} {currency}"
+
+
+class Page:
+    """Canvas avec curseur vertical et saut de page automatique."""
+
+    def __init__(self, buffer, payload):
+        self.canvas = canvas.Canvas(buffer, pagesize=A4, invariant=1)
+        self.canvas.setTitle(payload['title'])
+        self.canvas.setAuthor(payload['church']['name'])
+        self.payload = payload
+        self.width, self.height = A4
+        self.header()
+
+    def header(self):
+        church = self.payload['church']
+        self.y = self.height - MARGIN
+        self.text(church['name'], size=16, bold=True)
+        for line in (church['address'], church['email'], church['phone'], church['website']):
+            if line:
+                self.text(line, size=9)
+        self.y -= LINE
+        self.text(self.payload['title'], size=14, bold=True)
+        self.text(f"N° {self.payload['number']}", size=10)
+        self.y -= LINE / 2
+
+    def text(self, value, x=MARGIN, size=11, bold=False, advance=True):
+        if self.y < MARGIN + LINE:
+            self.canvas.showPage()
+            self.header()
+        self.canvas.setFont('Helvetica-Bold' if bold else 'Helvetica', size)
+        self.canvas.drawString(x, self.y, str(value))
+        if advance:
+            self.y -= LINE
+
+    def right(self, value, size=11, bold=False):
+        self.canvas.setFont('Helvetica-Bold' if bold else 'Helvetica', size)
+        self.canvas.drawRightString(self.width - MARGIN, self.y, str(value))
+
+    def row(self, *columns, bold=False):
+        """Ligne de tableau : colonnes à gauche, montant aligné à droite."""
+        *cells, amount = columns
+        for index, cell in enumerate(cells):
+            self.text(cell, x=MARGIN + index * 35 * mm, size=10, bold=bold, advance=False)
+        self.right(amount, size=10, bold=bold)
+        self.y -= LINE
+
+    def finish(self):
+        self.canvas.setFont('Helvetica-Oblique', 8)
+        self.canvas.drawString(MARGIN, MARGIN / 2, self.payload['footer'])
+        self.canvas.save()
+
+
+def render(payload):
+    """PDF (octets) d'un reçu (``kind`` = 'DONATION') ou d'un relevé annuel ('ANNUAL')."""
+    buffer = BytesIO()
+    page = Page(buffer, payload)
+    donor = payload['donor']
+    page.text(f"Donateur : {donor['name']}", bold=True)
+    if donor['email']:
+        page.text(donor['email'], size=10)
+    page.y -= LINE / 2
+
+    if payload['kind'] == 'DONATION':
+        donation = payload['donations'][0]
+        page.text(f"Date du don : {donation['date']}")
+        page.text(f"Affectation : {donation['project']}")
+        page.text(f"Référence du paiement : {donation['reference']}")
+        page.y -= LINE / 2
+        page.text(f"Montant reçu : {money(donation['amount'], donation['currency'])}", size=13, bold=True)
+    else:
+        page.text(f"Période : du 1er janvier au 31 décembre {payload['year']}")
+        page.y -= LINE / 2
+        page.row('Date', 'Reçu', 'Affectation', 'Montant', bold=True)
+        for donation in payload['donations']:
+            page.row(donation['date'], donation['number'], donation['project'][:30],
+                     money(donation['amount'], donation['currency']))
+        page.y -= LINE / 2
+        for currency, total in payload['totals']:
+            page.row(f"Total {payload['year']}", '', '', money(total, currency), bold=True)
+
+    page.finish()
+    return buffer.getvalue()
@@ -1,7 +1,21 @@
+import functools
+import hashlib
+import json
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal
+
 import paypalrestsdk
 from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
 import logging
 
+from .models import Donation, Receipt
+from .receipts import LAYOUT_VERSION, render
+
 logger = logging.getLogger(__name__)
 
 class PayPalService:
@@ -61,3 +75,179 @@ class PayPalService:
         else:
             logger.error(f"Erreur PayPal Execute: {payment.error}")
             return None
+
+
+class ReceiptService:
+    """
+    Reçus de dons et relevés annuels en PDF (rendu : receipts.py).
+
+    Les données de chaque document (``payload``) sont préparées ici ; leur
+    empreinte SHA-256 sert de nom de fichier (``receipts/ab/abcd….pdf``). Un
+    document n'est rendu que si son empreinte a changé, c'est-à-dire si les
+    dons concernés, le donateur, CHURCH_INFO ou la mise en page ont changé.
+    Un lot (``generate``) est rendu par un pool de processus et chaque document
+    est enregistré dès qu'il est prêt : relancé après une interruption, il ne
+    refait que ce qui manque. ``manage.py generate_receipts`` lance un lot.
+    """
+
+    CHUNK_SIZE = 8
+
+    @staticmethod
+    def receipt_number(donation):
+        return f"D{timezone.localtime(donation.created_at).year}-{donation.pk:06d}"
+
+    @staticmethod
+    def statement_number(user_id, year):
+        return f"A{year}-{user_id:06d}"
+
+    @staticmethod
+    def completed(year):
+        """Dons complétés et rattachés à un compte, pour une année civile."""
+        return Donation.objects.filter(
+            status=Donation.Status.COMPLETED, user__isnull=False, created_at__year=year
+        ).select_related('user')
+
+    @staticmethod
+    def line(donation):
+        return {
+            'number': ReceiptService.receipt_number(donation),
+            'date': timezone.localtime(donation.created_at).date().isoformat(),
+            'amount': str(donation.amount),
+            'currency': donation.currency,
+            'project': donation.project or 'Général',
+            'reference': donation.paypal_payment_id,
+        }
+
+    @staticmethod
+    def payload(kind, number, title, user, year, donations):
+        church = settings.CHURCH_INFO
+        return {
+            'layout': LAYOUT_VERSION,
+            'kind': str(kind),  # valeur simple : le payload est transmis aux processus de rendu
+            'number': number,
+            'title': title,
+            'year': year,
+            'church': dict(church),
+            'donor': {'name': user.get_full_name() or user.username, 'email': user.email},
+            'donations': [ReceiptService.line(donation) for donation in donations],
+            'footer': f"Document délivré par {church['name']}, à conserver avec vos justificatifs.",
+        }
+
+    @staticmethod
+    def donation_payload(donation):
+        year = timezone.localtime(donation.created_at).year
+        return ReceiptService.payload(
+            Receipt.Kind.DONATION, ReceiptService.receipt_number(donation), 'Reçu de don',
+            donation.user, year, [donation]
+        )
+
+    @staticmethod
+    def annual_payload(user, year, donations):
+        payload = ReceiptService.payload(
+            Receipt.Kind.ANNUAL, ReceiptService.statement_number(user.pk, year), f'Relevé annuel des dons {year}',
+            user, year, donations
+        )
+        totals = defaultdict(Decimal)
+        for donation in donations:
+            totals[donation.currency] += donation.amount
+        payload['totals'] = [[currency, str(total)] for currency, total in sorted(totals.items())]
+        return payload
+
+    @staticmethod
+    def documents(kind, year):
+        """``(donor_id, donation_id, payload)`` de chaque document d'une année."""
+        queryset = ReceiptService.completed(year).order_by('user_id', 'created_at', 'pk')
+        if kind == Receipt.Kind.DONATION:
+            for donation in queryset.iterator(chunk_size=500):
+                yield donation.user_id, donation.pk, ReceiptService.donation_payload(donation)
+            return
+        donations = []
+        for donation in queryset.iterator(chunk_size=500):
+            if donations and donations[-1].user_id != donation.user_id:
+                yield donations[0].user_id, None, ReceiptService.annual_payload(donations[0].user, year, donations)
+                donations = []
+            donations.append(donation)
+        if donations:
+            yield donations[0].user_id, None, ReceiptService.annual_payload(donations[0].user, year, donations)
+
+    @staticmethod
+    def fingerprint(payload):
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def store(current, donor_id, donation_id, payload, fingerprint, content):
+        """Écrit le PDF sous son empreinte et met à jour (ou crée) le ``Receipt``."""
+        storage = Receipt._meta.get_field('file').storage
+        name = f'receipts/{fingerprint[:2]}/{fingerprint}.pdf'
+        if not storage.exists(name):
+            name = storage.save(name, ContentFile(content))
+        receipt = current or Receipt(number=payload['number'])
+        previous = receipt.file.name if current else None
+        receipt.kind, receipt.year = payload['kind'], payload['year']
+        receipt.donor_id, receipt.donation_id = donor_id, donation_id
+        receipt.fingerprint = fingerprint
+        receipt.file.name = name
+        receipt.save()
+        if previous and previous != name:
+            storage.delete(previous)
+        return receipt
+
+    @staticmethod
+    def ensure(donor_id, donation_id, payload):
+        """Document à jour, rendu dans ce processus si nécessaire (téléchargement à la demande)."""
+        fingerprint = ReceiptService.fingerprint(payload)
+        current = Receipt.objects.filter(number=payload['number']).first()
+        if current and current.fingerprint == fingerprint and current.file.storage.exists(current.file.name):
+            return current
+        return ReceiptService.store(current, donor_id, donation_id, payload, fingerprint, render(payload))
+
+    @staticmethod
+    def receipt_for(donation):
+        return ReceiptService.ensure(donation.user_id, donation.pk, ReceiptService.donation_payload(donation))
+
+    @staticmethod
+    def statement_for(user, year):
+        """Relevé annuel du donateur, ``None`` s'il n'a aucun don complété cette année-là."""
+        donations = list(ReceiptService.completed(year).filter(user=user).order_by('created_at', 'pk'))
+        if not donations:
+            return None
+        return ReceiptService.ensure(user.pk, None, ReceiptService.annual_payload(user, year, donations))
+
+    @staticmethod
+    @contextmanager
+    def renderer(workers):
+        """``map`` de rendu : pool de processus (« spawn », sans Django) ou ce processus si workers <= 1."""
+        if workers <= 1:
+            yield map
+            return
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            yield functools.partial(pool.map, chunksize=ReceiptService.CHUNK_SIZE)
+
+    @staticmethod
+    def generate(year, kinds=None, force=False, workers=None):
+        """Génère les documents d'une année ; retourne ``{'rendered', 'unchanged', 'deleted'}``."""
+        kinds = kinds or list(Receipt.Kind.values)
+        existing = {receipt.number: receipt for receipt in Receipt.objects.filter(year=year, kind__in=kinds)}
+        stale, seen, unchanged = [], set(), 0
+        for kind in kinds:
+            for donor_id, donation_id, payload in ReceiptService.documents(kind, year):
+                seen.add(payload['number'])
+                fingerprint = ReceiptService.fingerprint(payload)
+                current = existing.get(payload['number'])
+                if current and current.fingerprint == fingerprint and not force:
+                    unchanged += 1
+                    continue
+                stale.append((current, donor_id, donation_id, payload, fingerprint))
+
+        workers = settings.RECEIPT_WORKERS if workers is None else workers
+        with ReceiptService.renderer(workers) as render_all:
+            contents = render_all(render, [job[3] for job in stale])
+            for job, content in zip(stale, contents):
+                ReceiptService.store(*job, content)
+
+        # Dons annulés ou remboursés depuis le lot précédent
+        obsolete = [receipt for number, receipt in existing.items() if number not in seen]
+        for receipt in obsolete:
+            receipt.file.delete(save=False)
+            receipt.delete()
+        return {'rendered': len(stale), 'unchanged': unchanged, 'deleted': len(obsolete)}
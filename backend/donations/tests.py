@@ -0,0 +1,177 @@
+import datetime
+import json
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from PyPDF2 import PdfReader
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .models import Donation, Receipt
+from .services import ReceiptService
+
+User = get_user_model()
+
+
+class DonationExportTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'adminpass123')
+        self.client.force_authenticate(user=self.admin)
+
+    def create_donations(self, count, offset=0):
+        for index in range(offset, offset + count):
+            donor = User.objects.create(username=f'donor{index}', email=f'donor{index}@example.com')
+            Donation.objects.create(user=donor, amount='10.00', paypal_payment_id=f'PAY-{index}')
+
+    def export(self, output):
+        response = self.client.get('/api/admin/donations/export/', {'output': output})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_export_streams_rows_with_constant_queries(self):
+        self.create_donations(3)
+        with self.assertNumQueries(1):
+            small = self.export('csv')
+        self.create_donations(20, offset=3)
+        with self.assertNumQueries(1):
+            large = self.export('csv')
+
+        self.assertEqual(len(small.splitlines()), 4)
+        self.assertEqual(len(large.splitlines()), 24)
+        self.assertTrue(large.startswith('Date,Donateur,Email,Montant'))
+
+    def test_jsonl_export(self):
+        self.create_donations(2)
+        lines = self.export('jsonl').splitlines()
+        self.assertEqual(len(lines), 2)
+        row = json.loads(lines[0])
+        self.assertEqual(row['amount'], '10.00')
+        self.assertTrue(row['email'].endswith('@example.com'))
+
+    def test_legacy_export_csv_action(self):
+        self.create_donations(1)
+        response = self.client.get('/api/admin/donations/export_csv/')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="donations.csv"')
+        header = b''.join(response.streaming_content).decode('utf-8').splitlines()[0]
+        self.assertEqual(header, 'Date,Donateur,Email,Montant,Projet,Statut')
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get('/api/admin/donations/export/', {'output': 'xlsx'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+def pdf_text(content):
+    return '\n'.join(page.extract_text() for page in PdfReader(BytesIO(content)).pages)
+
+
+class ReceiptTests(APITestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.year = timezone.localdate().year - 1
+        self.donors = [
+            User.objects.create(username=f'donateur{index}', first_name='Marie', last_name=f'Nom{index}')
+            for index in range(3)
+        ]
+        self.donations = [
+            self.donate(donor, amount, project=project)
+            for donor, amount, project in [
+                (self.donors[0], '50.00', 'Mission'), (self.donors[0], '25.50', None),
+                (self.donors[1], '100.00', None), (self.donors[2], '10.00', None),
+            ]
+        ]
+        self.donate(self.donors[2], '999.00', status=Donation.Status.FAILED)
+
+    def donate(self, user, amount, project=None, status=Donation.Status.COMPLETED):
+        donation = Donation.objects.create(
+            user=user, amount=amount, project=project, status=status,
+            paypal_payment_id=f'PAY-{Donation.objects.count()}'
+        )
+        # Dons de l'année précédente, en milieu d'année (indépendant du fuseau)
+        Donation.objects.filter(pk=donation.pk).update(
+            created_at=timezone.make_aware(datetime.datetime(self.year, 6, 1 + donation.pk))
+        )
+        donation.refresh_from_db()
+        return donation
+
+    def read(self, receipt):
+        with receipt.file.open('rb') as source:
+            return source.read()
+
+    def test_batch_generates_receipts_and_statements_incrementally(self):
+        stats = ReceiptService.generate(self.year, workers=2)
+        self.assertEqual(stats, {'rendered': 7, 'unchanged': 0, 'deleted': 0})  # 4 reçus + 3 relevés
+
+        statement = Receipt.objects.get(kind=Receipt.Kind.ANNUAL, donor=self.donors[0])
+        self.assertEqual(statement.number, f'A{self.year}-{self.donors[0].pk:06d}')
+        self.assertEqual(statement.file.name, f'receipts/{statement.fingerprint[:2]}/{statement.fingerprint}.pdf')
+        text = pdf_text(self.read(statement))
+        self.assertIn('Marie Nom0', text)
+        self.assertIn('75.50 EUR', text)
+
+        # Relance : rien n'a changé, rien n'est rendu
+        self.assertEqual(ReceiptService.generate(self.year, workers=1)['rendered'], 0)
+
+        # Don modifié : son reçu et le relevé du donateur seulement
+        Donation.objects.filter(pk=self.donations[1].pk).update(amount='30.00')
+        old_name = statement.file.name
+        self.assertEqual(ReceiptService.generate(self.year, workers=1), {'rendered': 2, 'unchanged': 5, 'deleted': 0})
+        statement.refresh_from_db()
+        self.assertIn('80.00 EUR', pdf_text(self.read(statement)))
+        self.assertFalse(statement.file.storage.exists(old_name))
+
+        # Don annulé : reçu et relevé retirés
+        Donation.objects.filter(pk=self.donations[3].pk).update(status=Donation.Status.CANCELLED)
+        self.assertEqual(ReceiptService.generate(self.year, workers=1)['deleted'], 2)
+        self.assertFalse(Receipt.objects.filter(donor=self.donors[2]).exists())
+
+    def test_rendering_is_deterministic(self):
+        payload = ReceiptService.donation_payload(self.donations[0])
+        first = ReceiptService.ensure(self.donors[0].pk, self.donations[0].pk, payload)
+        content, name = self.read(first), first.file.name
+        first.file.delete(save=False)
+
+        second = ReceiptService.ensure(self.donors[0].pk, self.donations[0].pk, payload)
+        self.assertEqual(self.read(second), content)
+        self.assertEqual(second.file.name, name)
+
+    def test_member_downloads_own_receipt_and_statement(self):
+        self.client.force_authenticate(self.donors[0])
+        response = self.client.get(f'/api/donations/{self.donations[0].pk}/receipt/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn('private', response['Cache-Control'])
+        number = ReceiptService.receipt_number(self.donations[0])
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="{number}.pdf"')
+        self.assertIn('50.00 EUR', pdf_text(b''.join(response.streaming_content)))
+
+        response = self.client.get(f'/api/donations/{self.donations[2].pk}/receipt/')
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(f'/api/donations/statements/{self.year}/')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(f'/api/donations/statements/{self.year - 1}/')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('error', response.data)
+
+    def test_admin_statement_and_command(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'adminpass123')
+        self.client.force_authenticate(admin)
+        response = self.client.get(
+            '/api/admin/donations/statement/', {'user': self.donors[1].pk, 'year': self.year}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('100.00 EUR', pdf_text(b''.join(response.streaming_content)))
+
+        out = StringIO()
+        call_command('generate_receipts', '--year', str(self.year), '--kind', 'DONATION', '--workers', '1', stdout=out)
+        self.assertIn('4 document(s) générés', out.getvalue())
@@ -1,8 +1,12 @@
 from django.urls import path
-from .views import CreateDonationView, ExecuteDonationView, DonationListView
+from .views import (
+    AnnualStatementView, CreateDonationView, DonationListView, DonationReceiptView, ExecuteDonationView
+)
 
 urlpatterns = [
     path('', DonationListView.as_view(), name='donation_list'),
     path('create/', CreateDonationView.as_view(), name='donation_create'),
     path('execute/', ExecuteDonationView.as_view(), name='donation_execute'),
+    path('<int:pk>/receipt/', DonationReceiptView.as_view(), name='donation_receipt'),
+    path('statements/<int:year>/', AnnualStatementView.as_view(), name='donation_statement'),
 ]
@@ -1,9 +1,18 @@
 from rest_framework import views, status, permissions
 from rest_framework.response import Response
 from django.conf import settings
+from django.shortcuts import get_object_or_404
+from cyprus_api.downloads import file_response
 from .models import Donation
 from .serializers import DonationSerializer
-from .services import PayPalService
+from .services import PayPalService, ReceiptService
+
+
+def receipt_response(request, receipt):
+    """PDF d'un reçu ou relevé : téléchargement privé, revalidé à chaque fois (ETag)"""
+    return file_response(
+        request, receipt.file, filename=f'{receipt.number}.pdf', as_attachment=True, max_age=0, private=True
+    )
 
 class CreateDonationView(views.APIView):
     permission_classes = [permissions.AllowAny]
@@ -97,3 +106,25 @@ class DonationListView(views.APIView):
         
         serializer = DonationSerializer(donations, many=True)
         return Response(serializer.data)
+
+
+class DonationReceiptView(views.APIView):
+    """GET /api/donations/<id>/receipt/ : reçu PDF d'un don complété du membre connecté"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        donation = get_object_or_404(
+            Donation.objects.select_related('user'), pk=pk, user=request.user, status=Donation.Status.COMPLETED
+        )
+        return receipt_response(request, ReceiptService.receipt_for(donation))
+
+
+class AnnualStatementView(views.APIView):
+    """GET /api/donations/statements/<année>/ : relevé annuel PDF des dons du membre connecté"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, year):
+        receipt = ReceiptService.statement_for(request.user, year)
+        if receipt is None:
+            return Response({"error": "Aucun don complété pour cette année"}, status=status.HTTP_404_NOT_FOUND)
+        return receipt_response(request, receipt)
@@ -0,0 +1,34 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Announcement, AnnouncementDelivery, OutgoingEmail
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    readonly_fields = ('attempts', 'last_error', 'created_at', 'sent_at')
+    actions = ['retry']
+
+    @admin.action(description="Renvoyer les emails sélectionnés")
+    def retry(self, request, queryset):
+        queryset.exclude(status=OutgoingEmail.Status.SENT).update(
+            status=OutgoingEmail.Status.PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+
+
+@admin.register(Announcement)
+class AnnouncementAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'status', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('rendered', 'created_at', 'finished_at')
+
+
+@admin.register(AnnouncementDelivery)
+class AnnouncementDeliveryAdmin(admin.ModelAdmin):
+    list_display = ('email', 'announcement', 'language', 'status', 'sent_at')
+    list_filter = ('status', 'language')
+    search_fields = ('email',)
+    raw_id_fields = ('announcement', 'user')
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .admin_views import AdminAnnouncementViewSet
+
+router = DefaultRouter()
+router.register(r'announcements', AdminAnnouncementViewSet, basename='admin-announcements')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
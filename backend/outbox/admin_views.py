@@ -0,0 +1,15 @@
+from rest_framework import viewsets
+
+from users.permissions import IsAdmin
+from .models import Announcement
+from .serializers import AnnouncementSerializer
+
+
+class AdminAnnouncementViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Suivi des annonces envoyées à l'assemblée. Création :
+    POST /api/admin/sermons/{id}/announce/ ou /api/admin/events/{id}/announce/
+    """
+    queryset = Announcement.objects.all()
+    serializer_class = AnnouncementSerializer
+    permission_classes = [IsAdmin]
@@ -0,0 +1,47 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from outbox.services import Announcements, Outbox
+
+
+class Command(BaseCommand):
+    help = "Envoie les emails et annonces en attente (processus permanent, ou --once pour vider la file)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Vide la file puis s'arrête (tâche planifiée)")
+        parser.add_argument('--batch-size', type=int, default=None, help="Emails par lot (une connexion SMTP)")
+        parser.add_argument('--interval', type=float, default=None, help="Pause entre deux relevés (secondes)")
+
+    def handle(self, *args, **options):
+        interval = options['interval'] if options['interval'] is not None else settings.OUTBOX_POLL_INTERVAL
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+
+        total = 0
+        try:
+            while not self.stopping:
+                close_old_connections()
+                # Emails transactionnels d'abord, puis un paquet d'annonces (débit limité)
+                claimed, sent = Outbox.process_batch(options['batch_size'])
+                announced_claimed, announced = Announcements.process_chunk()
+                total += sent + announced
+                if claimed or announced_claimed:
+                    self.stdout.write(
+                        f"{sent}/{claimed} email(s), {announced}/{announced_claimed} annonce(s) envoyé(s)."
+                    )
+                if sent or announced:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Arrêt du worker : {total} email(s) envoyé(s)."))
+
+    def stop(self, signum, frame):
+        # Termine le lot en cours avant de s'arrêter
+        self.stopping = True
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('outbox', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Announcement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('SERMON', 'Message / Prédication'), ('EVENT', 'Événement')], max_length=10, verbose_name='Type')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name="Identifiant de l'objet annoncé")),
+                ('rendered', models.JSONField(default=dict, verbose_name='Messages rendus')),
+                ('status', models.CharField(choices=[('SENDING', "En cours d'envoi"), ('SENT', 'Envoyée')], default='SENDING', max_length=10, verbose_name='Statut')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Terminée le')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='announcements', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Annonce',
+                'verbose_name_plural': 'Annonces',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AnnouncementDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, verbose_name='Email')),
+                ('language', models.CharField(max_length=5, verbose_name='Langue')),
+                ('status', models.CharField(choices=[('PENDING', 'En attente'), ('SENDING', "En cours d'envoi"), ('SENT', 'Envoyé'), ('FAILED', 'Échec'), ('UNKNOWN', 'Inconnu (envoi interrompu)')], default='PENDING', max_length=10, verbose_name='Statut')),
+                ('claimed_at', models.DateTimeField(blank=True, null=True, verbose_name='Réservé le')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Envoyé le')),
+                ('error', models.TextField(blank=True, verbose_name='Erreur')),
+                ('announcement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='outbox.announcement')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='announcement_deliveries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': "Envoi d'annonce",
+                'verbose_name_plural': "Envois d'annonce",
+                'indexes': [models.Index(fields=['status', 'announcement'], name='announcement_delivery_idx')],
+                'unique_together': {('announcement', 'email')},
+            },
+        ),
+    ]
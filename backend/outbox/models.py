@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class OutgoingEmail(models.Model):
+    """
+    Email en attente d'envoi. Créé dans la transaction de la modification
+    métier (voir Outbox.enqueue) puis envoyé par ``manage.py run_mail_worker``.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', _('En attente')
+        SENDING = 'SENDING', _("En cours d'envoi")
+        SENT = 'SENT', _('Envoyé')
+        FAILED = 'FAILED', _('Échec définitif')
+
+    subject = models.CharField(_('Sujet'), max_length=255)
+    body = models.TextField(_('Message'))
+    html_body = models.TextField(_('Message HTML'), blank=True)
+    from_email = models.CharField(_('Expéditeur'), max_length=255)
+    to = models.JSONField(_('Destinataires'), default=list)
+
+    status = models.CharField(_('Statut'), max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(_('Tentatives'), default=0)
+    # Prochaine tentative ; pendant un envoi (SENDING), fin du bail du worker
+    next_attempt_at = models.DateTimeField(_('Prochaine tentative'), default=timezone.now)
+    last_error = models.TextField(_('Dernière erreur'), blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(_('Envoyé le'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Email sortant')
+        verbose_name_plural = _('Emails sortants')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)} ({self.status})"
+
+
+class Announcement(models.Model):
+    """
+    Annonce envoyée par email à l'assemblée (nouveau message, événement).
+    Le texte est rendu une fois par langue à la création ; chaque destinataire
+    a sa ligne AnnouncementDelivery.
+    """
+    class Kind(models.TextChoices):
+        SERMON = 'SERMON', _('Message / Prédication')
+        EVENT = 'EVENT', _('Événement')
+
+    class Status(models.TextChoices):
+        SENDING = 'SENDING', _("En cours d'envoi")
+        SENT = 'SENT', _('Envoyée')
+
+    kind = models.CharField(_('Type'), max_length=10, choices=Kind.choices)
+    object_id = models.PositiveBigIntegerField(_("Identifiant de l'objet annoncé"))
+    # {langue: {"subject": ..., "body": ...}}
+    rendered = models.JSONField(_('Messages rendus'), default=dict)
+    status = models.CharField(_('Statut'), max_length=10, choices=Status.choices, default=Status.SENDING)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='announcements'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(_('Terminée le'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Annonce')
+        verbose_name_plural = _('Annonces')
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id} ({self.status})"
+
+
+class AnnouncementDelivery(models.Model):
+    """Envoi d'une annonce à un destinataire."""
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', _('En attente')
+        SENDING = 'SENDING', _("En cours d'envoi")
+        SENT = 'SENT', _('Envoyé')
+        FAILED = 'FAILED', _('Échec')
+        # Le worker s'est arrêté pendant l'envoi : peut-être reçu, jamais renvoyé
+        UNKNOWN = 'UNKNOWN', _('Inconnu (envoi interrompu)')
+
+    announcement = models.ForeignKey(Announcement, on_delete=models.CASCADE, related_name='deliveries')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='announcement_deliveries'
+    )
+    email = models.EmailField(_('Email'))
+    language = models.CharField(_('Langue'), max_length=5)
+    status = models.CharField(_('Statut'), max_length=10, choices=Status.choices, default=Status.PENDING)
+    claimed_at = models.DateTimeField(_('Réservé le'), null=True, blank=True)
+    sent_at = models.DateTimeField(_('Envoyé le'), null=True, blank=True)
+    error = models.TextField(_('Erreur'), blank=True)
+
+    class Meta:
+        verbose_name = _("Envoi d'annonce")
+        verbose_name_plural = _("Envois d'annonce")
+        unique_together = ['announcement', 'email']
+        indexes = [
+            models.Index(fields=['status', 'announcement'], name='announcement_delivery_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.email} ({self.status})"
@@ -0,0 +1,18 @@
+from django.db.models import Count
+from rest_framework import serializers
+
+from .models import Announcement
+
+
+class AnnouncementSerializer(serializers.ModelSerializer):
+    """Annonce et progression de l'envoi (compteurs par statut de destinataire)."""
+    recipients = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Announcement
+        fields = ('id', 'kind', 'object_id', 'status', 'recipients', 'created_by', 'created_at', 'finished_at')
+        read_only_fields = fields
+
+    def get_recipients(self, obj):
+        counts = dict(obj.deliveries.order_by().values_list('status').annotate(total=Count('id')))
+        return {'total': sum(counts.values()), **{status.lower(): total for status, total in counts.items()}}
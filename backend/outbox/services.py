@@ -0,0 +1,330 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Announcement, AnnouncementDelivery, OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+class Outbox:
+    """
+    File d'envoi des emails.
+
+    ``enqueue`` écrit l'email en base : appelé dans la transaction de la
+    modification métier, il est validé (ou annulé) avec elle et la requête HTTP
+    ne dépend plus du serveur SMTP. Le worker (``manage.py run_mail_worker``)
+    réserve les emails dus par lots, les envoie sur une seule connexion SMTP
+    par lot et replanifie les échecs avec un délai exponentiel.
+    """
+
+    @staticmethod
+    def enqueue(subject, body, to, from_email=None, html_body=''):
+        return OutgoingEmail.objects.create(
+            subject=subject,
+            body=body,
+            html_body=html_body,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            to=list(to),
+        )
+
+    @staticmethod
+    def claim_batch(size=None):
+        """
+        Réserve jusqu'à ``size`` emails dus et les passe en SENDING pour la durée
+        du bail (OUTBOX_LEASE_SECONDS) ; un worker arrêté en plein envoi voit ses
+        emails repris à l'expiration du bail.
+        """
+        size = size or settings.OUTBOX_BATCH_SIZE
+        now = timezone.now()
+        due = OutgoingEmail.objects.filter(
+            status__in=[OutgoingEmail.Status.PENDING, OutgoingEmail.Status.SENDING],
+            next_attempt_at__lte=now,
+        ).order_by('next_attempt_at', 'id')
+
+        with transaction.atomic():
+            # SKIP LOCKED : plusieurs workers se partagent la file sans s'attendre
+            skip_locked = connection.features.has_select_for_update_skip_locked
+            ids = list(due.select_for_update(skip_locked=skip_locked).values_list('id', flat=True)[:size])
+            if not ids:
+                return []
+            OutgoingEmail.objects.filter(id__in=ids).update(
+                status=OutgoingEmail.Status.SENDING,
+                next_attempt_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+            )
+        return list(OutgoingEmail.objects.filter(id__in=ids).order_by('next_attempt_at', 'id'))
+
+    @staticmethod
+    def retry_delay(attempts):
+        return min(settings.OUTBOX_RETRY_BACKOFF * 2 ** (attempts - 1), settings.OUTBOX_RETRY_BACKOFF_MAX)
+
+    @staticmethod
+    def mark_failed(email, error):
+        email.attempts += 1
+        email.last_error = str(error)[:2000]
+        if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            email.status = OutgoingEmail.Status.FAILED
+            logger.error(f"Email {email.id} abandonné après {email.attempts} tentatives : {error}")
+        else:
+            email.status = OutgoingEmail.Status.PENDING
+            email.next_attempt_at = timezone.now() + timedelta(seconds=Outbox.retry_delay(email.attempts))
+            logger.warning(f"Email {email.id} : tentative {email.attempts} échouée ({error}), nouvel essai prévu")
+        email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+    @staticmethod
+    def mark_sent(email):
+        email.attempts += 1
+        email.status = OutgoingEmail.Status.SENT
+        email.sent_at = timezone.now()
+        email.last_error = ''
+        email.save(update_fields=['attempts', 'status', 'sent_at', 'last_error'])
+
+    @staticmethod
+    def send_batch(emails):
+        """Envoie les emails réservés sur une seule connexion ; retourne le nombre envoyé."""
+        smtp = get_connection(fail_silently=False)
+        try:
+            smtp.open()
+        except Exception as exc:
+            for email in emails:
+                Outbox.mark_failed(email, exc)
+            return 0
+
+        sent = 0
+        try:
+            for email in emails:
+                message = EmailMultiAlternatives(
+                    email.subject, email.body, email.from_email, email.to, connection=smtp
+                )
+                if email.html_body:
+                    message.attach_alternative(email.html_body, 'text/html')
+                try:
+                    message.send()
+                except Exception as exc:
+                    Outbox.mark_failed(email, exc)
+                    # La connexion est peut-être rompue : le prochain envoi en rouvre une
+                    smtp.close()
+                else:
+                    Outbox.mark_sent(email)
+                    sent += 1
+        finally:
+            smtp.close()
+        return sent
+
+    @staticmethod
+    def process_batch(size=None):
+        """Réserve et envoie un lot ; retourne (réservés, envoyés)."""
+        emails = Outbox.claim_batch(size)
+        if not emails:
+            return 0, 0
+        return len(emails), Outbox.send_batch(emails)
+
+
+ANNOUNCEMENT_TEMPLATES = {
+    'SERMON': {
+        'fr': (
+            "Nouveau message : {title}",
+            "Bonjour,\n\n"
+            "Un nouveau message est disponible sur {church} : « {title} ».\n\n"
+            "{description}\n\n"
+            "À écouter ici : {url}\n\n"
+            "Cordialement,\n{church}\n\n"
+            "Pour ne plus recevoir ces annonces, modifiez vos préférences dans votre profil."
+        ),
+        'en': (
+            "New message: {title}",
+            "Hello,\n\n"
+            "A new message is available on {church}: \"{title}\".\n\n"
+            "{description}\n\n"
+            "Listen here: {url}\n\n"
+            "Blessings,\n{church}\n\n"
+            "To stop receiving these announcements, update your preferences in your profile."
+        ),
+    },
+    'EVENT': {
+        'fr': (
+            "Événement : {title} ({date})",
+            "Bonjour,\n\n"
+            "Vous êtes invité(e) : « {title} », le {date}{time}{location}.\n\n"
+            "{description}\n\n"
+            "Tous les détails : {url}\n\n"
+            "Cordialement,\n{church}\n\n"
+            "Pour ne plus recevoir ces annonces, modifiez vos préférences dans votre profil."
+        ),
+        'en': (
+            "Event: {title} ({date})",
+            "Hello,\n\n"
+            "You are invited: \"{title}\" on {date}{time}{location}.\n\n"
+            "{description}\n\n"
+            "All the details: {url}\n\n"
+            "Blessings,\n{church}\n\n"
+            "To stop receiving these announcements, update your preferences in your profile."
+        ),
+    },
+}
+
+
+class Announcements:
+    """
+    Annonces par email à l'assemblée.
+
+    ``create`` rend le message une fois par langue et insère en masse une ligne
+    par destinataire. Le worker (``run_mail_worker``) envoie ensuite les
+    destinataires par paquets, une connexion SMTP par paquet, au débit maximal
+    ANNOUNCEMENT_RATE_LIMIT (emails/seconde). Chaque ligne passe en SENDING
+    avant l'envoi : après un arrêt brutal, ces lignes deviennent UNKNOWN et ne
+    sont jamais renvoyées (pas de doublon) ; les lignes PENDING reprennent.
+    """
+
+    @staticmethod
+    def render(kind, obj):
+        """{langue: {"subject", "body"}} pour chaque langue du site."""
+        church = settings.CHURCH_INFO['name']
+        rendered = {}
+        for language, _name in settings.LANGUAGES:
+            subject, body = ANNOUNCEMENT_TEMPLATES[kind][language]
+            if kind == Announcement.Kind.SERMON:
+                context = {'url': f"{settings.FRONTEND_URL}/sermons"}
+            else:
+                date_format = '%d/%m/%Y' if language == 'fr' else '%m/%d/%Y'
+                context = {
+                    'url': f"{settings.FRONTEND_URL}/events",
+                    'date': obj.date.strftime(date_format),
+                    'time': f" {'à' if language == 'fr' else 'at'} {obj.time.strftime('%H:%M')}" if obj.time else '',
+                    'location': f" — {obj.location}" if obj.location else '',
+                }
+            context.update(title=obj.title, description=obj.description or '', church=church)
+            rendered[language] = {'subject': subject.format(**context), 'body': body.format(**context)}
+        return rendered
+
+    @staticmethod
+    def recipients():
+        """(id, email, langue) des membres actifs abonnés, un seul par adresse."""
+        from users.models import User
+
+        seen = set()
+        users = User.objects.filter(is_active=True, receive_announcements=True).exclude(email='').order_by('id')
+        for user_id, email, language in users.values_list('id', 'email', 'preferred_language').iterator():
+            if email.lower() not in seen:
+                seen.add(email.lower())
+                yield user_id, email, language
+
+    @staticmethod
+    @transaction.atomic
+    def create(kind, obj, created_by=None):
+        """Crée l'annonce et ses envois ; None si l'objet a déjà été annoncé."""
+        # Verrou sur l'objet annoncé : deux demandes simultanées ne créent pas deux envois
+        type(obj).objects.select_for_update().filter(pk=obj.pk).exists()
+        if Announcement.objects.filter(kind=kind, object_id=obj.pk).exists():
+            return None
+        announcement = Announcement.objects.create(
+            kind=kind, object_id=obj.pk, rendered=Announcements.render(kind, obj), created_by=created_by
+        )
+        AnnouncementDelivery.objects.bulk_create(
+            (
+                AnnouncementDelivery(announcement=announcement, user_id=user_id, email=email, language=language)
+                for user_id, email, language in Announcements.recipients()
+            ),
+            batch_size=1000,
+        )
+        if not announcement.deliveries.exists():
+            announcement.status = Announcement.Status.SENT
+            announcement.finished_at = timezone.now()
+            announcement.save(update_fields=['status', 'finished_at'])
+        return announcement
+
+    @staticmethod
+    def claim_chunk(size=None):
+        size = size or settings.ANNOUNCEMENT_CHUNK_SIZE
+        now = timezone.now()
+        # Envois interrompus (worker arrêté pendant le paquet) : statut inconnu, pas de renvoi
+        interrupted = AnnouncementDelivery.objects.filter(
+            status=AnnouncementDelivery.Status.SENDING,
+            claimed_at__lt=now - timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+        )
+        announcement_ids = set(interrupted.values_list('announcement_id', flat=True))
+        if announcement_ids:
+            interrupted.filter(announcement_id__in=announcement_ids).update(status=AnnouncementDelivery.Status.UNKNOWN)
+            # Paquet interrompu qui était le dernier : l'annonce ne resterait jamais « en cours »
+            Announcements.finish(announcement_ids)
+
+        with transaction.atomic():
+            skip_locked = connection.features.has_select_for_update_skip_locked
+            active = Announcement.objects.filter(status=Announcement.Status.SENDING).values_list('id', flat=True)
+            ids = list(
+                AnnouncementDelivery.objects.filter(
+                    status=AnnouncementDelivery.Status.PENDING, announcement_id__in=list(active)
+                ).order_by('announcement_id', 'id').select_for_update(skip_locked=skip_locked)
+                .values_list('id', flat=True)[:size]
+            )
+            if not ids:
+                return []
+            AnnouncementDelivery.objects.filter(id__in=ids).update(
+                status=AnnouncementDelivery.Status.SENDING, claimed_at=now
+            )
+        return list(AnnouncementDelivery.objects.filter(id__in=ids).select_related('announcement').order_by('id'))
+
+    @staticmethod
+    def send_chunk(deliveries):
+        """Envoie un paquet sur une seule connexion, au débit limité ; retourne le nombre envoyé."""
+        smtp = get_connection(fail_silently=False)
+        try:
+            smtp.open()
+        except Exception as exc:
+            logger.warning(f"Annonces : connexion SMTP impossible ({exc}), paquet remis en attente")
+            AnnouncementDelivery.objects.filter(id__in=[d.id for d in deliveries]).update(
+                status=AnnouncementDelivery.Status.PENDING, claimed_at=None
+            )
+            return 0
+
+        rate = settings.ANNOUNCEMENT_RATE_LIMIT
+        started = time.monotonic()
+        sent_ids, failed = [], []
+        try:
+            for index, delivery in enumerate(deliveries):
+                if rate > 0:
+                    time.sleep(max(0, started + index / rate - time.monotonic()))
+                rendered = delivery.announcement.rendered
+                content = rendered.get(delivery.language) or rendered['fr']
+                message = EmailMultiAlternatives(
+                    content['subject'], content['body'], settings.DEFAULT_FROM_EMAIL, [delivery.email]
+                )
+                try:
+                    # Un message par appel : statut exact par destinataire, même connexion
+                    smtp.send_messages([message])
+                except Exception as exc:
+                    delivery.status = AnnouncementDelivery.Status.FAILED
+                    delivery.error = str(exc)[:2000]
+                    failed.append(delivery)
+                    smtp.close()
+                else:
+                    sent_ids.append(delivery.id)
+        finally:
+            smtp.close()
+            AnnouncementDelivery.objects.filter(id__in=sent_ids).update(
+                status=AnnouncementDelivery.Status.SENT, sent_at=timezone.now()
+            )
+            AnnouncementDelivery.objects.bulk_update(failed, ['status', 'error'])
+            Announcements.finish({delivery.announcement_id for delivery in deliveries})
+        return len(sent_ids)
+
+    @staticmethod
+    def finish(announcement_ids):
+        """Marque envoyées les annonces qui n'ont plus de destinataire en attente."""
+        open_statuses = [AnnouncementDelivery.Status.PENDING, AnnouncementDelivery.Status.SENDING]
+        Announcement.objects.filter(id__in=announcement_ids, status=Announcement.Status.SENDING).exclude(
+            deliveries__status__in=open_statuses
+        ).update(status=Announcement.Status.SENT, finished_at=timezone.now())
+
+    @staticmethod
+    def process_chunk(size=None):
+        """Réserve et envoie un paquet ; retourne (réservés, envoyés)."""
+        deliveries = Announcements.claim_chunk(size)
+        if not deliveries:
+            return 0, 0
+        return len(deliveries), Announcements.send_chunk(deliveries)
@@ -0,0 +1,168 @@
+import time
+from datetime import date, timedelta
+from io import StringIO
+from smtplib import SMTPRecipientsRefused
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from about.models import Event
+from users.models import User
+from .models import Announcement, AnnouncementDelivery, OutgoingEmail
+from .services import Announcements, Outbox
+
+
+class CountingBackend(EmailBackend):
+    """Backend locmem qui compte les connexions et refuse les adresses @bounce.test."""
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if any(address.endswith('@bounce.test') for address in message.to):
+                raise SMTPRecipientsRefused({message.to[0]: (550, b'refused')})
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='outbox.tests.CountingBackend',
+    OUTBOX_MAX_ATTEMPTS=3, OUTBOX_RETRY_BACKOFF=60, OUTBOX_RETRY_BACKOFF_MAX=90,
+)
+class MailWorkerTests(TestCase):
+    def setUp(self):
+        CountingBackend.opened = 0
+
+    def run_worker(self):
+        call_command('run_mail_worker', once=True, stdout=StringIO())
+
+    def test_enqueue_follows_the_transaction(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Outbox.enqueue('Sujet', 'Corps', ['a@example.com'])
+            raise RuntimeError('rollback')
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_batch_is_sent_on_one_connection(self):
+        for i in range(5):
+            Outbox.enqueue(f'Sujet {i}', 'Corps', [f'user{i}@example.com'])
+        self.run_worker()
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(OutgoingEmail.objects.filter(status=OutgoingEmail.Status.SENT).count(), 5)
+
+    def test_failure_is_retried_with_backoff_then_abandoned(self):
+        email = Outbox.enqueue('Sujet', 'Corps', ['user@bounce.test'])
+        Outbox.enqueue('Autre', 'Corps', ['ok@example.com'])
+        self.run_worker()
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutgoingEmail.Status.PENDING, 1))
+        self.assertIn('refused', email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertEqual(len(mail.outbox), 1)
+
+        # Pas encore dû : le worker l'ignore
+        self.run_worker()
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 1)
+
+        for _ in range(2):
+            OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+            self.run_worker()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutgoingEmail.Status.FAILED, 3))
+
+    def test_expired_lease_is_reclaimed(self):
+        email = Outbox.enqueue('Sujet', 'Corps', ['a@example.com'])
+        self.assertEqual(Outbox.claim_batch(), [email])
+        self.assertEqual(Outbox.claim_batch(), [])
+
+        OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(Outbox.process_batch(), (1, 1))
+
+
+@override_settings(EMAIL_BACKEND='outbox.tests.CountingBackend', ANNOUNCEMENT_CHUNK_SIZE=2, ANNOUNCEMENT_RATE_LIMIT=0)
+class AnnouncementTests(APITestCase):
+    def setUp(self):
+        CountingBackend.opened = 0
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', role=User.Role.ADMIN, is_staff=True
+        )
+        User.objects.create_user(username='fr', email='fr@example.com')
+        User.objects.create_user(username='en', email='en@example.com', preferred_language=User.Language.EN)
+        User.objects.create_user(username='double', email='FR@example.com')
+        User.objects.create_user(username='optout', email='no@example.com', receive_announcements=False)
+        User.objects.create_user(username='inactive', email='old@example.com', is_active=False)
+        self.event = Event.objects.create(title='Veillée', description='Prière et louange', date=date(2026, 12, 24))
+
+    def run_worker(self):
+        call_command('run_mail_worker', once=True, stdout=StringIO())
+
+    def test_announce_renders_per_language_and_sends_in_chunks(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(f'/api/admin/events/{self.event.id}/announce/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['recipients'], {'total': 3, 'pending': 3})
+
+        self.run_worker()
+        subjects = {message.to[0]: message.subject for message in mail.outbox}
+        self.assertEqual(subjects, {
+            'admin@example.com': 'Événement : Veillée (24/12/2026)',
+            'fr@example.com': 'Événement : Veillée (24/12/2026)',
+            'en@example.com': 'Event: Veillée (12/24/2026)',
+        })
+        self.assertEqual(CountingBackend.opened, 2)  # 3 destinataires, paquets de 2
+        announcement = Announcement.objects.get()
+        self.assertEqual(announcement.status, Announcement.Status.SENT)
+
+    def test_interrupted_chunk_is_not_resent(self):
+        announcement = Announcements.create(Announcement.Kind.EVENT, self.event)
+        # Paquet réservé par un worker arrêté brutalement
+        interrupted = announcement.deliveries.order_by('id')[0]
+        AnnouncementDelivery.objects.filter(pk=interrupted.pk).update(
+            status=AnnouncementDelivery.Status.SENDING, claimed_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.run_worker()
+        interrupted.refresh_from_db()
+        self.assertEqual(interrupted.status, AnnouncementDelivery.Status.UNKNOWN)
+        self.assertNotIn(interrupted.email, [message.to[0] for message in mail.outbox])
+        self.assertEqual(len(mail.outbox), 2)
+        announcement.refresh_from_db()
+        self.assertEqual(announcement.status, Announcement.Status.SENT)
+
+    def test_interrupted_last_chunk_finishes_the_announcement(self):
+        announcement = Announcements.create(Announcement.Kind.EVENT, self.event)
+        announcement.deliveries.update(
+            status=AnnouncementDelivery.Status.SENDING, claimed_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.run_worker()
+        announcement.refresh_from_db()
+        self.assertEqual(announcement.status, Announcement.Status.SENT)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_object_is_announced_once(self):
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.post(f'/api/admin/events/{self.event.id}/announce/').status_code, 202)
+        response = self.client.post(f'/api/admin/events/{self.event.id}/announce/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Announcement.objects.count(), 1)
+        self.assertEqual(AnnouncementDelivery.objects.count(), 3)
+
+    @override_settings(ANNOUNCEMENT_RATE_LIMIT=20)
+    def test_sending_is_throttled(self):
+        Announcements.create(Announcement.Kind.EVENT, self.event)
+        started = time.monotonic()
+        self.run_worker()
+        self.assertEqual(len(mail.outbox), 3)
+        # 2 paquets : 0 + 1/20 s, puis 0 s
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
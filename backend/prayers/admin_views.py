@@ -1,14 +1,35 @@
 from rest_framework import viewsets
 from prayers.models import PrayerRequest
 from prayers.serializers import PrayerRequestSerializer
-from django.db.models import Q
+from search.services import SearchIndex
 from users.permissions import IsAdmin
+from cyprus_api.exports import StreamingExportMixin
 
-class AdminPrayerViewSet(viewsets.ModelViewSet):
+
+def prayer_author(prayer):
+    if prayer.is_anonymous:
+        return 'Anonyme'
+    if prayer.user:
+        return prayer.user.get_full_name() or prayer.user.username
+    return prayer.full_name or 'Anonyme'
+
+
+class AdminPrayerViewSet(StreamingExportMixin, viewsets.ModelViewSet):
     """ViewSet for admin prayer management"""
     queryset = PrayerRequest.objects.all().order_by('-created_at')
     serializer_class = PrayerRequestSerializer
     permission_classes = [IsAdmin]
+
+    export_filename = 'prayers'
+    export_select_related = ('user',)
+    export_fields = (
+        ('date', 'Date', 'created_at'),
+        ('author', 'Auteur', prayer_author),
+        ('email', 'Email', lambda p: '' if p.is_anonymous else (p.user.email if p.user else '')),
+        ('title', 'Sujet', 'title'),
+        ('content', 'Requête', 'content'),
+        ('status', 'Statut', 'status'),
+    )
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -16,11 +37,7 @@ class AdminPrayerViewSet(viewsets.ModelViewSet):
         # Search filter
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(user__first_name__icontains=search)
-            )
+            queryset = SearchIndex.filter_queryset(queryset, search)
         
         # Status filter
         status = self.request.query_params.get('status', None)
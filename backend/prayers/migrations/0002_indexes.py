@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prayers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prayerrequest',
+            index=models.Index(fields=['status', '-created_at'], name='prayer_status_created_idx'),
+        ),
+    ]
@@ -34,6 +34,9 @@ class PrayerRequest(models.Model):
         verbose_name = _('Requête de prière')
         verbose_name_plural = _('Requêtes de prière')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='prayer_status_created_idx'),
+        ]
 
     def __str__(self):
         name = self.user.username if self.user else (self.full_name or "Anonyme")
@@ -1,10 +1,11 @@
 from django.contrib import admin
-from .models import Rhema
+from .models import Rhema, RhemaGeneration
 
 @admin.register(Rhema)
 class RhemaAdmin(admin.ModelAdmin):
-    list_display = ('title', 'pastor', 'published_at', 'created_at')
-    list_filter = ('published_at', 'pastor')
+    list_display = ('title', 'pastor', 'published_at', 'status', 'auto_generated_for', 'created_at')
+    list_filter = ('status', 'published_at', 'pastor')
+    actions = ['publish']
     search_fields = ('title', 'content', 'verse')
     date_hierarchy = 'published_at'
     
@@ -12,3 +13,16 @@ class RhemaAdmin(admin.ModelAdmin):
         if not obj.pastor_id:
             obj.pastor = request.user
         super().save_model(request, obj, form, change)
+
+    @admin.action(description="Publier les Rhemas sélectionnés")
+    def publish(self, request, queryset):
+        # save() plutôt qu'update() : les signaux (index de recherche, cache) suivent
+        for rhema in queryset.exclude(status=Rhema.Status.PUBLISHED):
+            rhema.status = Rhema.Status.PUBLISHED
+            rhema.save(update_fields=['status', 'updated_at'])
+
+
+@admin.register(RhemaGeneration)
+class RhemaGenerationAdmin(admin.ModelAdmin):
+    list_display = ('date', 'status', 'started_at', 'finished_at')
+    list_filter = ('status',)
@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from rhema.services import RhemaService
+
+
+class Command(BaseCommand):
+    help = "Pré-génère par l'IA les Rhemas manquants des prochains jours (à planifier chaque jour)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help="Nombre de jours à couvrir, aujourd'hui compris")
+        parser.add_argument('--start', help="Premier jour (AAAA-MM-JJ), aujourd'hui par défaut")
+        parser.add_argument('--workers', type=int, default=3, help="Appels simultanés à Gemini")
+        parser.add_argument('--max-attempts', type=int, default=5, help="Tentatives par jour (429/5xx)")
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError("--days doit être supérieur ou égal à 1")
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else timezone.localdate()
+        except ValueError:
+            raise CommandError(f"Date invalide : {options['start']}")
+
+        dates = [start + timedelta(days=offset) for offset in range(options['days'])]
+        results = RhemaService.pregenerate(dates, options['workers'], options['max_attempts'])
+
+        for day in dates:
+            if day not in results:
+                self.stdout.write(f"{day} : déjà présent ou en cours, ignoré.")
+            elif results[day]:
+                self.stdout.write(self.style.SUCCESS(f"{day} : « {results[day].title} » ({results[day].status})"))
+            else:
+                self.stdout.write(self.style.ERROR(f"{day} : échec, sera repris au prochain lancement."))
+
+        if any(rhema is None for rhema in results.values()):
+            raise CommandError("Certains Rhemas n'ont pas pu être générés.")
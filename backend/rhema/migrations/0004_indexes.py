@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rhema', '0003_alter_rhema_pastor'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rhema',
+            index=models.Index(fields=['-published_at', '-created_at'], name='rhema_published_idx'),
+        ),
+    ]
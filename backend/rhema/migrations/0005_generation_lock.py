@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:51
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def mark_auto_generated(apps, schema_editor):
+    # Les Rhemas sans pasteur viennent de la génération IA ; le plus ancien de chaque jour est retenu
+    Rhema = apps.get_model('rhema', 'Rhema')
+    seen = set()
+    for rhema in Rhema.objects.filter(pastor__isnull=True).order_by('published_at', 'created_at', 'id'):
+        if rhema.published_at not in seen:
+            seen.add(rhema.published_at)
+            Rhema.objects.filter(pk=rhema.pk).update(auto_generated_for=rhema.published_at)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rhema', '0004_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RhemaGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Date')),
+                ('status', models.CharField(choices=[('RUNNING', 'En cours'), ('DONE', 'Terminée'), ('FAILED', 'Échouée')], default='RUNNING', max_length=10, verbose_name='Statut')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Démarrée le')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Terminée le')),
+            ],
+            options={
+                'verbose_name': 'Génération de Rhema',
+                'verbose_name_plural': 'Générations de Rhema',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='rhema',
+            name='auto_generated_for',
+            field=models.DateField(blank=True, editable=False, null=True, unique=True, verbose_name='Généré automatiquement pour'),
+        ),
+        migrations.RunPython(mark_auto_generated, migrations.RunPython.noop),
+    ]
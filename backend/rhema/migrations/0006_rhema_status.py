@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rhema', '0005_generation_lock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rhema',
+            name='status',
+            field=models.CharField(choices=[('DRAFT', 'Brouillon'), ('PUBLISHED', 'Publié')], default='PUBLISHED', help_text="Les brouillons (Rhemas générés par l'IA à relire) ne sont pas affichés au public.", max_length=10, verbose_name='Statut'),
+        ),
+        migrations.AddIndex(
+            model_name='rhema',
+            index=models.Index(fields=['status', '-published_at', '-created_at'], name='rhema_status_published_idx'),
+        ),
+    ]
@@ -4,6 +4,10 @@ from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
 class Rhema(models.Model):
+    class Status(models.TextChoices):
+        DRAFT = 'DRAFT', _('Brouillon')
+        PUBLISHED = 'PUBLISHED', _('Publié')
+
     title = models.CharField(_('Titre'), max_length=255)
     content = models.TextField(_('Contenu de la Parole'))
     verse = models.CharField(_('Référence Biblique'), max_length=255)
@@ -24,6 +28,16 @@ class Rhema(models.Model):
         help_text=_("Le Rhema sera affiché à cette date précise.")
     )
     
+    status = models.CharField(
+        _('Statut'), max_length=10, choices=Status.choices, default=Status.PUBLISHED,
+        help_text=_("Les brouillons (Rhemas générés par l'IA à relire) ne sont pas affichés au public.")
+    )
+
+    # Date pour laquelle ce Rhema a été généré par l'IA (unique : un seul par jour)
+    auto_generated_for = models.DateField(
+        _('Généré automatiquement pour'), null=True, blank=True, unique=True, editable=False
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -31,6 +45,35 @@ class Rhema(models.Model):
         verbose_name = _('Rhema')
         verbose_name_plural = _('Rhemas')
         ordering = ['-published_at', '-created_at']
+        indexes = [
+            models.Index(fields=['-published_at', '-created_at'], name='rhema_published_idx'),
+            models.Index(fields=['status', '-published_at', '-created_at'], name='rhema_status_published_idx'),
+        ]
 
     def __str__(self):
         return f"{self.published_at} - {self.title}"
+
+
+class RhemaGeneration(models.Model):
+    """
+    Verrou de génération du Rhema du jour : la ligne (unique par date) est
+    réservée par le premier processus qui la crée ; les autres ne lancent
+    pas de seconde génération.
+    """
+    class Status(models.TextChoices):
+        RUNNING = 'RUNNING', _('En cours')
+        DONE = 'DONE', _('Terminée')
+        FAILED = 'FAILED', _('Échouée')
+
+    date = models.DateField(_('Date'), unique=True)
+    status = models.CharField(_('Statut'), max_length=10, choices=Status.choices, default=Status.RUNNING)
+    started_at = models.DateTimeField(_('Démarrée le'), default=timezone.now)
+    finished_at = models.DateTimeField(_('Terminée le'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Génération de Rhema')
+        verbose_name_plural = _('Générations de Rhema')
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.date} - {self.status}"
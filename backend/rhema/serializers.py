@@ -6,5 +6,8 @@ class RhemaSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Rhema
-        fields = ('id', 'title', 'content', 'verse', 'meditation', 'pastor', 'pastor_name', 'published_at', 'created_at')
-        read_only_fields = ('pastor', 'created_at')
+        fields = (
+            'id', 'title', 'content', 'verse', 'meditation', 'pastor', 'pastor_name', 'published_at',
+            'status', 'auto_generated_for', 'created_at'
+        )
+        read_only_fields = ('pastor', 'auto_generated_for', 'created_at')
@@ -0,0 +1,226 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+import httpx
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from cyprus_api.exceptions import AIServiceError
+from .models import Rhema, RhemaGeneration
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitGate:
+    """Pause partagée par les threads de génération après un 429 de Gemini."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._until = 0.0
+
+    def pause(self, seconds):
+        with self._lock:
+            self._until = max(self._until, time.monotonic() + seconds)
+
+    def wait(self):
+        while True:
+            with self._lock:
+                remaining = self._until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+
+class RhemaService:
+    """
+    Rhema du jour.
+
+    Les Rhemas sont pré-générés par ``manage.py generate_rhemas`` : la lecture du
+    jour est une simple requête indexée. La génération à la volée (si
+    RHEMA_GENERATE_ON_REQUEST) reste « single-flight » : une seule requête, tous
+    processus confondus, appelle Gemini pour une date donnée.
+    """
+
+    @staticmethod
+    def published(today=None):
+        """Rhemas visibles du public : publiés et dont la date est arrivée."""
+        today = today or timezone.localdate()
+        return Rhema.objects.filter(status=Rhema.Status.PUBLISHED, published_at__lte=today)
+
+    @staticmethod
+    def for_date(date):
+        return Rhema.objects.filter(status=Rhema.Status.PUBLISHED, published_at=date).first()
+
+    @staticmethod
+    def latest():
+        return RhemaService.published().first()
+
+    @staticmethod
+    def claim(date, retry_failed=False):
+        """
+        Réserve la génération pour ``date`` ; retourne True si l'appelant doit générer.
+
+        La réservation est une ligne unique par date (pas de verrou tenu pendant
+        l'appel réseau). Une réservation en cours ou échouée depuis plus de
+        RHEMA_GENERATION_LOCK_TIMEOUT secondes peut être reprise ; avec
+        ``retry_failed``, une réservation échouée est reprise immédiatement.
+        """
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                RhemaGeneration.objects.create(date=date, started_at=now)
+            return True
+        except IntegrityError:
+            pass
+
+        stale = now - timedelta(seconds=settings.RHEMA_GENERATION_LOCK_TIMEOUT)
+        takeover = Q(
+            status__in=[RhemaGeneration.Status.RUNNING, RhemaGeneration.Status.FAILED], started_at__lt=stale
+        )
+        if retry_failed:
+            takeover |= Q(status=RhemaGeneration.Status.FAILED)
+        # UPDATE conditionnel : un seul processus peut reprendre une réservation
+        return bool(RhemaGeneration.objects.filter(takeover, date=date).update(
+            status=RhemaGeneration.Status.RUNNING, started_at=now, finished_at=None
+        ))
+
+    @staticmethod
+    def finish(date, status):
+        RhemaGeneration.objects.filter(date=date).update(status=status, finished_at=timezone.now())
+
+    @staticmethod
+    def save_generated(date, ai_data):
+        """Enregistre le Rhema auto-généré de ``date`` (brouillon si RHEMA_AI_DRAFTS)."""
+        try:
+            with transaction.atomic():
+                return Rhema.objects.create(
+                    title=ai_data.get('title', 'Rhema du Jour'),
+                    content=ai_data.get('content', ''),
+                    verse=ai_data.get('verse', ''),
+                    meditation=ai_data.get('meditation', ''),
+                    published_at=date,
+                    auto_generated_for=date,
+                    status=Rhema.Status.DRAFT if settings.RHEMA_AI_DRAFTS else Rhema.Status.PUBLISHED,
+                )
+        except IntegrityError:
+            # Une reprise de réservation a déjà enregistré le Rhema de ce jour
+            return Rhema.objects.filter(auto_generated_for=date).first()
+
+    @staticmethod
+    def generate(date):
+        """Appelle Gemini et enregistre le Rhema auto-généré de ``date`` (None en cas d'échec)."""
+        from ai_assistant.services import BiblicalAIService
+
+        ai_data = BiblicalAIService.generate_daily_rhema(date)
+        return RhemaService.save_generated(date, ai_data) if ai_data else None
+
+    @staticmethod
+    def fetch_with_backoff(date, gate, max_attempts):
+        """
+        Demande le Rhema de ``date`` à Gemini en retentant les erreurs temporaires.
+        Un 429 suspend tous les threads (``gate``) le temps indiqué par Gemini.
+        """
+        from ai_assistant.services import RETRYABLE_STATUSES, BiblicalAIService
+
+        for attempt in range(1, max_attempts + 1):
+            gate.wait()
+            try:
+                return BiblicalAIService.request_daily_rhema(date)
+            except AIServiceError as exc:
+                retryable = (
+                    exc.status_code in RETRYABLE_STATUSES
+                    or isinstance(exc.__cause__, httpx.HTTPError)
+                )
+                if not retryable or attempt == max_attempts:
+                    raise
+                delay = exc.retry_after or settings.GEMINI_RETRY_BACKOFF * 2 ** (attempt - 1)
+                logger.warning("Rhema %s: attempt %s failed (%s), retrying in %ss", date, attempt, exc, delay)
+                if exc.status_code == 429:
+                    gate.pause(delay)
+                else:
+                    time.sleep(delay)
+
+    @staticmethod
+    def pregenerate(dates, workers=3, max_attempts=5):
+        """
+        Génère les Rhemas manquants pour ``dates`` ; retourne {date: Rhema ou None}.
+
+        Les appels à Gemini tournent dans ``workers`` threads ; les écritures restent
+        dans le thread appelant. Les jours qui ont déjà un Rhema (quel que soit son
+        statut) ou dont la génération est en cours ailleurs sont ignorés ; les jours
+        en échec sont repris au lancement suivant.
+        """
+        existing = set(Rhema.objects.filter(published_at__in=dates).values_list('published_at', flat=True))
+        pending = [date for date in dates if date not in existing and RhemaService.claim(date, retry_failed=True)]
+        results = {}
+        gate = RateLimitGate()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+                futures = {
+                    pool.submit(RhemaService.fetch_with_backoff, date, gate, max_attempts): date
+                    for date in pending
+                }
+                for future in as_completed(futures):
+                    date = futures[future]
+                    try:
+                        results[date] = RhemaService.save_generated(date, future.result())
+                    except AIServiceError as exc:
+                        logger.error(f"Error generating AI Rhema for {date}: {exc}")
+                        results[date] = None
+                    RhemaService.finish(
+                        date, RhemaGeneration.Status.DONE if results[date] else RhemaGeneration.Status.FAILED
+                    )
+        finally:
+            # Interruption : libère les réservations restantes pour le prochain lancement
+            for date in pending:
+                if date not in results:
+                    RhemaService.finish(date, RhemaGeneration.Status.FAILED)
+        return results
+
+    @staticmethod
+    def today():
+        """Rhema publié aujourd'hui ; à défaut le plus récent (ou None)."""
+        today = timezone.localdate()
+        rhema = RhemaService.for_date(today)
+        if rhema or not settings.RHEMA_GENERATE_ON_REQUEST:
+            return rhema or RhemaService.latest()
+
+        if RhemaService.claim(today):
+            rhema = None
+            try:
+                rhema = RhemaService.generate(today)
+            except Exception as e:
+                logger.error(f"Error saving AI Rhema: {e}")
+            finally:
+                RhemaService.finish(
+                    today, RhemaGeneration.Status.DONE if rhema else RhemaGeneration.Status.FAILED
+                )
+            if rhema and rhema.status != Rhema.Status.PUBLISHED:
+                rhema = None
+        else:
+            rhema = RhemaService.wait_for(today, settings.RHEMA_GENERATION_WAIT)
+
+        # Fallback to the most recent rhema if AI fails or is still generating
+        return rhema or RhemaService.latest()
+
+    @staticmethod
+    def wait_for(date, timeout):
+        """
+        Attend le Rhema publié de ``date`` pendant qu'une autre requête le génère ;
+        None dès que la génération est terminée sans lui (échec, brouillon) ou au délai.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            rhema = RhemaService.for_date(date)
+            if rhema:
+                return rhema
+            status = RhemaGeneration.objects.filter(date=date).values_list('status', flat=True).first()
+            if status != RhemaGeneration.Status.RUNNING or time.monotonic() >= deadline:
+                return None
+            time.sleep(settings.RHEMA_GENERATION_POLL_INTERVAL)
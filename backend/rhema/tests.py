@@ -0,0 +1,167 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from cyprus_api.exceptions import AIServiceError
+from users.models import User
+from .models import Rhema, RhemaGeneration
+
+AI_RHEMA = {'title': 'Paix', 'verse': 'Jean 14:27', 'content': 'Je vous laisse la paix.', 'meditation': 'Courage.'}
+
+
+@override_settings(RHEMA_GENERATE_ON_REQUEST=True, RHEMA_GENERATION_WAIT=0.2, RHEMA_GENERATION_POLL_INTERVAL=0.05)
+class RhemaOnRequestGenerationTests(APITestCase):
+    url = '/api/rhema/today/'
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        patcher = mock.patch('ai_assistant.services.BiblicalAIService.generate_daily_rhema', return_value=AI_RHEMA)
+        self.generate = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_generated_once_per_day(self):
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(self.generate.call_count, 1)
+        self.assertEqual(Rhema.objects.get().auto_generated_for, self.today)
+        self.assertEqual(RhemaGeneration.objects.get(date=self.today).status, RhemaGeneration.Status.DONE)
+
+    def test_generation_in_progress_serves_fallback(self):
+        previous = Rhema.objects.create(
+            title='Hier', content='...', verse='Psaume 23', published_at=self.today - timedelta(days=1)
+        )
+        RhemaGeneration.objects.create(date=self.today)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['id'], previous.id)
+        self.generate.assert_not_called()
+
+    @override_settings(RHEMA_GENERATION_WAIT=5)
+    def test_failed_generation_is_not_waited_for(self):
+        previous = Rhema.objects.create(
+            title='Hier', content='...', verse='Psaume 23', published_at=self.today - timedelta(days=1)
+        )
+        RhemaGeneration.objects.create(date=self.today, status=RhemaGeneration.Status.FAILED)
+
+        with mock.patch('rhema.services.time.sleep') as sleep:
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['id'], previous.id)
+        sleep.assert_not_called()
+        self.generate.assert_not_called()
+
+    def test_stale_generation_is_taken_over(self):
+        RhemaGeneration.objects.create(date=self.today, started_at=timezone.now() - timedelta(hours=1))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['title'], 'Paix')
+        self.assertEqual(self.generate.call_count, 1)
+
+    def test_failed_generation_is_recorded(self):
+        self.generate.return_value = None
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(RhemaGeneration.objects.get(date=self.today).status, RhemaGeneration.Status.FAILED)
+
+        # Pas de nouvel appel avant l'expiration de la réservation
+        self.client.get(self.url)
+        self.assertEqual(self.generate.call_count, 1)
+
+    def test_one_auto_generated_rhema_per_day(self):
+        Rhema.objects.create(title='A', content='...', verse='...', auto_generated_for=self.today)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Rhema.objects.create(title='B', content='...', verse='...', auto_generated_for=self.today)
+
+
+class RhemaVisibilityTests(APITestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.current = Rhema.objects.create(
+            title='Hier', content='...', verse='...', published_at=self.today - timedelta(days=1)
+        )
+        self.scheduled = Rhema.objects.create(
+            title='Demain', content='...', verse='...', published_at=self.today + timedelta(days=1)
+        )
+        self.draft = Rhema.objects.create(
+            title='Brouillon', content='...', verse='...', published_at=self.today, status=Rhema.Status.DRAFT
+        )
+
+    @mock.patch('ai_assistant.services.BiblicalAIService.generate_daily_rhema')
+    def test_today_is_a_lookup(self, generate):
+        response = self.client.get('/api/rhema/today/')
+        self.assertEqual(response.data['id'], self.current.id)
+        generate.assert_not_called()
+
+    def test_public_list_hides_drafts_and_scheduled(self):
+        response = self.client.get('/api/rhema/')
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        self.assertEqual([item['id'] for item in results], [self.current.id])
+
+    def test_pastor_publishes_draft(self):
+        pastor = User.objects.create_user(username='pasteur', email='p@example.com', password='x', role=User.Role.PASTOR)
+        self.client.force_authenticate(pastor)
+        response = self.client.post(f'/api/rhema/{self.draft.id}/publish/')
+        self.assertEqual(response.data['status'], Rhema.Status.PUBLISHED)
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/rhema/today/').data['id'], self.draft.id)
+
+    def test_today_supports_conditional_get(self):
+        etag = self.client.get('/api/rhema/today/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/rhema/today/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Un brouillon ne change pas la version publique ; sa publication, si
+        Rhema.objects.filter(pk=self.draft.pk).update(title='Brouillon relu', updated_at=timezone.now())
+        self.assertEqual(self.client.get('/api/rhema/today/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.draft.status = Rhema.Status.PUBLISHED
+        self.draft.save()
+        response = self.client.get('/api/rhema/today/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], self.draft.id)
+
+
+@override_settings(GEMINI_RETRY_BACKOFF=0)
+class GenerateRhemasCommandTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        patcher = mock.patch('ai_assistant.services.BiblicalAIService.request_daily_rhema')
+        self.request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fills_missing_days_only(self):
+        Rhema.objects.create(title='Pasteur', content='...', verse='...', published_at=self.today + timedelta(days=1))
+        self.request.return_value = AI_RHEMA
+
+        call_command('generate_rhemas', days=3, stdout=mock.Mock())
+        self.assertEqual(self.request.call_count, 2)
+        self.assertEqual(
+            sorted(Rhema.objects.filter(auto_generated_for__isnull=False).values_list('published_at', flat=True)),
+            [self.today, self.today + timedelta(days=2)]
+        )
+
+    @override_settings(RHEMA_AI_DRAFTS=True)
+    def test_rate_limit_is_retried_as_draft(self):
+        self.request.side_effect = [AIServiceError('quota', status_code=429, retry_after=0.01), AI_RHEMA]
+        call_command('generate_rhemas', days=1, stdout=mock.Mock())
+        self.assertEqual(self.request.call_count, 2)
+        self.assertEqual(Rhema.objects.get().status, Rhema.Status.DRAFT)
+
+    def test_failed_day_is_resumed(self):
+        self.request.side_effect = AIServiceError('Erreur API (400)', status_code=400)
+        with self.assertRaises(CommandError):
+            call_command('generate_rhemas', days=1, stdout=mock.Mock())
+        self.assertEqual(RhemaGeneration.objects.get().status, RhemaGeneration.Status.FAILED)
+
+        self.request.side_effect = None
+        self.request.return_value = AI_RHEMA
+        call_command('generate_rhemas', days=1, stdout=mock.Mock())
+        self.assertEqual(RhemaGeneration.objects.get().status, RhemaGeneration.Status.DONE)
+        self.assertTrue(Rhema.objects.filter(auto_generated_for=self.today).exists())
@@ -2,11 +2,13 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.utils import timezone
+from cyprus_api.conditional import ConditionalGetMixin
 from .models import Rhema
 from .serializers import RhemaSerializer
+from .services import RhemaService
 from users.permissions import IsPastorOrAdmin
 
-class RhemaViewSet(viewsets.ModelViewSet):
+class RhemaViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Rhema.objects.all()
     serializer_class = RhemaSerializer
 
@@ -16,34 +18,40 @@ class RhemaViewSet(viewsets.ModelViewSet):
         # Seuls Pasteur et Admin peuvent créer/modifier/supprimer
         return [IsPastorOrAdmin()]
 
+    def get_queryset(self):
+        user = self.request.user
+        # Pasteur et Admin voient aussi les brouillons et les Rhemas programmés
+        if user.is_authenticated and (user.role in ['PASTOR', 'ADMIN'] or user.is_superuser):
+            return Rhema.objects.all()
+        return RhemaService.published()
+
+    def get_conditional_queryset(self):
+        if self.action == 'today':
+            return RhemaService.published()
+        return super().get_conditional_queryset()
+
+    def get_conditional_seed(self):
+        # Publication programmée : la liste et le Rhema du jour changent avec la date
+        return timezone.localdate().isoformat()
+
     def perform_create(self, serializer):
         serializer.save(pastor=self.request.user)
 
+    @action(detail=True, methods=['post'])
+    def publish(self, request, pk=None):
+        """Publie un brouillon (Rhema généré par l'IA relu par un pasteur)."""
+        rhema = self.get_object()
+        rhema.status = Rhema.Status.PUBLISHED
+        rhema.save(update_fields=['status', 'updated_at'])
+        return Response(self.get_serializer(rhema).data)
+
     @action(detail=False, methods=['get'])
     def today(self, request):
-        today = timezone.now().date()
-        rhema = Rhema.objects.filter(published_at=today).first()
-        
-        if not rhema:
-            from ai_assistant.services import BiblicalAIService
-            ai_data = BiblicalAIService.generate_daily_rhema()
-            
-            if ai_data:
-                try:
-                    rhema = Rhema.objects.create(
-                        title=ai_data.get('title', 'Rhema du Jour'),
-                        content=ai_data.get('content', ''),
-                        verse=ai_data.get('verse', ''),
-                        meditation=ai_data.get('meditation', ''),
-                        published_at=today
-                    )
-                except Exception as e:
-                    print(f"Error saving AI Rhema: {e}")
-            
-            if not rhema:
-                # Fallback to the most recent rhema if AI fails or was already returned
-                rhema = Rhema.objects.all().first()
-            
+        return self.conditional_response(request, self.today_response)
+
+    def today_response(self, request):
+        rhema = RhemaService.today()
+
         if rhema:
             serializer = self.get_serializer(rhema)
             return Response(serializer.data)
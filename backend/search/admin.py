@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import SearchDocument
+
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ('content_type', 'object_id', 'updated_at')
+    list_filter = ('content_type',)
+    search_fields = ('title_text',)
+    readonly_fields = ('content_type', 'object_id', 'title_text', 'body_text', 'updated_at')
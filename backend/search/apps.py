@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'search'
+    verbose_name = 'Recherche'
+
+    def ready(self):
+        from cyprus_api.cache import invalidate_scope_on
+        from .services import SearchIndex
+        invalidate_scope_on('search', *(SearchIndex.model_for(name) for name in SearchIndex.public_types()))
+        from . import signals  # noqa: F401
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from search.models import SearchDocument
+from search.services import SearchIndex
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche depuis les tables sources"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type', action='append', dest='types',
+            help=f"Type à reconstruire (répétable). Choix : {', '.join(SearchIndex.TYPES)}"
+        )
+        parser.add_argument(
+            '--if-empty', action='store_true',
+            help="Ne fait rien si l'index contient déjà des documents (utile au déploiement)"
+        )
+
+    def handle(self, *args, **options):
+        types = options['types'] or list(SearchIndex.TYPES)
+        unknown = set(types) - set(SearchIndex.TYPES)
+        if unknown:
+            raise CommandError(f"Type(s) inconnu(s) : {', '.join(sorted(unknown))}")
+
+        if options['if_empty'] and SearchDocument.objects.exists():
+            self.stdout.write("Index déjà initialisé, ignoré.")
+            return
+
+        for type_name in types:
+            count = SearchIndex.rebuild(type_name)
+            self.stdout.write(self.style.SUCCESS(f"{type_name} : {count} documents indexés."))
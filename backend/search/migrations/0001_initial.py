@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title_text', models.TextField(blank=True, verbose_name='Texte principal normalisé')),
+                ('body_text', models.TextField(blank=True, verbose_name='Texte secondaire normalisé')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Document indexé',
+                'verbose_name_plural': 'Documents indexés',
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64, verbose_name='Jeton')),
+                ('field', models.CharField(max_length=50, verbose_name='Champ')),
+                ('weight', models.PositiveIntegerField(default=1, verbose_name='Poids')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='search.searchdocument')),
+            ],
+            options={
+                'verbose_name': "Jeton d'index",
+                'verbose_name_plural': "Jetons d'index",
+                'indexes': [models.Index(fields=['token', 'document'], name='search_token_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+import re
+import unicodedata
+
+from django.db import migrations
+
+INDEX_NAME = 'search_document_vector_idx'
+# Expression produite par SearchVector (search/services.py:search_vector), pour que l'index serve les requêtes
+VECTOR = (
+    "(setweight(to_tsvector('simple'::regconfig, COALESCE(title_text, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, COALESCE(body_text, '')), 'B'))"
+)
+
+# Copie figée de search.text.tokenize : la migration ne doit pas suivre les évolutions du découpage
+LIGATURES = str.maketrans({'œ': 'oe', 'æ': 'ae'})
+WORD = re.compile(r'\w+')
+MAX_TOKEN_LENGTH = 64
+STOPWORDS = frozenset("""
+a au aux avec ce ces cet cette dans de des du elle elles en est et il ils je la le les leur leurs
+ma mais mes mon ne nos notre nous on ou par pas pour qu que qui sa sans se ses son sont sur ta tes
+ton tu un une vos votre vous
+an and are as at be been but by for from he her his i in is it its me my no not of on or our she
+that the their them these they this those to was we were with you your
+""".split())
+
+
+def tokenize(text):
+    text = unicodedata.normalize('NFKD', str(text or '').casefold().translate(LIGATURES))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    tokens = []
+    for word in WORD.findall(text):
+        if len(word) < 2 or word in STOPWORDS or word.isdigit() and len(word) < 3:
+            continue
+        if len(word) > 3 and word[-1] in 'sx' and not word.endswith('ss'):
+            word = word[:-1]
+        tokens.append(word[:MAX_TOKEN_LENGTH])
+    return tokens
+
+
+def tokenize_texts(apps, schema_editor):
+    # Les textes déjà indexés deviennent la suite de leurs jetons (mots vides retirés, pluriels réduits)
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+    documents = SearchDocument.objects.only('pk', 'title_text', 'body_text')
+    batch = []
+    for document in documents.iterator(chunk_size=500):
+        document.title_text = ' '.join(tokenize(document.title_text))
+        document.body_text = ' '.join(tokenize(document.body_text))
+        batch.append(document)
+        if len(batch) >= 500:
+            SearchDocument.objects.bulk_update(batch, ['title_text', 'body_text'])
+            batch = []
+    SearchDocument.objects.bulk_update(batch, ['title_text', 'body_text'])
+
+
+def create_vector_index(apps, schema_editor):
+    # Index GIN uniquement sous PostgreSQL ; les autres bases utilisent la table de jetons
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON search_searchdocument USING GIN ({VECTOR})'
+        )
+
+
+def drop_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(tokenize_texts, migrations.RunPython.noop),
+        migrations.RunPython(create_vector_index, drop_vector_index),
+    ]
@@ -0,0 +1,41 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SearchDocument(models.Model):
+    """Document indexé : texte normalisé (sans accents, minuscules) d'un objet"""
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    # Champs de poids fort (titre...) et le reste, séparés pour le classement plein texte natif
+    title_text = models.TextField(_('Texte principal normalisé'), blank=True)
+    body_text = models.TextField(_('Texte secondaire normalisé'), blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Document indexé')
+        verbose_name_plural = _('Documents indexés')
+        unique_together = ['content_type', 'object_id']
+
+    def __str__(self):
+        return f"{self.content_type.model} #{self.object_id}"
+
+
+class SearchToken(models.Model):
+    """Entrée de l'index inversé : jeton → document, champ, poids"""
+
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name='tokens')
+    token = models.CharField(_('Jeton'), max_length=64)
+    field = models.CharField(_('Champ'), max_length=50)
+    weight = models.PositiveIntegerField(_('Poids'), default=1)
+
+    class Meta:
+        verbose_name = _("Jeton d'index")
+        verbose_name_plural = _("Jetons d'index")
+        indexes = [
+            models.Index(fields=['token', 'document'], name='search_token_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.token} → {self.document_id} ({self.field})"
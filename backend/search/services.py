@@ -0,0 +1,289 @@
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Max, Q, Sum, When
+from django.utils import timezone
+
+from cyprus_api.exports import resolve
+
+from .models import SearchDocument, SearchToken
+from .text import query_terms, tokenize
+
+def search_vector():
+    """Vecteur plein texte PostgreSQL ; même expression que l'index GIN de la migration 0003."""
+    # Import local : django.contrib.postgres exige psycopg, absent hors PostgreSQL
+    from django.contrib.postgres.search import SearchVector
+    return (
+        SearchVector('title_text', config='simple', weight='A')
+        + SearchVector('body_text', config='simple', weight='B')
+    )
+
+
+def published_rhemas():
+    return Q(status='PUBLISHED', published_at__lte=timezone.localdate())
+
+
+class SearchIndex:
+    """
+    Index de recherche des contenus du site.
+
+    Chaque sauvegarde ou suppression d'un modèle déclaré dans ``TYPES`` met à
+    jour son document (voir signals.py). La recherche utilise le plein texte
+    natif de PostgreSQL quand il est disponible, sinon la table de jetons.
+    ``manage.py rebuild_search_index`` reconstruit tout l'index.
+    """
+
+    TITLE_WEIGHT = 3
+    MAX_CANDIDATES = 200
+    REBUILD_BATCH_SIZE = 500
+
+    # fields : {source: poids} ; public : None si jamais exposé, sinon True ou un callable renvoyant un Q
+    TYPES = {
+        'sermon': {
+            'model': 'sermons.Sermon',
+            'fields': {
+                'title': 3, 'series': 2, 'description': 1, 'pastor.first_name': 1, 'pastor.last_name': 1,
+                'pdf_search_text': 1,  # texte du PDF, extrait en arrière-plan (sermons/services.py)
+            },
+            'select_related': ('pastor', 'pdf_text'),
+            'public': lambda: Q(is_published=True),
+            'title': 'title', 'excerpt': 'description', 'date': 'created_at',
+        },
+        'event': {
+            'model': 'about.Event',
+            'fields': {'title': 3, 'category': 2, 'location': 1, 'description': 1},
+            'public': True,
+            'title': 'title', 'excerpt': 'description', 'date': 'date',
+        },
+        'rhema': {
+            'model': 'rhema.Rhema',
+            'fields': {'title': 3, 'verse': 2, 'content': 1, 'meditation': 1},
+            'public': published_rhemas,
+            'title': 'title', 'excerpt': 'content', 'date': 'published_at',
+        },
+        'section': {
+            'model': 'about.InformationSection',
+            'fields': {'title': 3, 'content': 1},
+            'public': True,
+            'title': 'title', 'excerpt': 'content', 'date': 'updated_at',
+        },
+        'prayer': {
+            'model': 'prayers.PrayerRequest',
+            'fields': {'title': 3, 'content': 1, 'full_name': 1, 'user.first_name': 1, 'user.last_name': 1},
+            'select_related': ('user',),
+            'public': None,
+        },
+    }
+
+    @staticmethod
+    def model_for(type_name):
+        return apps.get_model(SearchIndex.TYPES[type_name]['model'])
+
+    @staticmethod
+    def type_for_model(model):
+        label = model._meta.label
+        for type_name, spec in SearchIndex.TYPES.items():
+            if spec['model'] == label:
+                return type_name
+        return None
+
+    @staticmethod
+    def public_types():
+        return [name for name, spec in SearchIndex.TYPES.items() if spec['public'] is not None]
+
+    @staticmethod
+    def use_native():
+        return connection.vendor == 'postgresql' and getattr(settings, 'SEARCH_NATIVE_FULLTEXT', True)
+
+    @staticmethod
+    def build(instance, spec):
+        """
+        Construit (title_text, body_text, jetons) pour un objet. Les textes
+        stockés sont les jetons eux-mêmes (sans mots vides, pluriels réduits) :
+        le plein texte natif et la table de jetons voient les mêmes termes.
+        """
+        title_parts, body_parts, tokens = [], [], []
+        for source, weight in spec['fields'].items():
+            text = resolve(instance, source)
+            if not text:
+                continue
+            words = tokenize(text)
+            (title_parts if weight >= SearchIndex.TITLE_WEIGHT else body_parts).append(' '.join(words))
+            for token, count in Counter(words).items():
+                tokens.append((token, source, weight * count))
+        return ' '.join(title_parts), ' '.join(body_parts), tokens
+
+    @staticmethod
+    def index(instance):
+        """(Ré)indexe un objet dans la transaction courante."""
+        spec = SearchIndex.TYPES[SearchIndex.type_for_model(type(instance))]
+        title_text, body_text, tokens = SearchIndex.build(instance, spec)
+        with transaction.atomic():
+            document, _ = SearchDocument.objects.update_or_create(
+                content_type=ContentType.objects.get_for_model(type(instance)),
+                object_id=instance.pk,
+                defaults={'title_text': title_text, 'body_text': body_text},
+            )
+            document.tokens.all().delete()
+            SearchToken.objects.bulk_create([
+                SearchToken(document=document, token=token, field=field, weight=weight)
+                for token, field, weight in tokens
+            ])
+
+    @staticmethod
+    def remove(instance):
+        SearchDocument.objects.filter(
+            content_type=ContentType.objects.get_for_model(type(instance)),
+            object_id=instance.pk,
+        ).delete()
+
+    @staticmethod
+    def rebuild(type_name):
+        """Reconstruit l'index d'un type par lots ; retourne le nombre de documents."""
+        spec = SearchIndex.TYPES[type_name]
+        model = SearchIndex.model_for(type_name)
+        content_type = ContentType.objects.get_for_model(model)
+        queryset = model.objects.select_related(*spec.get('select_related', ())).order_by('pk')
+
+        count = 0
+        with transaction.atomic():
+            SearchDocument.objects.filter(content_type=content_type).delete()
+            batch = []
+            for instance in queryset.iterator(chunk_size=SearchIndex.REBUILD_BATCH_SIZE):
+                batch.append((instance.pk, SearchIndex.build(instance, spec)))
+                if len(batch) >= SearchIndex.REBUILD_BATCH_SIZE:
+                    count += SearchIndex.write_batch(content_type, batch)
+                    batch = []
+            count += SearchIndex.write_batch(content_type, batch)
+        return count
+
+    @staticmethod
+    def write_batch(content_type, batch):
+        if not batch:
+            return 0
+        SearchDocument.objects.bulk_create([
+            SearchDocument(content_type=content_type, object_id=pk, title_text=title_text, body_text=body_text)
+            for pk, (title_text, body_text, _) in batch
+        ])
+        # bulk_create ne renvoie pas les clés sous MySQL : relecture des identifiants
+        documents = dict(SearchDocument.objects.filter(
+            content_type=content_type, object_id__in=[pk for pk, _ in batch]
+        ).values_list('object_id', 'id'))
+        SearchToken.objects.bulk_create([
+            SearchToken(document_id=documents[pk], token=token, field=field, weight=weight)
+            for pk, (_, _, tokens) in batch
+            for token, field, weight in tokens
+        ], batch_size=1000)
+        return len(batch)
+
+    @staticmethod
+    def matches(terms, content_types):
+        """
+        Documents contenant tous les termes (le dernier en préfixe, pour la saisie
+        au fil de l'eau) : liste de (content_type_id, object_id, score) triée,
+        limitée aux MAX_CANDIDATES plus pertinents.
+        """
+        if not terms:
+            return []
+        return list(SearchIndex.ranked(terms, content_types)[:SearchIndex.MAX_CANDIDATES])
+
+    @staticmethod
+    def ranked(terms, content_types):
+        """
+        Requête non évaluée des documents correspondants, triée par pertinence :
+        tuples (content_type_id, object_id, score).
+        """
+        if SearchIndex.use_native():
+            return SearchIndex.native_matches(terms, content_types)
+        return SearchIndex.token_matches(terms, content_types)
+
+    @staticmethod
+    def token_matches(terms, content_types):
+        """Recherche portable sur la table de jetons."""
+        *exact, prefix = terms
+        conditions = [Q(token=term) for term in exact]
+        conditions.append(Q(token__gte=prefix, token__lt=prefix + '\uffff'))
+        any_term = conditions[0]
+        for condition in conditions[1:]:
+            any_term |= condition
+
+        per_term = {
+            f'term_{position}': Max(Case(When(condition, then=1), default=0, output_field=IntegerField()))
+            for position, condition in enumerate(conditions)
+        }
+        return (
+            SearchToken.objects
+            .filter(any_term, document__content_type__in=content_types)
+            .values(content_type_id=F('document__content_type'), object_id=F('document__object_id'))
+            .annotate(score=Sum('weight'), **per_term)
+            .filter(**{name: 1 for name in per_term})
+            .order_by('-score', 'object_id')
+            .values_list('content_type_id', 'object_id', 'score')
+        )
+
+    @staticmethod
+    def native_matches(terms, content_types):
+        """Recherche plein texte PostgreSQL (index GIN) ; les termes sont déjà des jetons."""
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        *exact, prefix = terms
+        query = SearchQuery(' & '.join([*exact, f'{prefix}:*']), config='simple', search_type='raw')
+        vector = search_vector()
+        return (
+            SearchDocument.objects
+            .filter(content_type__in=content_types)
+            .annotate(vector=vector)
+            .filter(vector=query)
+            .annotate(score=SearchRank(vector, query))
+            .order_by('-score', 'object_id')
+            .values_list('content_type_id', 'object_id', 'score')
+        )
+
+    @staticmethod
+    def filter_queryset(queryset, query):
+        """
+        Restreint un queryset (listes de l'administration) aux objets correspondant
+        à la requête, tous et sans plafond : filtre par sous-requête, ordre conservé.
+        """
+        terms = query_terms(query)
+        if not terms:
+            return queryset.none()
+        content_type = ContentType.objects.get_for_model(queryset.model)
+        matching = SearchIndex.ranked(terms, [content_type]).order_by().values_list('object_id', flat=True)
+        return queryset.filter(pk__in=matching)
+
+    @staticmethod
+    def search(query, types=None, limit=20):
+        """
+        Recherche publique : liste de (type, objet, score) triée par pertinence,
+        limitée aux objets visibles du public.
+        """
+        types = [name for name in (types or SearchIndex.public_types()) if name in SearchIndex.public_types()]
+        models = {name: SearchIndex.model_for(name) for name in types}
+        content_types = ContentType.objects.get_for_models(*models.values())
+        type_by_content_type = {content_types[model].pk: name for name, model in models.items()}
+
+        candidates = SearchIndex.matches(query_terms(query), list(content_types.values()))
+        ids_by_type = {}
+        for content_type_id, object_id, _ in candidates:
+            ids_by_type.setdefault(type_by_content_type[content_type_id], []).append(object_id)
+
+        objects = {}
+        for name, ids in ids_by_type.items():
+            spec = SearchIndex.TYPES[name]
+            queryset = models[name].objects.filter(pk__in=ids)
+            if callable(spec['public']):
+                queryset = queryset.filter(spec['public']())
+            objects.update({(name, obj.pk): obj for obj in queryset})
+
+        results = []
+        for content_type_id, object_id, score in candidates:
+            key = (type_by_content_type[content_type_id], object_id)
+            if key in objects:
+                results.append((key[0], objects[key], score))
+                if len(results) >= limit:
+                    break
+        return results
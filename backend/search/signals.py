@@ -0,0 +1,25 @@
+"""
+Mise à jour incrémentale de l'index de recherche.
+
+L'indexation se fait dans la transaction de la sauvegarde : un rollback
+annule aussi la mise à jour de l'index. Les ``QuerySet.update()`` ne
+déclenchent pas de signaux ; ``manage.py rebuild_search_index`` corrige.
+"""
+from django.db.models.signals import post_delete, post_save
+
+from .services import SearchIndex
+
+
+def document_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        SearchIndex.index(instance)
+
+
+def document_deleted(sender, instance, **kwargs):
+    SearchIndex.remove(instance)
+
+
+for type_name in SearchIndex.TYPES:
+    model = SearchIndex.model_for(type_name)
+    post_save.connect(document_saved, sender=model, dispatch_uid=f'search_{type_name}_saved')
+    post_delete.connect(document_deleted, sender=model, dispatch_uid=f'search_{type_name}_deleted')
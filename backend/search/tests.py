@@ -0,0 +1,134 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from about.models import Event, InformationSection
+from prayers.models import PrayerRequest
+from rhema.models import Rhema
+from sermons.models import Sermon
+
+from .models import SearchDocument, SearchToken
+from .services import SearchIndex
+from .text import query_terms, tokenize
+
+User = get_user_model()
+
+
+class TokenizerTests(TestCase):
+    def test_accents_case_and_stopwords(self):
+        self.assertEqual(tokenize("La Prière de l'Église"), ['priere', 'eglise'])
+        self.assertEqual(tokenize('The GRACE of God'), ['grace', 'god'])
+
+    def test_plurals_are_reduced(self):
+        self.assertEqual(query_terms('prières prière'), ['priere'])
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class SearchIndexTests(APITestCase):
+    def setUp(self):
+        self.pastor = User.objects.create(username='pasteur', first_name='Jean', role=User.Role.PASTOR)
+        self.admin = User.objects.create(username='admin', role=User.Role.ADMIN, is_staff=True)
+        self.grace = Sermon.objects.create(
+            title='La grâce suffisante', slug='grace', pastor=self.pastor,
+            description='Un message sur la prière et la foi'
+        )
+        self.faith = Sermon.objects.create(
+            title='Marcher par la foi', slug='foi', pastor=self.pastor,
+            description='La grâce nous est donnée'
+        )
+        self.draft = Sermon.objects.create(
+            title='Brouillon sur la grâce', slug='brouillon', pastor=self.pastor, is_published=False
+        )
+        self.event = Event.objects.create(title='Nuit de prière', description='Veillée', date=timezone.localdate())
+        self.section = InformationSection.objects.create(
+            type=InformationSection.SectionType.HISTORY, title='Notre histoire', content='Fondée par la grâce'
+        )
+        today = timezone.localdate()
+        self.rhema = Rhema.objects.create(title='Grâce du jour', verse='Ep 2:8', content='...', published_at=today)
+        self.future_rhema = Rhema.objects.create(
+            title='Grâce de demain', verse='Ep 2:9', content='...', published_at=today + datetime.timedelta(days=1)
+        )
+        self.prayer = PrayerRequest.objects.create(title='Grâce pour ma famille', content='Merci de prier')
+
+    def search(self, **params):
+        response = self.client.get('/api/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return [(result['type'], result['id']) for result in response.data['results']]
+
+    def test_public_search_is_ranked_and_filtered(self):
+        results = self.search(q='grace')
+        # Titre (poids 3) avant description (poids 1)
+        self.assertLess(results.index(('sermon', self.grace.pk)), results.index(('sermon', self.faith.pk)))
+        self.assertIn(('rhema', self.rhema.pk), results)
+        self.assertIn(('section', self.section.pk), results)
+        # Non publiés et privés exclus
+        self.assertNotIn(('sermon', self.draft.pk), results)
+        self.assertNotIn(('rhema', self.future_rhema.pk), results)
+        self.assertNotIn('prayer', {type_name for type_name, _ in results})
+
+    def test_accent_insensitive_prefix_and_all_terms(self):
+        self.assertEqual(self.search(q='PRIÈ', type='event'), [('event', self.event.pk)])
+        self.assertEqual(self.search(q='grace pri', type='sermon'), [('sermon', self.grace.pk)])
+        self.assertEqual(self.search(q='le la'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.event.title = 'Concert de louange'
+        self.event.save()
+        self.assertEqual(self.search(q='louange'), [('event', self.event.pk)])
+        self.assertEqual(self.search(q='nuit'), [])
+
+        self.event.delete()
+        self.assertEqual(self.search(q='louange'), [])
+        self.assertFalse(SearchDocument.objects.filter(object_id=self.event.pk, content_type__model='event').exists())
+
+    def test_unknown_type_is_rejected(self):
+        response = self.client.get('/api/search/', {'q': 'grace', 'type': 'prayer'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_admin_search_uses_index(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/api/admin/prayers/', {'search': 'famille'})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.prayer.pk])
+
+        response = self.client.get('/api/admin/sermons/', {'search': 'jean grace'})
+        self.assertEqual({item['id'] for item in response.data['results']}, {self.grace.pk, self.faith.pk, self.draft.pk})
+
+    def test_admin_search_is_not_capped(self):
+        self.client.force_authenticate(self.admin)
+        with mock.patch.object(SearchIndex, 'MAX_CANDIDATES', 1):
+            self.assertEqual(len(self.search(q='grace', type='sermon')), 1)
+            response = self.client.get('/api/admin/sermons/', {'search': 'grace'})
+        self.assertEqual({item['id'] for item in response.data['results']}, {self.grace.pk, self.faith.pk, self.draft.pk})
+
+    def test_rebuild_matches_incremental_index(self):
+        before = sorted(SearchToken.objects.values_list('document__object_id', 'token', 'field', 'weight'))
+        call_command('rebuild_search_index', stdout=StringIO())
+        after = sorted(SearchToken.objects.values_list('document__object_id', 'token', 'field', 'weight'))
+        self.assertEqual(before, after)
+        self.assertEqual(SearchDocument.objects.count(), 8)
+
+    def test_stored_text_holds_the_indexed_tokens(self):
+        # Le plein texte natif indexe title_text/body_text : mêmes termes que la table de jetons
+        for document in SearchDocument.objects.all():
+            words = set(f'{document.title_text} {document.body_text}'.split())
+            self.assertEqual(words, set(document.tokens.values_list('token', flat=True)))
+
+    def test_native_and_token_paths_agree(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('Plein texte natif : PostgreSQL uniquement')
+        Event.objects.create(title='Les prières de Jésus', description='Veillée', date=timezone.localdate())
+        content_types = list(ContentType.objects.get_for_models(Sermon, Event, Rhema, InformationSection).values())
+        for query in ('prières de Jésus', 'grace', 'grace pri', 'PRIÈ', 'foi'):
+            terms = query_terms(query)
+            native = {(ct, pk) for ct, pk, _ in SearchIndex.native_matches(terms, content_types)}
+            portable = {(ct, pk) for ct, pk, _ in SearchIndex.token_matches(terms, content_types)}
+            self.assertEqual(native, portable, query)
+            self.assertTrue(portable, query)
@@ -0,0 +1,44 @@
+"""
+Normalisation et découpage du texte pour l'index de recherche.
+
+Le même traitement est appliqué aux documents et aux requêtes : minuscules,
+accents retirés (« prière » → « priere »), mots vides français/anglais
+écartés et pluriels réguliers réduits (« prieres » → « priere »).
+"""
+import re
+
+from cyprus_api.text import normalize
+
+MAX_TOKEN_LENGTH = 64
+
+WORD = re.compile(r'\w+')
+
+STOPWORDS = frozenset("""
+a au aux avec ce ces cet cette dans de des du elle elles en est et il ils je la le les leur leurs
+ma mais mes mon ne nos notre nous on ou par pas pour qu que qui sa sans se ses son sont sur ta tes
+ton tu un une vos votre vous
+an and are as at be been but by for from he her his i in is it its me my no not of on or our she
+that the their them these they this those to was we were with you your
+""".split())
+
+
+def stem(word):
+    """Réduit les pluriels réguliers en -s / -x (mots de plus de 3 lettres)."""
+    if len(word) > 3 and word[-1] in 'sx' and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Liste des jetons (avec répétitions) d'un texte."""
+    tokens = []
+    for word in WORD.findall(normalize(text)):
+        if len(word) < 2 or word in STOPWORDS or word.isdigit() and len(word) < 3:
+            continue
+        tokens.append(stem(word)[:MAX_TOKEN_LENGTH])
+    return tokens
+
+
+def query_terms(query, limit=8):
+    """Jetons distincts d'une requête, dans l'ordre de saisie."""
+    return list(dict.fromkeys(tokenize(query)))[:limit]
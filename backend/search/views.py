@@ -0,0 +1,49 @@
+from rest_framework import permissions, status, views
+from rest_framework.response import Response
+
+from cyprus_api.cache import CachedResponseMixin
+from cyprus_api.exports import resolve, to_json
+
+from .services import SearchIndex
+
+
+class SearchView(CachedResponseMixin, views.APIView):
+    """
+    Recherche publique dans les sermons, événements, Rhemas et pages d'information.
+    GET ?q=grace&type=sermon,event&limit=20
+    """
+    permission_classes = [permissions.AllowAny]
+    cache_scope = 'search'
+    MAX_LIMIT = 50
+    EXCERPT_LENGTH = 200
+
+    def get(self, request):
+        return self.cached_response(request, self.search)
+
+    def search(self, request):
+        query = request.query_params.get('q', '').strip()
+        types = [name for name in request.query_params.get('type', '').split(',') if name]
+        unknown = set(types) - set(SearchIndex.public_types())
+        if unknown:
+            return Response(
+                {'error': f"Type inconnu. Choix : {', '.join(SearchIndex.public_types())}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), self.MAX_LIMIT)
+        except ValueError:
+            limit = 20
+
+        results = []
+        for type_name, obj, score in SearchIndex.search(query, types or None, limit=limit):
+            spec = SearchIndex.TYPES[type_name]
+            excerpt = resolve(obj, spec['excerpt']) or ''
+            results.append({
+                'type': type_name,
+                'id': obj.pk,
+                'title': resolve(obj, spec['title']),
+                'excerpt': excerpt[:self.EXCERPT_LENGTH],
+                'date': to_json(resolve(obj, spec['date'])),
+                'score': float(score),
+            })
+        return Response({'query': query, 'count': len(results), 'results': results})
@@ -2,9 +2,12 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from sermons.models import Sermon
-from sermons.serializers import SermonSerializer
+from sermons.serializers import SermonListSerializer, SermonSerializer
 from users.permissions import IsAdmin
-from django.db.models import Q
+from search.services import SearchIndex
+from outbox.models import Announcement
+from outbox.serializers import AnnouncementSerializer
+from outbox.services import Announcements
 
 class AdminSermonViewSet(viewsets.ModelViewSet):
     """
@@ -14,18 +17,18 @@ class AdminSermonViewSet(viewsets.ModelViewSet):
     serializer_class = SermonSerializer
     permission_classes = [IsAdmin]
     
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return SermonListSerializer
+        return SermonSerializer
+
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('pastor')
         
         # Search filter
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(pastor__first_name__icontains=search) |
-                Q(pastor__last_name__icontains=search) |
-                Q(description__icontains=search)
-            )
+            queryset = SearchIndex.filter_queryset(queryset, search)
         
         # Category filter
         category = self.request.query_params.get('category', None)
@@ -39,6 +42,7 @@ class AdminSermonViewSet(viewsets.ModelViewSet):
         """Duplicate a sermon"""
         sermon = self.get_object()
         sermon.pk = None
+        sermon.comment_count = 0
         sermon.title = f"{sermon.title} (Copie)"
         sermon.save()
         
@@ -47,6 +51,14 @@ class AdminSermonViewSet(viewsets.ModelViewSet):
             'sermon': SermonSerializer(sermon).data
         })
 
+    @action(detail=True, methods=['post'])
+    def announce(self, request, pk=None):
+        """Annonce le sermon par email aux membres abonnés (envoi par run_mail_worker)"""
+        announcement = Announcements.create(Announcement.Kind.SERMON, self.get_object(), created_by=request.user)
+        if announcement is None:
+            return Response({'error': "Cet élément a déjà été annoncé"}, status=status.HTTP_409_CONFLICT)
+        return Response(AnnouncementSerializer(announcement).data, status=status.HTTP_202_ACCEPTED)
+
     def perform_create(self, serializer):
         title = serializer.validated_data.get('title')
         from django.utils.text import slugify
@@ -5,3 +5,11 @@ class SermonsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sermons'
     verbose_name = 'Sermons'
+
+    def ready(self):
+        from cyprus_api.cache import invalidate_scope_on
+        from cyprus_api.images import generate_variants_on
+        from .models import Sermon, SermonComment
+        invalidate_scope_on('sermons', Sermon, SermonComment)
+        generate_variants_on(Sermon, 'cover_image')
+        from . import signals  # noqa: F401
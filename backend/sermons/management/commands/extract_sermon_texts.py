@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from sermons.models import PDFText, Sermon
+from sermons.services import PDFTextExtraction
+
+
+class Command(BaseCommand):
+    help = "Extrait le texte des PDF de sermons pour la recherche (fichiers nouveaux ou remplacés)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Retraite aussi les sermons à jour")
+        parser.add_argument('--prune', action='store_true', help="Supprime les textes qui ne sont plus rattachés")
+
+    def handle(self, *args, **options):
+        sermons = [
+            sermon for sermon in Sermon.objects.only('pk', 'pdf_file', 'pdf_text_source').iterator()
+            if options['force'] or PDFTextExtraction.is_stale(sermon)
+        ]
+        for sermon in sermons:
+            pdf_text = PDFTextExtraction.process(sermon.pk, force=options['force'])
+            if sermon.pdf_file and pdf_text is None:
+                self.stdout.write(self.style.WARNING(f"Sermon #{sermon.pk} : PDF illisible"))
+        self.stdout.write(self.style.SUCCESS(f"{len(sermons)} sermon(s) traité(s)."))
+
+        if options['prune']:
+            deleted, _ = PDFText.objects.filter(sermons__isnull=True).delete()
+            self.stdout.write(f"{deleted} texte(s) orphelin(s) supprimé(s).")
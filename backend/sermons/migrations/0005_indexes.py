@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0004_alter_sermon_category'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sermon',
+            index=models.Index(fields=['category', '-created_at'], name='sermon_category_created_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0006_sermon_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sermon',
+            name='cover_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sermons', '0007_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PDFText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='Empreinte SHA-256')),
+                ('pages', models.PositiveIntegerField(default=0, verbose_name='Pages')),
+                ('data', models.BinaryField(verbose_name='Texte compressé')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Texte de PDF',
+                'verbose_name_plural': 'Textes de PDF',
+            },
+        ),
+        migrations.AddField(
+            model_name='sermon',
+            name='pdf_text_source',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='sermon',
+            name='pdf_text',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sermons', to='sermons.pdftext'),
+        ),
+    ]
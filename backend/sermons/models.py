@@ -2,6 +2,28 @@ from django.db import models
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
+from .pdftext import decompress_text
+
+
+class PDFText(models.Model):
+    """Texte extrait d'un PDF, compressé (zlib) et partagé par empreinte SHA-256 du fichier"""
+    sha256 = models.CharField(_('Empreinte SHA-256'), max_length=64, unique=True)
+    pages = models.PositiveIntegerField(_('Pages'), default=0)
+    data = models.BinaryField(_('Texte compressé'))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Texte de PDF')
+        verbose_name_plural = _('Textes de PDF')
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.pages} pages)"
+
+    @property
+    def text(self):
+        return decompress_text(self.data)
+
+
 class Sermon(models.TitleChoices if False else models.Model): # Placeholder for safety, using models.Model
     title = models.CharField(_('Titre'), max_length=255)
     description = models.TextField(_('Description'), blank=True)
@@ -36,8 +58,16 @@ class Sermon(models.TitleChoices if False else models.Model): # Placeholder for
 
     pdf_file = models.FileField(_('Fichier PDF'), upload_to='sermons/pdfs/', blank=True, null=True)
     cover_image = models.ImageField(_('Image de couverture'), upload_to='sermons/covers/', blank=True, null=True)
+    cover_image_variants = models.JSONField(default=dict, blank=True, editable=False)  # voir cyprus_api/images.py
+    # Texte du PDF extrait en arrière-plan (voir sermons/services.py) et nom du fichier dont il provient
+    pdf_text = models.ForeignKey(
+        PDFText, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='sermons'
+    )
+    pdf_text_source = models.CharField(max_length=255, blank=True, editable=False)
     
     is_published = models.BooleanField(_('Publié'), default=True)
+    # Dénormalisé, maintenu par les signaux de SermonComment (voir sermons/signals.py)
+    comment_count = models.PositiveIntegerField(_('Nombre de commentaires'), default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -45,10 +75,20 @@ class Sermon(models.TitleChoices if False else models.Model): # Placeholder for
         verbose_name = _('Sermon')
         verbose_name_plural = _('Sermons')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['category', '-created_at'], name='sermon_category_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def pdf_search_text(self):
+        """Texte du PDF pour l'index de recherche ; vide tant que le fichier actuel n'est pas extrait"""
+        if not self.pdf_text_id or self.pdf_text_source != (self.pdf_file.name or ''):
+            return ''
+        return self.pdf_text.text[:settings.SERMON_PDF_SEARCH_CHARS]
+
 class SermonComment(models.Model):
     sermon = models.ForeignKey(Sermon, on_delete=models.CASCADE, related_name='comments')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sermon_comments')
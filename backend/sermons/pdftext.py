@@ -0,0 +1,50 @@
+"""
+Extraction du texte des PDF de sermons.
+
+Ce module n'importe pas Django : ses fonctions sont exécutées dans les
+processus du pool d'extraction (contexte « spawn », voir services.py), qui le
+chargent sans initialiser le projet. Le texte est lu page par page et
+compressé au fil de l'eau : même pour un PDF de 50 Mo, seul le texte compressé
+est gardé en mémoire puis renvoyé au processus principal.
+"""
+import hashlib
+import zlib
+
+from PyPDF2 import PdfReader
+
+# Séparateur de pages dans le texte stocké (saut de page)
+PAGE_SEPARATOR = '\f'
+CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path):
+    """Empreinte SHA-256 (hexadécimale) d'un fichier, lu par blocs."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extract_text(path):
+    """Retourne ``(nombre de pages, texte compressé zlib)`` ; lève une exception si le PDF est illisible."""
+    reader = PdfReader(path)
+    if reader.is_encrypted:
+        # Protégé sans mot de passe d'ouverture (droits restreints) : lisible tel quel
+        reader.decrypt('')
+    compressor = zlib.compressobj(9)
+    chunks = []
+    pages = 0
+    for page in reader.pages:
+        try:
+            text = page.extract_text() or ''
+        except Exception:  # page corrompue : les suivantes restent exploitables
+            text = ''
+        chunks.append(compressor.compress(((PAGE_SEPARATOR if pages else '') + text).encode('utf-8')))
+        pages += 1
+    chunks.append(compressor.flush())
+    return pages, b''.join(chunks)
+
+
+def decompress_text(data):
+    return zlib.decompress(bytes(data)).decode('utf-8') if data else ''
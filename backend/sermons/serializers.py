@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from .models import Sermon, SermonComment
 from django.contrib.auth import get_user_model
+from django.urls import reverse
+from cyprus_api.images import ImageVariantsField
 
 User = get_user_model()
 
@@ -12,10 +14,12 @@ class SermonCommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'sermon', 'user', 'user_name', 'content', 'created_at')
         read_only_fields = ('user',)
 
-class SermonSerializer(serializers.ModelSerializer):
+class SermonListSerializer(serializers.ModelSerializer):
+    """Représentation légère pour les listes : pas de commentaires, seulement leur nombre"""
     pastor_name = serializers.ReadOnlyField(source='pastor.username')
-    comments = SermonCommentSerializer(many=True, read_only=True)
     thumbnail = serializers.SerializerMethodField()
+    cover_image_srcset = ImageVariantsField('cover_image')
+    pdf_url = serializers.SerializerMethodField()
     date = serializers.SerializerMethodField()
     youtube_id = serializers.SerializerMethodField()
 
@@ -23,10 +27,10 @@ class SermonSerializer(serializers.ModelSerializer):
         model = Sermon
         fields = (
             'id', 'title', 'description', 'slug', 'pastor', 'pastor_name', 'category',
-            'youtube_url', 'pdf_file', 'cover_image', 'thumbnail', 'date', 'youtube_id',
-            'is_published', 'created_at', 'updated_at', 'comments'
+            'youtube_url', 'pdf_file', 'pdf_url', 'cover_image', 'cover_image_srcset', 'thumbnail', 'date', 'youtube_id',
+            'is_published', 'comment_count', 'created_at', 'updated_at'
         )
-        read_only_fields = ('slug', 'pastor', 'created_at', 'updated_at')
+        read_only_fields = ('slug', 'pastor', 'comment_count', 'created_at', 'updated_at')
 
     def get_thumbnail(self, obj):
         if obj.cover_image:
@@ -36,6 +40,14 @@ class SermonSerializer(serializers.ModelSerializer):
             return obj.cover_image.url
         return None
 
+    def get_pdf_url(self, obj):
+        """URL de diffusion du PDF (Range, cache), à préférer au lien direct vers /media/"""
+        if not obj.pdf_file:
+            return None
+        url = reverse('sermon-pdf', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
     def get_date(self, obj):
         return obj.created_at.strftime('%d %B %Y')
 
@@ -47,3 +59,17 @@ class SermonSerializer(serializers.ModelSerializer):
             elif "youtu.be/" in obj.youtube_url:
                 return obj.youtube_url.split("/")[-1]
         return None
+
+
+class SermonSerializer(SermonListSerializer):
+    """Détail d'un sermon avec les derniers commentaires (la suite via /comments/)"""
+    LATEST_COMMENTS = 5
+
+    comments = serializers.SerializerMethodField()
+
+    class Meta(SermonListSerializer.Meta):
+        fields = SermonListSerializer.Meta.fields + ('comments',)
+
+    def get_comments(self, obj):
+        latest = obj.comments.select_related('user')[:self.LATEST_COMMENTS]
+        return SermonCommentSerializer(latest, many=True, context=self.context).data
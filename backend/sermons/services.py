@@ -0,0 +1,136 @@
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from .models import PDFText, Sermon
+from .pdftext import extract_text, file_digest
+
+logger = logging.getLogger(__name__)
+
+# Une extraction à la fois par processus web ; l'analyse du PDF se fait dans le pool de processus
+_runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sermon-pdf-text')
+_processes = None
+_processes_lock = threading.Lock()
+
+
+def process_pool():
+    """Pool de processus d'extraction, créé à la première utilisation."""
+    global _processes
+    with _processes_lock:
+        if _processes is None:
+            # « spawn » : pas de fork d'un processus multithreadé ayant des connexions ouvertes
+            _processes = ProcessPoolExecutor(
+                max_workers=max(1, settings.SERMON_PDF_TEXT_WORKERS),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _processes
+
+
+def reset_process_pool():
+    """Abandonne un pool cassé (processus tué, mémoire épuisée...) ; le suivant sera recréé."""
+    global _processes
+    with _processes_lock:
+        if _processes is not None:
+            _processes.shutdown(wait=False, cancel_futures=True)
+        _processes = None
+
+
+class PDFTextExtraction:
+    """
+    Extraction en arrière-plan du texte des PDF de sermons, pour la recherche.
+
+    À chaque enregistrement d'un sermon dont le PDF a changé (voir signals.py),
+    l'extraction est programmée après le commit : la requête d'upload n'attend
+    pas. Un thread calcule l'empreinte SHA-256 du fichier ; si un ``PDFText``
+    existe déjà pour cette empreinte, il est réutilisé sans relire le PDF.
+    Sinon le texte est extrait page par page dans un processus séparé
+    (pdftext.py), compressé, puis rattaché au sermon par un ``save()`` qui
+    déclenche la réindexation (search/signals.py).
+    ``manage.py extract_sermon_texts`` traite les sermons existants.
+    """
+
+    @staticmethod
+    def schedule(sermon_id):
+        transaction.on_commit(lambda: PDFTextExtraction.start(sermon_id))
+
+    @staticmethod
+    def start(sermon_id):
+        return _runner.submit(PDFTextExtraction.run, sermon_id)
+
+    @staticmethod
+    def run(sermon_id):
+        """Point d'entrée du thread d'arrière-plan."""
+        close_old_connections()
+        try:
+            PDFTextExtraction.process(sermon_id)
+        except Exception:
+            logger.exception("Extraction du PDF du sermon %s interrompue", sermon_id)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def is_stale(sermon):
+        return sermon.pdf_text_source != (sermon.pdf_file.name or '')
+
+    @staticmethod
+    @contextmanager
+    def local_path(field_file):
+        """Chemin local du fichier ; copie temporaire pour un stockage distant."""
+        try:
+            yield field_file.path
+            return
+        except NotImplementedError:
+            pass
+        handle, path = tempfile.mkstemp(suffix='.pdf')
+        try:
+            with os.fdopen(handle, 'wb') as target, field_file.storage.open(field_file.name, 'rb') as source:
+                shutil.copyfileobj(source, target)
+            yield path
+        finally:
+            os.remove(path)
+
+    @staticmethod
+    def extract(field_file):
+        """``PDFText`` du fichier (existant ou nouvellement extrait), ``None`` si le PDF est illisible."""
+        with PDFTextExtraction.local_path(field_file) as path:
+            digest = file_digest(path)
+            pdf_text = PDFText.objects.filter(sha256=digest).defer('data').first()
+            if pdf_text is not None:
+                return pdf_text
+            try:
+                pages, data = process_pool().submit(extract_text, path).result()
+            except BrokenProcessPool:
+                reset_process_pool()
+                raise
+            except Exception as exc:
+                logger.warning("PDF illisible %s : %s", field_file.name, exc)
+                return None
+        pdf_text, _ = PDFText.objects.get_or_create(sha256=digest, defaults={'pages': pages, 'data': data})
+        return pdf_text
+
+    @staticmethod
+    def process(sermon_id, force=False):
+        """Extrait le texte du PDF actuel du sermon ; retourne le ``PDFText`` rattaché (ou ``None``)."""
+        sermon = Sermon.objects.filter(pk=sermon_id).only('pk', 'pdf_file', 'pdf_text', 'pdf_text_source').first()
+        if sermon is None or not (force or PDFTextExtraction.is_stale(sermon)):
+            return None
+        name = sermon.pdf_file.name or ''
+        pdf_text = PDFTextExtraction.extract(sermon.pdf_file) if name else None
+
+        with transaction.atomic():
+            sermon = Sermon.objects.select_for_update().get(pk=sermon_id)
+            if (sermon.pdf_file.name or '') != name:
+                return None  # fichier remplacé entre-temps : une autre extraction est programmée
+            sermon.pdf_text = pdf_text
+            sermon.pdf_text_source = name
+            sermon.save(update_fields=['pdf_text', 'pdf_text_source', 'updated_at'])
+        return pdf_text
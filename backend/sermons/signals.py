@@ -0,0 +1,41 @@
+"""
+Maintien du compteur dénormalisé ``Sermon.comment_count`` et déclenchement de
+l'extraction du texte des PDF (voir services.py).
+
+La mise à jour se fait par expression F() : pas de lecture préalable, pas de
+course entre deux commentaires simultanés. ``updated_at`` est avancé pour que
+la représentation du sermon soit considérée comme modifiée.
+"""
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Sermon, SermonComment
+from .services import PDFTextExtraction
+
+
+@receiver(post_save, sender=SermonComment, dispatch_uid='sermon_comment_saved')
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        Sermon.objects.filter(pk=instance.sermon_id).update(
+            comment_count=F('comment_count') + 1,
+            updated_at=timezone.now()
+        )
+
+
+@receiver(post_delete, sender=SermonComment, dispatch_uid='sermon_comment_deleted')
+def comment_deleted(sender, instance, **kwargs):
+    # comment_count > 0 : protège contre une double suppression
+    Sermon.objects.filter(pk=instance.sermon_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Sermon, dispatch_uid='sermon_pdf_saved')
+def pdf_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'pdf_file' not in update_fields):
+        return
+    if PDFTextExtraction.is_stale(instance):
+        PDFTextExtraction.schedule(instance.pk)
@@ -0,0 +1,233 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from reportlab.pdfgen import canvas
+from rest_framework.test import APITestCase
+
+from .models import PDFText, Sermon, SermonComment
+from .serializers import SermonSerializer
+from .services import PDFTextExtraction
+
+User = get_user_model()
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class SermonCommentsTests(APITestCase):
+    def setUp(self):
+        self.pastor = User.objects.create(username='pasteur', role=User.Role.PASTOR)
+        self.sermon = Sermon.objects.create(title='Grâce', slug='grace', pastor=self.pastor)
+        self.members = [User.objects.create(username=f'membre{index}') for index in range(3)]
+        for index in range(25):
+            SermonComment.objects.create(sermon=self.sermon, user=self.members[index % 3], content=f'Amen {index}')
+
+    def test_comment_count_is_maintained(self):
+        self.sermon.refresh_from_db()
+        self.assertEqual(self.sermon.comment_count, 25)
+        SermonComment.objects.filter(sermon=self.sermon).first().delete()
+        self.sermon.refresh_from_db()
+        self.assertEqual(self.sermon.comment_count, 24)
+
+    def test_list_is_lightweight(self):
+        Sermon.objects.create(title='Foi', slug='foi', pastor=self.pastor)
+        with self.assertNumQueries(3):  # version (ETag), COUNT de pagination, page
+            response = self.client.get('/api/sermons/')
+        sermon = response.data['results'][-1]
+        self.assertNotIn('comments', sermon)
+        self.assertEqual(sermon['comment_count'], 25)
+
+    def test_detail_embeds_latest_comments_only(self):
+        response = self.client.get(f'/api/sermons/{self.sermon.pk}/')
+        self.assertEqual(len(response.data['comments']), SermonSerializer.LATEST_COMMENTS)
+        self.assertEqual(response.data['comments'][0]['content'], 'Amen 24')
+
+    def test_comments_are_cursor_paginated(self):
+        url = f'/api/sermons/{self.sermon.pk}/comments/'
+        with self.assertNumQueries(2):
+            first = self.client.get(url)
+        self.assertEqual(len(first.data['results']), 20)
+        self.assertEqual(first.data['results'][0]['user_name'], self.members[24 % 3].username)
+
+        second = self.client.get(first.data['next'])
+        self.assertEqual(len(second.data['results']), 5)
+        self.assertIsNone(second.data['next'])
+        contents = {c['content'] for c in first.data['results'] + second.data['results']}
+        self.assertEqual(len(contents), 25)
+
+
+@override_settings(API_CACHE_TIMEOUT=0)
+class SermonPDFTests(APITestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.content = b'%PDF-1.4\n' + os.urandom(200_000)
+        pastor = User.objects.create(username='pasteur', role=User.Role.PASTOR)
+        self.sermon = Sermon.objects.create(title='Laodicée', slug='laodicee', pastor=pastor)
+        self.sermon.pdf_file.save('laodicee.pdf', ContentFile(self.content))
+        self.url = f'/api/sermons/{self.sermon.pk}/pdf/'
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(int(response['Content-Length']), len(self.content))
+        self.assertEqual(response['Content-Disposition'], 'inline; filename="laodicee.pdf"')
+        self.assertEqual(self.body(response), self.content)
+
+        listed = self.client.get(f'/api/sermons/{self.sermon.pk}/').data
+        self.assertEqual(listed['pdf_url'], 'http://testserver' + self.url)
+
+    def test_byte_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.content)}')
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(self.body(response), self.content[100:200])
+
+        # Reprise d'un téléchargement interrompu, puis fin du fichier
+        self.assertEqual(self.body(self.client.get(self.url, HTTP_RANGE='bytes=150000-')), self.content[150000:])
+        self.assertEqual(self.body(self.client.get(self.url, HTTP_RANGE='bytes=-500')), self.content[-500:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_conditional_requests(self):
+        first = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        # Fichier modifié depuis : la plage demandée est ignorée, tout est renvoyé
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"obsolete"')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=first['ETag'])
+        self.assertEqual(response.status_code, 206)
+
+    def test_sendfile_offload(self):
+        with override_settings(MEDIA_SENDFILE='x-accel-redirect', MEDIA_SENDFILE_PREFIX='/protected-media/'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.sermon.pdf_file.name}')
+        self.assertEqual(response.content, b'')
+        self.assertIn('ETag', response)
+
+        with override_settings(MEDIA_SENDFILE='x-sendfile'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], self.sermon.pdf_file.path)
+
+    def test_missing_pdf_is_404(self):
+        self.sermon.pdf_file = None
+        self.sermon.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+def pdf_document(*pages):
+    """PDF (reportlab) dont chaque page contient le texte donné."""
+    buffer = BytesIO()
+    document = canvas.Canvas(buffer)
+    for text in pages:
+        document.drawString(72, 720, text)
+        document.showPage()
+    document.save()
+    return ContentFile(buffer.getvalue())
+
+
+class TemporaryMediaMixin:
+    def setUp(self):
+        super().setUp()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media, API_CACHE_TIMEOUT=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.pastor = User.objects.create(username='pasteur', role=User.Role.PASTOR)
+
+
+class PDFTextExtractionTests(TemporaryMediaMixin, APITestCase):
+    def sermon(self, slug, *pages, document=None):
+        sermon = Sermon.objects.create(title=slug.title(), slug=slug, pastor=self.pastor)
+        sermon.pdf_file.save(f'{slug}.pdf', document or pdf_document(*pages))
+        return sermon
+
+    def test_text_is_extracted_page_by_page_and_compressed(self):
+        pages = ['Heureux les artisans de paix ' * 10, 'Vous etes le sel de la terre ' * 10]
+        sermon = self.sermon('beatitudes', *pages)
+        pdf_text = PDFTextExtraction.process(sermon.pk)
+
+        self.assertEqual(pdf_text.pages, 2)
+        self.assertEqual([page.strip() for page in pdf_text.text.split('\f')], [page.strip() for page in pages])
+        self.assertLess(len(pdf_text.data), len(pdf_text.text) // 4)
+
+        sermon.refresh_from_db()
+        self.assertEqual((sermon.pdf_text, sermon.pdf_text_source), (pdf_text, sermon.pdf_file.name))
+        self.assertIsNone(PDFTextExtraction.process(sermon.pk))  # déjà à jour
+
+    def test_identical_files_are_parsed_once(self):
+        content = pdf_document('Le bon berger').read()
+        first = self.sermon('original', document=ContentFile(content))
+        PDFTextExtraction.process(first.pk)
+        copy = self.sermon('copie', document=ContentFile(content))
+
+        with mock.patch('sermons.services.process_pool') as pool:
+            pdf_text = PDFTextExtraction.process(copy.pk)
+        pool.assert_not_called()
+        first.refresh_from_db()
+        self.assertEqual(pdf_text, first.pdf_text)
+        self.assertEqual(PDFText.objects.count(), 1)
+
+    def test_unreadable_pdf_is_not_retried(self):
+        sermon = Sermon.objects.create(title='Corrompu', slug='corrompu', pastor=self.pastor)
+        sermon.pdf_file.save('corrompu.pdf', ContentFile(b'%PDF-1.4 tronque'))
+        with self.assertLogs('sermons.services', level='WARNING'):
+            self.assertIsNone(PDFTextExtraction.process(sermon.pk))
+        sermon.refresh_from_db()
+        self.assertEqual((sermon.pdf_text, sermon.pdf_text_source), (None, sermon.pdf_file.name))
+
+    def test_command_processes_stale_sermons_and_prunes(self):
+        sermon = self.sermon('ancien', 'Premier texte')
+        PDFTextExtraction.process(sermon.pk)
+        sermon.pdf_file.save('nouveau.pdf', pdf_document('Second texte'))
+
+        out = StringIO()
+        call_command('extract_sermon_texts', '--prune', stdout=out)
+        self.assertIn('1 sermon(s)', out.getvalue())
+        self.assertEqual(list(PDFText.objects.values_list('pages', flat=True)), [1])
+        sermon.refresh_from_db()
+        self.assertIn('Second texte', sermon.pdf_search_text)
+
+
+class PDFTextSearchTests(TemporaryMediaMixin, TransactionTestCase):
+    """Transactions réelles : l'extraction démarre après le commit, dans un autre thread."""
+
+    def test_uploaded_pdf_becomes_searchable(self):
+        sermon = Sermon.objects.create(title='Dimanche', slug='dimanche', pastor=self.pastor)
+        self.assertEqual(self.client.get('/api/search/', {'q': 'Laodicee'}).data['results'], [])
+
+        scheduled = []
+        with mock.patch.object(PDFTextExtraction, 'start', side_effect=scheduled.append):
+            sermon.pdf_file.save('notes.pdf', pdf_document('Introduction', 'Lettre a Laodicee'))
+        self.assertEqual(scheduled, [sermon.pk])
+        # Hors transaction, on_commit s'exécute pendant save() : le thread n'est lancé
+        # qu'une fois les autres post_save (réindexation) terminés, SQLite en mémoire
+        # partagée refusant deux écritures simultanées. Puis attente du thread.
+        PDFTextExtraction.start(sermon.pk).result(timeout=30)
+
+        sermon.refresh_from_db()
+        self.assertEqual(sermon.pdf_text.pages, 2)
+        results = self.client.get('/api/search/', {'q': 'Laodicee'}).data['results']
+        self.assertEqual([(result['type'], result['id']) for result in results], [('sermon', sermon.pk)])
@@ -1,24 +1,39 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from django.utils.text import slugify
 from .models import Sermon, SermonComment
-from .serializers import SermonSerializer, SermonCommentSerializer
+from .serializers import SermonListSerializer, SermonSerializer, SermonCommentSerializer
 from users.permissions import IsAdmin
+from cyprus_api.cache import CachedResponseMixin
+from cyprus_api.conditional import ConditionalGetMixin
+from cyprus_api.downloads import file_response
 
-class SermonViewSet(viewsets.ModelViewSet):
+class SermonCommentPagination(CursorPagination):
+    page_size = 20
+    ordering = ('-created_at', '-id')
+
+
+class SermonViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Sermon.objects.all()
     serializer_class = SermonSerializer
+    cache_scope = 'sermons'
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return SermonListSerializer
+        return SermonSerializer
 
     def get_queryset(self):
-        queryset = Sermon.objects.all()
+        queryset = Sermon.objects.select_related('pastor')
         category = self.request.query_params.get('category')
         if category:
             queryset = queryset.filter(category=category)
         return queryset
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'comments', 'pdf']:
             permission_classes = [permissions.AllowAny]
         elif self.action in ['create', 'update', 'partial_update', 'destroy']:
             # Seuls les Admins peuvent créer/modifier/supprimer
@@ -49,3 +64,22 @@ class SermonViewSet(viewsets.ModelViewSet):
             serializer.save(user=request.user, sermon=sermon)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=True, methods=['get'], pagination_class=SermonCommentPagination)
+    def comments(self, request, pk=None):
+        """Commentaires du sermon, du plus récent au plus ancien (pagination par curseur)"""
+        sermon = self.get_object()
+        queryset = SermonComment.objects.filter(sermon=sermon).select_related('user')
+        page = self.paginate_queryset(queryset)
+        serializer = SermonCommentSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def pdf(self, request, pk=None):
+        """
+        PDF du sermon : reprise et lecture partielle (Range), 304 si inchangé ;
+        délégué au proxy frontal si MEDIA_SENDFILE est configuré.
+        """
+        sermon = self.get_object()
+        return file_response(request, sermon.pdf_file, filename=f'{sermon.slug or sermon.pk}.pdf',
+                             content_type='application/pdf')
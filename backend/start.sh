@@ -0,0 +1,26 @@
+#!/usr/bin/env bash
+# Start the API server.
+#   SERVER_MODE=wsgi (default) : gunicorn sync workers
+#   SERVER_MODE=asgi           : uvicorn workers; async views (e.g. /api/ai/ask/)
+#                                wait on external APIs without holding a worker;
+#                                required for the chat WebSocket (/ws/chat/)
+#   RUN_MAIL_WORKER=false (default): the email outbox is drained by a dedicated,
+#                                supervised run_mail_worker service (render.yaml);
+#                                true starts an unsupervised one in this container
+#                                (single-container local setups only)
+set -o errexit
+
+PORT="${PORT:-8000}"
+
+if [ "${RUN_MAIL_WORKER:-false}" = "true" ]; then
+    python manage.py run_mail_worker &
+fi
+
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    exec uvicorn cyprus_api.asgi:application \
+        --host 0.0.0.0 --port "$PORT" \
+        --workers "${WEB_CONCURRENCY:-2}" \
+        --proxy-headers --forwarded-allow-ips '*'
+fi
+
+exec gunicorn --bind "0.0.0.0:$PORT" cyprus_api.wsgi:application
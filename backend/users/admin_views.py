@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAdminUser
 from django.contrib.auth import get_user_model
 from users.serializers import UserSerializer, CreatePastorSerializer
 from django.db.models import Q
+from cyprus_api.exports import StreamingExportMixin
 import string
 import secrets
 
@@ -12,13 +13,27 @@ import secrets
 
 User = get_user_model()
 
-class AdminUserViewSet(viewsets.ModelViewSet):
+class AdminUserViewSet(StreamingExportMixin, viewsets.ModelViewSet):
     """
     ViewSet for admin user management
     """
     queryset = User.objects.all().order_by('-created_at')
     serializer_class = UserSerializer
     permission_classes = [IsAdminUser]
+
+    export_filename = 'users'
+    export_fields = (
+        ('id', 'ID', 'id'),
+        ('member_id', 'Numéro de membre', 'member_id'),
+        ('username', 'Identifiant', 'username'),
+        ('first_name', 'Prénom', 'first_name'),
+        ('last_name', 'Nom', 'last_name'),
+        ('email', 'Email', 'email'),
+        ('phone_number', 'Téléphone', 'phone_number'),
+        ('role', 'Rôle', 'role'),
+        ('is_active', 'Actif', 'is_active'),
+        ('created_at', 'Inscription', 'created_at'),
+    )
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -5,3 +5,10 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
     verbose_name = 'Utilisateurs'
+
+    def ready(self):
+        from cyprus_api.images import generate_variants_on
+        from .models import User
+        generate_variants_on(User, 'profile_picture')
+        from .authentication import invalidate_on_user_change
+        invalidate_on_user_change()
@@ -0,0 +1,102 @@
+"""
+Authentification JWT sans lecture de la table des utilisateurs à chaque requête.
+
+Le jeton d'accès donne l'identifiant ; les champs utiles aux permissions
+(rôle, ``is_superuser``, ``is_active``...) viennent d'un enregistrement mis en
+cache JWT_USER_CACHE_TIMEOUT secondes. Le claim ``role`` du jeton n'est pas
+utilisé pour autoriser : il peut dater de ACCESS_TOKEN_LIFETIME, alors que
+l'enregistrement en cache est supprimé à chaque sauvegarde de l'utilisateur
+(changement de rôle, désactivation...). Les jetons révoqués (déconnexion) sont
+refusés ; le contrôle passe par un filtre de Bloom en mémoire (revocation.py).
+
+La suppression n'atteint que le cache qui la reçoit : avec le cache locmem,
+propre à chaque processus, un administrateur désactivé garderait ses droits
+dans les autres workers jusqu'à expiration. Le cache utilisateur n'est donc
+utilisé qu'avec un backend partagé (filebased, redis...).
+
+``request.user`` est une vraie instance de ``User`` dont les autres champs sont
+différés : une vue qui lit la bio ou la photo les charge tous en une requête
+(voir ``User.refresh_from_db``), les clés étrangères et les filtres
+``user=request.user`` fonctionnent normalement.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from cyprus_api.cache import is_shared_cache
+
+from .revocation import TokenRevocation
+
+USER_KEY = 'auth-user:{user_id}'
+
+# Champs chargés à l'authentification (permissions, filtres par rôle, affichage courant)
+AUTH_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'role',
+    'is_staff', 'is_superuser', 'is_active', 'preferred_language',
+)
+
+
+def auth_field_names(model):
+    """Champs de AUTH_FIELDS dans l'ordre des colonnes (attendu par ``Model.from_db``)."""
+    return [field.attname for field in model._meta.concrete_fields if field.attname in AUTH_FIELDS]
+
+
+def user_cache_timeout():
+    """JWT_USER_CACHE_TIMEOUT, ou 0 si le cache n'est pas partagé entre processus (locmem)."""
+    return settings.JWT_USER_CACHE_TIMEOUT if is_shared_cache() else 0
+
+
+def forget_user(user_id):
+    cache.delete(USER_KEY.format(user_id=user_id))
+
+
+def user_changed(sender, instance, **kwargs):
+    # Après le commit : une requête concurrente ne remet pas l'ancien état en cache
+    transaction.on_commit(lambda: forget_user(instance.pk))
+
+
+def invalidate_on_user_change():
+    model = get_user_model()
+    post_save.connect(user_changed, sender=model, dispatch_uid='auth-user-saved')
+    post_delete.connect(user_changed, sender=model, dispatch_uid='auth-user-deleted')
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` servant l'utilisateur depuis le cache (voir l'en-tête du module)."""
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if TokenRevocation.is_revoked(token.get(api_settings.JTI_CLAIM)):
+            raise InvalidToken(_("Token is blacklisted"))
+        return token
+
+    def get_user(self, validated_token):
+        timeout = user_cache_timeout()
+        if not timeout or api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        names = auth_field_names(self.user_model)
+        key = USER_KEY.format(user_id=user_id)
+        record = cache.get(key)
+        if record is None:
+            record = self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values(*names).first()
+            if record is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            cache.set(key, record, timeout)
+
+        user = self.user_model.from_db(
+            router.db_for_read(self.user_model), names, [record[name] for name in names]
+        )
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
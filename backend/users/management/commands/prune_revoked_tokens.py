@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from users.revocation import TokenRevocation
+
+
+class Command(BaseCommand):
+    help = "Supprime les jetons révoqués expirés (à planifier, par exemple chaque nuit)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Lignes supprimées par requête")
+
+    def handle(self, *args, **options):
+        deleted = TokenRevocation.prune(batch_size=max(1, options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(f"{deleted} jeton(s) révoqué(s) expiré(s) supprimé(s)."))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='preferred_language',
+            field=models.CharField(choices=[('fr', 'Français'), ('en', 'English')], default='fr', max_length=5, verbose_name='Langue préférée'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='receive_announcements',
+            field=models.BooleanField(default=True, verbose_name='Recevoir les annonces par email'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=64, unique=True)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Jeton révoqué',
+                'verbose_name_plural': 'Jetons révoqués',
+                'indexes': [
+                    models.Index(fields=['expires_at'], name='revoked_token_expiry_idx'),
+                    models.Index(fields=['created_at'], name='revoked_token_created_idx'),
+                ],
+            },
+        ),
+    ]
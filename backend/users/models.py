@@ -1,7 +1,16 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import UserManager as BaseUserManager
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
+
+class UserManager(BaseUserManager):
+    def by_email(self, email):
+        """Utilisateurs dont l'email est ``email``, sans tenir compte de la casse (index user_email_lower_idx)."""
+        return self.alias(email_lower=Lower('email')).filter(email_lower=email.lower())
+
+
 class User(AbstractUser):
     class Role(models.TextChoices):
         ADMIN = 'ADMIN', _('Administrateur')
@@ -9,6 +18,10 @@ class User(AbstractUser):
         MODERATOR = 'MODERATOR', _('Modérateur')
         MEMBER = 'MEMBER', _('Membre')
 
+    class Language(models.TextChoices):
+        FR = 'fr', 'Français'
+        EN = 'en', 'English'
+
     role = models.CharField(
         _('Rôle'),
         max_length=20,
@@ -19,22 +32,42 @@ class User(AbstractUser):
     phone_number = models.CharField(_('Numéro de téléphone'), max_length=20, blank=True, null=True)
     is_2fa_enabled = models.BooleanField(_('2FA Activé'), default=False)
     profile_picture = models.ImageField(_('Photo de profil'), upload_to='profiles/', blank=True, null=True)
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)  # voir cyprus_api/images.py
     bio = models.TextField(_('Biographie'), max_length=500, blank=True)
     birth_date = models.DateField(_('Date de naissance'), blank=True, null=True)
     address = models.CharField(_('Adresse'), max_length=255, blank=True, null=True)
     
     member_id = models.CharField(_('Numéro de Membre'), max_length=20, unique=True, blank=True, null=True)
+
+    preferred_language = models.CharField(
+        _('Langue préférée'), max_length=5, choices=Language.choices, default=Language.FR
+    )
+    receive_announcements = models.BooleanField(_('Recevoir les annonces par email'), default=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = UserManager()
+
     class Meta:
         verbose_name = _('Utilisateur')
         verbose_name_plural = _('Utilisateurs')
+        indexes = [
+            # Connexion / inscription par email, insensible à la casse
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            models.Index(fields=['role'], name='user_role_idx'),
+        ]
 
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
 
+    def refresh_from_db(self, using=None, fields=None):
+        # Utilisateur partiel (users/authentication.py) : le premier champ différé lu charge tous les autres
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields)
+
     @property
     def is_pastor(self):
         return self.role == self.Role.PASTOR or self.is_superuser
@@ -68,3 +101,21 @@ class PasswordResetCode(models.Model):
 
     def __str__(self):
         return f"{self.email} - {self.code}"
+
+
+class RevokedToken(models.Model):
+    """``jti`` d'un jeton JWT révoqué, jusqu'à son expiration (voir users/revocation.py)."""
+    jti = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Jeton révoqué')
+        verbose_name_plural = _('Jetons révoqués')
+        indexes = [
+            models.Index(fields=['expires_at'], name='revoked_token_expiry_idx'),
+            models.Index(fields=['created_at'], name='revoked_token_created_idx'),
+        ]
+
+    def __str__(self):
+        return self.jti
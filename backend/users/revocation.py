@@ -0,0 +1,155 @@
+"""
+Révocation des jetons JWT : refresh consommés par la rotation, jetons d'une déconnexion.
+
+La table ``RevokedToken`` ne garde que le ``jti`` (unique) et l'expiration du
+jeton, indexée : ``manage.py prune_revoked_tokens`` supprime par lots les
+lignes expirées (un jeton expiré est de toute façon refusé), la table reste à
+la taille des jetons encore valides.
+
+Rotation : l'insertion du ``jti`` du refresh présenté *est* le contrôle. Si
+deux requêtes présentent le même refresh, une seule insertion réussit ; l'autre
+reçoit 401. Un refresh coûte une insertion dans un index unique, quelle que
+soit la taille de la table.
+
+Jetons d'accès : ``CachedJWTAuthentication`` les vérifie à chaque requête. Un
+filtre de Bloom en mémoire contient les ``jti`` révoqués ; le cas courant
+(jeton non révoqué) est tranché sans SQL, un « peut-être » est confirmé par
+une lecture de la table. Le filtre est complété quand le jeton de version
+``token-revocation`` du cache change (cyprus_api/cache.py), et au plus tard
+toutes les TOKEN_REVOCATION_SYNC_INTERVAL secondes : avec plusieurs workers, un
+cache partagé propage une déconnexion immédiatement.
+
+Le complément relit les lignes créées depuis la synchronisation précédente,
+moins TOKEN_REVOCATION_SYNC_MARGIN secondes. Un curseur sur l'``id`` ne suffit
+pas : l'identifiant est attribué à l'insertion, avant le commit, et une ligne
+validée après une autre d'``id`` supérieur serait sautée.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone as django_timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from cyprus_api.cache import bump_scope_version, get_scope_version
+
+from .models import RevokedToken
+
+SCOPE = 'token-revocation'
+
+
+class BloomFilter:
+    """Filtre de Bloom : ``in`` ne donne jamais de faux négatif, des faux positifs au taux ``error``."""
+
+    def __init__(self, capacity, error=0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, value):
+        # Double hachage (Kirsch-Mitzenmacher) : deux entiers de 64 bits suffisent pour k positions
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return [(first + index * second) % self.size for index in range(self.hashes)]
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(value))
+
+
+class _State:
+    """Filtre du processus et position de synchronisation avec la table."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.filter = None
+        self.capacity = 0
+        self.synced_until = None  # heure (base) du début de la dernière lecture
+        self.version = None
+        self.synced_at = 0.0
+
+
+_state = _State()
+
+
+def token_expiry(token):
+    return datetime.fromtimestamp(token['exp'], tz=timezone.utc)
+
+
+class TokenRevocation:
+    """Voir l'en-tête du module."""
+
+    @staticmethod
+    def revoke(jti, expires_at):
+        """Révoque un ``jti`` ; ``False`` s'il l'était déjà."""
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+        except IntegrityError:
+            return False
+        with _state.lock:
+            if _state.filter is not None:
+                _state.filter.add(jti)
+        transaction.on_commit(lambda: bump_scope_version(SCOPE))
+        return True
+
+    @staticmethod
+    def revoke_token(token):
+        return TokenRevocation.revoke(token[api_settings.JTI_CLAIM], token_expiry(token))
+
+    @staticmethod
+    def sync(force=False):
+        """Ajoute au filtre les révocations enregistrées depuis la dernière synchronisation."""
+        version = get_scope_version(SCOPE)
+        with _state.lock:
+            fresh = time.monotonic() - _state.synced_at < settings.TOKEN_REVOCATION_SYNC_INTERVAL
+            if not force and _state.filter is not None and version == _state.version and fresh:
+                return
+            started = django_timezone.now()
+            if _state.filter is None or _state.filter.count >= _state.capacity:
+                # Reconstruit (au démarrage, ou filtre saturé) à partir des seules lignes encore valides
+                rows = RevokedToken.objects.filter(expires_at__gt=started)
+                _state.capacity = max(settings.TOKEN_REVOCATION_FILTER_CAPACITY, 2 * rows.count())
+                _state.filter = BloomFilter(_state.capacity, settings.TOKEN_REVOCATION_FILTER_ERROR)
+            else:
+                margin = timedelta(seconds=settings.TOKEN_REVOCATION_SYNC_MARGIN)
+                rows = RevokedToken.objects.filter(created_at__gte=_state.synced_until - margin)
+            for jti in rows.values_list('jti', flat=True).iterator():
+                # Les lignes de la marge sont relues : pas de double comptage dans le filtre
+                if jti not in _state.filter:
+                    _state.filter.add(jti)
+            _state.synced_until = started
+            _state.version = version
+            _state.synced_at = time.monotonic()
+
+    @staticmethod
+    def is_revoked(jti):
+        if not jti:
+            return False
+        TokenRevocation.sync()
+        if jti not in _state.filter:
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    @staticmethod
+    def prune(batch_size=1000):
+        """Supprime les révocations expirées par lots (dans l'ordre de l'index d'expiration)."""
+        deleted = 0
+        while True:
+            ids = list(
+                RevokedToken.objects.filter(expires_at__lte=django_timezone.now())
+                .order_by('expires_at').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted
+            deleted += RevokedToken.objects.filter(id__in=ids).delete()[0]
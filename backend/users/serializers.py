@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from cyprus_api.images import ImageVariantsField
+from .revocation import TokenRevocation
 import string
 import secrets
 
@@ -9,9 +13,11 @@ import secrets
 User = get_user_model()
 
 class UserSerializer(serializers.ModelSerializer):
+    profile_picture_srcset = ImageVariantsField('profile_picture')
+
     class Meta:
         model = User
-        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'role', 'phone_number', 'is_2fa_enabled', 'profile_picture', 'bio', 'member_id', 'created_at', 'birth_date', 'address')
+        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'role', 'phone_number', 'is_2fa_enabled', 'profile_picture', 'profile_picture_srcset', 'bio', 'member_id', 'created_at', 'birth_date', 'address', 'preferred_language', 'receive_announcements')
         read_only_fields = ('role', 'is_2fa_enabled', 'member_id', 'created_at')
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -30,7 +36,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         }
 
     def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
+        if User.objects.by_email(value).exists():
             raise serializers.ValidationError("Cette adresse email est déjà utilisée.")
         return value
 
@@ -69,12 +75,10 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         password = attrs.get('password')
 
         if username and '@' in username:
-            try:
-                user = User.objects.get(email=username)
+            user = User.objects.by_email(username).first()
+            if user:
                 attrs['username'] = user.username
-            except User.DoesNotExist:
-                # If email not found, let the parent class handle the error (it will fail authentication)
-                pass
+            # If email not found, let the parent class handle the error (it will fail authentication)
         
         data = super().validate(attrs)
         data['user'] = UserSerializer(self.user).data
@@ -86,10 +90,11 @@ class VerifyOTPSerializer(serializers.Serializer):
 
 class MemberProfileSerializer(serializers.ModelSerializer):
     """Serializer pour les membres - champs modifiables limités"""
-    
+    profile_picture_srcset = ImageVariantsField('profile_picture')
+
     class Meta:
         model = User
-        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'profile_picture', 
+        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'profile_picture', 'profile_picture_srcset',
                   'phone_number', 'bio', 'member_id', 'birth_date', 'address', 'created_at', 'role')
         read_only_fields = ('id', 'username', 'email', 'phone_number', 'bio', 'member_id', 
                            'birth_date', 'address', 'created_at', 'role')
@@ -149,7 +154,25 @@ class ChangePasswordSerializer(serializers.Serializer):
 class PastorSerializer(serializers.ModelSerializer):
     """Serializer pour afficher les informations publiques des pasteurs"""
     full_name = serializers.CharField(source='get_full_name', read_only=True)
+    profile_picture_srcset = ImageVariantsField('profile_picture')
 
     class Meta:
         model = User
-        fields = ('id', 'full_name', 'profile_picture', 'bio')
+        fields = ('id', 'full_name', 'profile_picture', 'profile_picture_srcset', 'bio')
+
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh à usage unique : le jeton présenté est révoqué avant d'en émettre un
+    nouveau (ROTATE_REFRESH_TOKENS + BLACKLIST_AFTER_ROTATION, voir revocation.py).
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            revoked = not TokenRevocation.revoke_token(refresh)
+        else:
+            revoked = TokenRevocation.is_revoked(refresh.get(api_settings.JTI_CLAIM))
+        if revoked:
+            raise InvalidToken("Ce jeton a déjà été utilisé ou révoqué.")
+        return super().validate(attrs)
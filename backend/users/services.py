@@ -2,10 +2,11 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
-from django.core.mail import send_mail
 from django.conf import settings
 from django.db import transaction
 
+from outbox.services import Outbox
+
 User = get_user_model()
 
 class UserService:
@@ -16,7 +17,7 @@ class UserService:
     @staticmethod
     def send_password_reset_email(user):
         """
-        Génère un token et envoie un email de réinitialisation.
+        Génère un token et met en file d'envoi l'email de réinitialisation.
         """
         token = default_token_generator.make_token(user)
         uid = urlsafe_base64_encode(force_bytes(user.pk))
@@ -31,21 +32,8 @@ class UserService:
             "Si vous n'avez pas demandé de réinitialisation, veuillez ignorer cet email."
         )
         
-        try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
-            )
-            return True
-        except Exception as e:
-            # Re-raise with a more descriptive message if possible
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error sending password reset email to {user.email}: {str(e)}")
-            raise e
+        Outbox.enqueue(subject, message, [user.email])
+        return True
 
     @staticmethod
     @transaction.atomic
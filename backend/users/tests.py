@@ -1,10 +1,22 @@
+from django.core.cache import cache
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
+import io
+import os
+import tempfile
+import uuid
 import pyotp
 import base64
 from django_otp.plugins.otp_totp.models import TOTPDevice
+from .models import RevokedToken
+from .revocation import BloomFilter, TokenRevocation
 
 User = get_user_model()
 
@@ -34,6 +46,12 @@ class UserAuthTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(User.objects.count(), 2) # setUp user + new user
 
+    def test_registration_rejects_an_email_differing_only_by_case(self):
+        data = {'username': 'autre', 'email': 'TEST@example.com', 'password': 'testpassword123'}
+        response = self.client.post(self.register_url, data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(User.objects.count(), 1)
+
     def test_login(self):
         data = {
             'username': self.user.username,
@@ -44,6 +62,15 @@ class UserAuthTests(APITestCase):
         self.assertIn('access', response.data)
         self.assertIn('refresh', response.data)
 
+    def test_login_with_email_is_case_insensitive(self):
+        data = {
+            'username': 'Test@Example.COM',
+            'password': 'testpassword123'
+        }
+        response = self.client.post(self.login_url, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', response.data)
+
     def test_enable_2fa(self):
         self.client.force_authenticate(user=self.user)
         
@@ -90,3 +117,139 @@ class UserAuthTests(APITestCase):
         
         device = TOTPDevice.objects.get(user=self.user)
         self.assertFalse(device.confirmed)
+
+    def test_password_reset_email_is_queued(self):
+        from django.core import mail
+        from outbox.models import OutgoingEmail
+
+        response = self.client.post(reverse('password_reset'), {'email': 'TEST@example.com'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutgoingEmail.objects.get().to, ['test@example.com'])
+
+
+# Cache partagé entre processus : le seul avec lequel l'utilisateur JWT est mis en cache
+SHARED_CACHE = {'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': os.path.join(tempfile.gettempdir(), 'cyprus-tests-cache'),
+}}
+
+
+@override_settings(CACHES=SHARED_CACHE, JWT_USER_CACHE_TIMEOUT=300)
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        TokenRevocation.sync(force=True)  # filtre des jetons révoqués à jour : pas de requête dans les comptes
+        self.member = User.objects.create_user(username='membre', password='x', first_name='Paul', bio='Diacre')
+        self.admin = User.objects.create_user(username='admin', password='x', role=User.Role.ADMIN, is_staff=True)
+        self.member_token = f'Bearer {AccessToken.for_user(self.member)}'
+        self.client.credentials(HTTP_AUTHORIZATION=self.member_token)
+
+    def as_admin(self, action, data=None):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.admin)}')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/admin/users/{self.member.pk}/{action}/', data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=self.member_token)
+
+    def test_user_is_read_once_then_served_from_cache(self):
+        with self.assertNumQueries(2):  # utilisateur, boîte de réception
+            self.client.get('/api/chat/conversations/')
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/chat/conversations/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_user_is_not_cached_in_a_per_process_cache(self):
+        # locmem : une invalidation faite par un autre worker ne serait pas vue ici
+        TokenRevocation.sync(force=True)  # nouveau cache, nouvelle version du scope de révocation
+        for _ in range(2):
+            with self.assertNumQueries(2):  # utilisateur, boîte de réception
+                self.client.get('/api/chat/conversations/')
+
+    def test_partial_user_loads_missing_fields_in_one_query(self):
+        self.client.get('/api/auth/profile/')
+        with self.assertNumQueries(1):  # bio, téléphone, photo... en une fois
+            response = self.client.get('/api/auth/profile/')
+        self.assertEqual((response.data['first_name'], response.data['bio']), ('Paul', 'Diacre'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch('/api/auth/profile/', {'first_name': 'Pierre'})
+        self.member.refresh_from_db()
+        self.assertEqual((self.member.first_name, self.member.bio), ('Pierre', 'Diacre'))
+        self.assertEqual(self.client.get('/api/auth/profile/').data['first_name'], 'Pierre')
+
+    def test_role_change_and_deactivation_invalidate_the_cache(self):
+        self.assertEqual(self.client.post('/api/rhema/', {}).status_code, status.HTTP_403_FORBIDDEN)
+
+        # Le jeton du membre (claim role = MEMBER) reste valable : le rôle vient du cache invalidé
+        self.as_admin('change_role', {'role': 'PASTOR'})
+        self.assertEqual(self.client.post('/api/rhema/', {}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.as_admin('toggle_active')
+        response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenRevocationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='membre', password='x')
+        self.refresh = RefreshToken.for_user(self.user)
+
+    def test_refresh_token_is_single_use(self):
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': str(self.refresh)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rotated = response.data['refresh']
+
+        replay = self.client.post('/api/auth/token/refresh/', {'refresh': str(self.refresh)})
+        self.assertEqual(replay.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': rotated})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(RevokedToken.objects.count(), 2)
+
+    def test_logout_revokes_refresh_and_access_tokens(self):
+        access = f'Bearer {self.refresh.access_token}'
+        self.assertEqual(self.client.get('/api/auth/profile/', HTTP_AUTHORIZATION=access).status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/logout/', {'refresh': str(self.refresh)}, HTTP_AUTHORIZATION=access)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.client.get('/api/auth/profile/', HTTP_AUTHORIZATION=access).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': str(self.refresh)})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.post('/api/auth/logout/', {'refresh': 'abc'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unrevoked_tokens_are_checked_without_query(self):
+        TokenRevocation.revoke(uuid.uuid4().hex, timezone.now() + timedelta(hours=1))
+        TokenRevocation.sync(force=True)
+        with self.assertNumQueries(0):
+            self.assertFalse(TokenRevocation.is_revoked(uuid.uuid4().hex))
+
+    def test_revocation_committed_out_of_order_is_picked_up(self):
+        expires_at = timezone.now() + timedelta(hours=1)
+        later = RevokedToken.objects.create(id=1000, jti=uuid.uuid4().hex, expires_at=expires_at)
+        TokenRevocation.sync(force=True)
+        self.assertTrue(TokenRevocation.is_revoked(later.jti))
+
+        # Insérée avant la synchronisation (id et date inférieurs), validée après
+        earlier = RevokedToken.objects.create(id=500, jti=uuid.uuid4().hex, expires_at=expires_at)
+        RevokedToken.objects.filter(pk=earlier.pk).update(created_at=timezone.now() - timedelta(seconds=5))
+        TokenRevocation.sync(force=True)
+        self.assertTrue(TokenRevocation.is_revoked(earlier.jti))
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        values = [uuid.uuid4().hex for _ in range(1000)]
+        for value in values:
+            bloom.add(value)
+        self.assertTrue(all(value in bloom for value in values))
+        false_positives = sum(uuid.uuid4().hex in bloom for _ in range(2000))
+        self.assertLess(false_positives, 100)
+
+    def test_prune_deletes_expired_entries_in_batches(self):
+        now = timezone.now()
+        for hours in (-3, -2, -1, 1):
+            RevokedToken.objects.create(jti=uuid.uuid4().hex, expires_at=now + timedelta(hours=hours))
+        call_command('prune_revoked_tokens', '--batch-size', '2', stdout=io.StringIO())
+        self.assertEqual(list(RevokedToken.objects.values_list('expires_at', flat=True)), [now + timedelta(hours=1)])
@@ -1,11 +1,11 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
-from .views import RegisterView, LoginView, ProfileView, Enable2FAView, Verify2FAView, CreatePastorView, ChangePasswordView, PastorListView, PasswordResetRequestView, PasswordResetConfirmView
+from .views import RegisterView, LoginView, RefreshView, LogoutView, ProfileView, Enable2FAView, Verify2FAView, CreatePastorView, ChangePasswordView, PastorListView, PasswordResetRequestView, PasswordResetConfirmView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='auth_register'),
     path('login/', LoginView.as_view(), name='auth_login'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', RefreshView.as_view(), name='token_refresh'),
+    path('logout/', LogoutView.as_view(), name='auth_logout'),
     path('profile/', ProfileView.as_view(), name='auth_profile'),
     path('2fa/enable/', Enable2FAView.as_view(), name='enable_2fa'),
     path('2fa/verify/', Verify2FAView.as_view(), name='verify_2fa'),
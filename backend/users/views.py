@@ -1,20 +1,23 @@
-from django.db.models import Q
 from rest_framework import generics, status, permissions, views
 from rest_framework.response import Response
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import get_user_model
 from django_otp.plugins.otp_totp.models import TOTPDevice
-from .serializers import UserSerializer, RegisterSerializer, CustomTokenObtainPairSerializer, VerifyOTPSerializer
+from .serializers import UserSerializer, RegisterSerializer, CustomTokenObtainPairSerializer, VerifyOTPSerializer, RotatingTokenRefreshSerializer
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from django.core.mail import send_mail
+from django.db import transaction
 from django.template.loader import render_to_string
 from django.conf import settings
 import qrcode
 import io
 import base64
 
+from .authentication import CachedJWTAuthentication
+from .revocation import TokenRevocation
 from .services import UserService
 
 User = get_user_model()
@@ -27,6 +30,34 @@ class RegisterView(generics.CreateAPIView):
 class LoginView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
+class RefreshView(TokenRefreshView):
+    serializer_class = RotatingTokenRefreshSerializer
+
+class LogoutView(views.APIView):
+    """
+    Révoque le refresh token envoyé et, s'il est présent, le jeton d'accès de l'en-tête.
+    Sans authentification obligatoire : un jeton d'accès expiré n'empêche pas la déconnexion.
+    """
+    permission_classes = (permissions.AllowAny,)
+    authentication_classes = ()
+
+    def post(self, request):
+        try:
+            refresh = RefreshToken(request.data.get('refresh') or '')
+        except TokenError:
+            return Response({"error": "Jeton invalide ou expiré."}, status=status.HTTP_400_BAD_REQUEST)
+        TokenRevocation.revoke_token(refresh)
+
+        auth = CachedJWTAuthentication()
+        header = auth.get_header(request)
+        raw_token = auth.get_raw_token(header) if header else None
+        if raw_token:
+            try:
+                TokenRevocation.revoke_token(AccessToken(raw_token))
+            except TokenError:
+                pass  # déjà expiré
+        return Response({"message": "Déconnexion effectuée."}, status=status.HTTP_200_OK)
+
 class ProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
@@ -154,12 +185,8 @@ class PastorListView(generics.ListAPIView):
     pagination_class = None
 
     def get_queryset(self):
-        # Utiliser Q pour être plus robuste aux variations de casse en production
-        return User.objects.filter(
-            Q(role='PASTOR') | 
-            Q(role='Pastor') | 
-            Q(role='pastor')
-        )
+        # Variantes de casse tolérées pour la production ; IN reste servi par l'index sur role
+        return User.objects.filter(role__in=['PASTOR', 'Pastor', 'pastor'])
     
     def get_serializer_class(self):
         from .serializers import PastorSerializer
@@ -172,18 +199,14 @@ class PasswordResetRequestView(views.APIView):
         if not email:
             return Response({"error": "L'email est requis."}, status=status.HTTP_400_BAD_REQUEST)
         
-        users = User.objects.filter(email=email)
+        users = User.objects.by_email(email)
         
         if users.exists():
-            try:
+            # Emails mis en file : envoyés par le worker (run_mail_worker), sans attendre le SMTP
+            with transaction.atomic():
                 for user in users:
                     UserService.send_password_reset_email(user)
-                return Response({"message": "Un email de réinitialisation a été envoyé."}, status=status.HTTP_200_OK)
-            except Exception as e:
-                return Response({
-                    "error": "Erreur d'envoi",
-                    "message": f"Impossible d'envoyer l'email : {str(e)}. Vérifiez la configuration SMTP."
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response({"message": "Un email de réinitialisation a été envoyé."}, status=status.HTTP_200_OK)
         else:
             return Response({"message": "Si cet email est enregistré, vous recevrez un lien de réinitialisation."}, status=status.HTTP_200_OK)
 
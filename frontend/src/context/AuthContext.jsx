@@ -126,6 +126,13 @@ export const AuthProvider = ({ children }) => {
     }
 
     const logout = () => {
+        // Révoque les jetons côté serveur (sans attendre : la session locale est fermée de toute façon)
+        const access = localStorage.getItem('access_token')
+        const refresh = localStorage.getItem('refresh_token')
+        if (refresh) {
+            const headers = access ? { Authorization: `Bearer ${access}` } : {}
+            apiClient.post('auth/logout/', { refresh }, { headers }).catch(() => {})
+        }
         setUser(null)
         setIsAuthenticated(false)
         localStorage.removeItem('access_token')
@@ -70,7 +70,7 @@ const Sermons = () => {
                     duration: s.duration || '00:00',
                     views: s.views || 0,
                     thumbnail: s.thumbnail || 'https://images.unsplash.com/photo-1501386761578-eac5c94b800a?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80',
-                    notesUrl: s.pdf_file ? (s.pdf_file.startsWith('http') ? s.pdf_file : `${apiClient.defaults.baseURL.replace('/api/', '')}${s.pdf_file}`) : null
+                    notesUrl: s.pdf_url || (s.pdf_file ? (s.pdf_file.startsWith('http') ? s.pdf_file : `${apiClient.defaults.baseURL.replace('/api/', '')}${s.pdf_file}`) : null)
                 }))
 
                 setAllSermons(formattedSermons)